@@ -0,0 +1,327 @@
+"""Sdílená audio sběrnice: jeden trvale otevřený mikrofon + kruhový buffer.
+
+Místo opakovaného zavírání/otevírání zařízení (Porcupine stream, `sr.Microphone`
+pro STT, další mikrofon pro přerušení) běží jediný vstupní stream v callback
+režimu PyAudio a zapisuje vzorky do kruhového bufferu. Wake word, STT i
+naslouchání přerušení jsou jen čtenáři s vlastním kurzorem.
+
+Capture blok se hned při zápisu převede (`CaptureConverter`): převzorkování
+z nativní frekvence zařízení na 16 kHz, `input_gain` a float32 kopie do
+paralelního kruhového bufferu se stejnými pozicemi. Whisper tak čte float32
+přímo ze sběrnice a nic dalšího nepřevádí. Je-li nastaven `EchoCanceller`,
+odečte se z bloku ještě před zápisem ozvěna vlastního přehrávání.
+
+Poskytuje:
+- RingBuffer: kruhový buffer (int16/float32), jeden zapisovatel, libovolně čtenářů
+- AudioBus: správa vstupního streamu (start/stop) a tvorba čtenářů
+- BusReader: blokující čtení od vlastní pozice s timeoutem
+- BusAudioSource: adaptér pro `sr.Recognizer.listen` nad čtenářem
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+import numpy as np
+import speech_recognition as sr
+
+from src.audio.capture_convert import CaptureConverter
+
+if TYPE_CHECKING:  # pragma: no cover
+    from src.audio.echo_canceller import EchoCanceller
+
+_PA_CONTINUE = 0  # pyaudio.paContinue
+
+
+class RingBuffer:
+    """Kruhový buffer vzorků s jedním zapisovatelem a více čtenáři.
+
+    Zapisovatel nejprve zkopíruje data a teprve potom posune monotónní čítač
+    `write_pos` (celkový počet zapsaných vzorků). Čtenáři si drží vlastní
+    absolutní pozici, datová cesta se tedy nezamyká. Čtenář, který zaostane o
+    víc než kapacitu, je posunut na nejstarší dostupný vzorek.
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError("capacity musí být kladná")
+        self._buf = np.zeros(capacity, dtype=dtype)
+        self._capacity = capacity
+        self._write_pos = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def write_pos(self) -> int:
+        return self._write_pos
+
+    @property
+    def oldest_pos(self) -> int:
+        return max(0, self._write_pos - self._capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        """Zapiš vzorky (volá pouze capture vlákno)."""
+        total = len(samples)
+        if total == 0:
+            return
+        data = samples[-self._capacity :]
+        n = len(data)
+        start = (self._write_pos + total - n) % self._capacity
+        first = min(n, self._capacity - start)
+        self._buf[start : start + first] = data[:first]
+        if first < n:
+            self._buf[: n - first] = data[first:]
+        # publikace až po zkopírování dat
+        self._write_pos += total
+
+    def read(self, pos: int, n: int) -> Tuple[np.ndarray, int]:
+        """Vrať kopii až `n` vzorků od absolutní pozice `pos`.
+
+        Vrací dvojici (vzorky, skutečná počáteční pozice). Pokud byla `pos` už
+        přepsána, čte se od nejstaršího dostupného vzorku.
+        """
+        while True:
+            end = self._write_pos
+            pos = max(pos, end - self._capacity)
+            count = max(0, min(n, end - pos))
+            start = pos % self._capacity
+            first = min(count, self._capacity - start)
+            out = np.empty(count, dtype=self._buf.dtype)
+            out[:first] = self._buf[start : start + first]
+            if first < count:
+                out[first:] = self._buf[: count - first]
+            # seqlock-like kontrola: data mezitím nesměla být přepsána
+            if self._write_pos - pos <= self._capacity:
+                return out, pos
+
+
+@dataclass
+class AudioBusConfig:
+    sample_rate: int = 16000
+    block_size: int = 512
+    buffer_seconds: float = 10.0
+    capture_rate: Optional[int] = (
+        None  # nativní frekvence zařízení (None = sample_rate)
+    )
+    input_gain: float = 1.0
+
+
+class AudioBus:
+    """Jediný trvale otevřený vstupní stream nad sdíleným kruhovým bufferem.
+
+    Očekává externě vytvořený PyAudio a zvolený `input_device_index` (stejně
+    jako WakeWordDetector).
+    """
+
+    def __init__(
+        self,
+        pyaudio_instance,
+        device_index: Optional[int],
+        cfg: Optional[AudioBusConfig] = None,
+    ):
+        self._pa = pyaudio_instance
+        self._device_index = device_index
+        self.cfg = cfg or AudioBusConfig()
+        capacity = int(self.cfg.sample_rate * self.cfg.buffer_seconds)
+        self.ring = RingBuffer(capacity)
+        # float32 kopie se stejnými pozicemi (Whisper čte bez dalšího převodu)
+        self.float_ring = RingBuffer(capacity, dtype=np.float32)
+        self._convert = CaptureConverter(
+            self.capture_rate, self.cfg.sample_rate, self.cfg.input_gain
+        )
+        self._stream = None
+        self._cond = threading.Condition()
+        self._closed = False
+        # lehké zpracování přímo v capture vlákně (např. odhad šumu)
+        self._taps: List[Callable[[np.ndarray], None]] = []
+        self._aec: Optional["EchoCanceller"] = None
+
+    @property
+    def sample_rate(self) -> int:
+        return self.cfg.sample_rate
+
+    @property
+    def capture_rate(self) -> int:
+        return self.cfg.capture_rate or self.cfg.sample_rate
+
+    @property
+    def active(self) -> bool:
+        return self._stream is not None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def start(self) -> bool:
+        """Otevři vstupní stream v callback režimu. Vrací úspěch."""
+        if self._stream is not None:
+            return True
+        if self._device_index is None:
+            return False
+        try:
+            self._stream = self._pa.open(
+                format=self._pa.get_format_from_width(2),
+                channels=1,
+                rate=self.capture_rate,
+                input=True,
+                input_device_index=self._device_index,
+                frames_per_buffer=self.cfg.block_size,
+                stream_callback=self._on_audio,
+            )
+        except (OSError, ValueError):  # pragma: no cover - driver chyby
+            self._stream = None
+            return False
+        self._closed = False
+        return True
+
+    def stop(self) -> None:
+        """Zavři stream a probuď čekající čtenáře."""
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except OSError:  # pragma: no cover
+                pass
+            self._stream = None
+        self._closed = True
+        with self._cond:
+            self._cond.notify_all()
+
+    def add_tap(self, callback: Callable[[np.ndarray], None]) -> None:
+        """Zaregistruj funkci volanou s každým blokem v capture vlákně.
+
+        Musí být rychlá a nesmí blokovat, jinak hrozí přetečení vstupu.
+        """
+        self._taps.append(callback)
+
+    def set_echo_canceller(self, aec: Optional["EchoCanceller"]) -> None:
+        """Odečítej ozvěnu přehrávání z capture bloků před zápisem do bufferu."""
+        self._aec = aec
+
+    def push(self, samples: np.ndarray, captured_at: Optional[float] = None) -> None:
+        """Převeď a zapiš capture blok (int16, `capture_rate`) a probuď čtenáře.
+
+        `captured_at` je perf_counter posledního vzorku (párování s referencí
+        AEC). Volá capture vlákno (případně testy).
+        """
+        pcm, f32 = self._convert.convert(samples)
+        if self._aec is not None:
+            pcm, f32 = self._aec.process(pcm, captured_at)
+        # float32 dřív: `write_pos` int16 bufferu, na který čekají čtenáři, je
+        # publikován až po obou zápisech
+        self.float_ring.write(f32)
+        self.ring.write(pcm)
+        for tap in self._taps:
+            tap(pcm)
+        with self._cond:
+            self._cond.notify_all()
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PyAudio callback – běží v capture vlákně PortAudio."""
+        _ = status
+        info = time_info or {}
+        captured_at = None
+        if "input_buffer_adc_time" in info:
+            # ADC vzorkoval první vzorek bloku o `latency` dřív než teď
+            latency = info.get("current_time", 0.0) - info["input_buffer_adc_time"]
+            captured_at = (
+                time.perf_counter()
+                - max(0.0, latency)
+                + (frame_count - 1) / self.capture_rate
+            )
+        self.push(np.frombuffer(in_data, dtype=np.int16), captured_at)
+        return None, _PA_CONTINUE
+
+    def wait_for(self, pos: int, timeout: Optional[float]) -> bool:
+        """Počkej, až bude v bufferu zapsána pozice `pos` (nebo timeout)."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self.ring.write_pos >= pos or self._closed, timeout
+            ) and (self.ring.write_pos >= pos)
+
+    def reader(self, backlog_s: float = 0.0) -> "BusReader":
+        """Vytvoř čtenáře začínajícího `backlog_s` sekund v minulosti."""
+        pos = self.ring.write_pos - int(backlog_s * self.cfg.sample_rate)
+        return self.reader_at(pos)
+
+    def reader_at(self, position: int) -> "BusReader":
+        """Vytvoř čtenáře na absolutní pozici (např. navázání na jiného čtenáře)."""
+        return BusReader(self, max(position, self.ring.oldest_pos))
+
+
+class BusReader:
+    """Čtenář sběrnice s vlastním kurzorem."""
+
+    def __init__(self, bus: AudioBus, position: int):
+        self._bus = bus
+        self.position = position
+
+    @property
+    def sample_rate(self) -> int:
+        return self._bus.sample_rate
+
+    def available(self) -> int:
+        return max(0, self._bus.ring.write_pos - self.position)
+
+    def skip_to_live(self) -> None:
+        """Zahoď nepřečtená data (např. po pauze čtenáře)."""
+        self.position = self._bus.ring.write_pos
+
+    def read(self, n: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Blokující čtení přesně `n` vzorků; None při timeoutu či zastavení."""
+        if not self._bus.wait_for(self.position + n, timeout):
+            return None
+        data, start = self._bus.ring.read(self.position, n)
+        self.position = start + len(data)
+        return data
+
+    def float_range(self, start: int, end: int) -> Optional[np.ndarray]:
+        """float32 (-1..1) kopie úseku [start, end) ze sdíleného bufferu.
+
+        Vrací None, pokud už byl začátek úseku přepsán.
+        """
+        data, real_start = self._bus.float_ring.read(start, end - start)
+        if real_start != start or len(data) != end - start:
+            return None
+        return data
+
+
+class _BusStream:
+    """Minimální náhrada PyAudio streamu pro SpeechRecognition."""
+
+    def __init__(self, reader: BusReader, timeout: float):
+        self._reader = reader
+        self._timeout = timeout
+
+    def read(self, size: int) -> bytes:
+        data = self._reader.read(size, timeout=self._timeout)
+        return b"" if data is None else data.tobytes()
+
+    def close(self) -> None:
+        return None
+
+
+class BusAudioSource(sr.AudioSource):
+    """`sr.AudioSource` čtoucí ze sdílené sběrnice místo `sr.Microphone`.
+
+    Otevření ani zavření nesahá na zařízení, takže je okamžité.
+    """
+
+    def __init__(self, reader: BusReader, chunk: int = 1024, timeout: float = 2.0):
+        # záměrně nevoláme super().__init__ (abstraktní, vyhazuje výjimku)
+        self.reader = reader
+        self.SAMPLE_RATE = reader.sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk
+        self.stream = _BusStream(reader, timeout)
+
+    def __enter__(self) -> "BusAudioSource":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        return None
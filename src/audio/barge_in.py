@@ -0,0 +1,127 @@
+"""Lokální detekce přerušení (barge-in) během mluvení Jarvise.
+
+Dřív `TextToSpeech` při každém kole čekací smyčky otevřel mikrofon,
+kalibroval, nahrál až 0.8 s a poslal je do `recognize_google` – stovky ms
+latence, bez sítě nefunkční. Detektor místo toho čte živý capture stream ze
+sdílené sběrnice po 30ms blocích: brána řeči (`SpeechGate`, webrtcvad)
+pouští do malého keyword spotteru (Vosk s gramatikou `interrupt_words`) jen
+řeč a spotter hlásí slovo už z průběžné hypotézy. Callback pak zastaví
+přehrávání, typicky do ~150 ms od vyslovení „stop“.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.audio.audio_bus import AudioBus, BusReader
+from src.audio.command_recognizer import CommandRecognizer
+from src.audio.vad_gate import SpeechGate, SpeechGateConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BargeInConfig:
+    gate_mode: str = "webrtc"  # "webrtc" | "rms" (viz SpeechGate)
+    vad_aggressiveness: int = 2
+    rms_threshold: float = 300.0
+    block_ms: int = 30  # krok čtení ze sběrnice (webrtcvad frame)
+    lookback_ms: int = 150  # začátek slova před nástupem řeči
+    hangover_ms: int = 300
+
+
+class BargeInDetector:
+    """Hlídá živý stream během mluvení a hlásí přerušovací slovo.
+
+    `start(on_detect)` spustí vlákno nad novým čtenářem sběrnice (od „teď“),
+    `stop()` ho ukončí. `process(block)` je samotné rozhodování a lze ho volat
+    i přímo (testy).
+    """
+
+    def __init__(
+        self,
+        bus: AudioBus,
+        spotter: CommandRecognizer,
+        cfg: Optional[BargeInConfig] = None,
+    ):
+        self.cfg = cfg or BargeInConfig()
+        self._bus = bus
+        self._spotter = spotter
+        self._frame = bus.sample_rate * self.cfg.block_ms // 1000
+        self._gate = SpeechGate(
+            SpeechGateConfig(
+                mode=self.cfg.gate_mode,
+                rms_threshold=self.cfg.rms_threshold,
+                vad_aggressiveness=self.cfg.vad_aggressiveness,
+                lookback_ms=self.cfg.lookback_ms,
+                hangover_ms=self.cfg.hangover_ms,
+                sample_rate=bus.sample_rate,
+            )
+        )
+        self._in_speech = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.detected_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def reset(self) -> None:
+        self._spotter.reset()
+        self._in_speech = False
+        self.detected_at = None
+
+    def process(self, block: np.ndarray) -> Optional[str]:
+        """Zpracuj blok živého audia; vrať přerušovací slovo, nebo None."""
+        frames = self._gate.feed(block)
+        if frames:
+            self._in_speech = True
+            for frame in frames:
+                self._spotter.feed(frame)
+            return self._spotter.partial()
+        if self._in_speech:
+            # brána se zavřela: dořeš promluvu a začni znovu
+            self._in_speech = False
+            word = self._spotter.result()
+            self._spotter.reset()
+            return word
+        return None
+
+    def start(self, on_detect: Callable[[str], None]) -> None:
+        """Začni hlídat stream od této chvíle (idempotentní)."""
+        if self.running:
+            return
+        self.reset()
+        self._stop.clear()
+        reader = self._bus.reader()
+        self._thread = threading.Thread(
+            target=self._run, args=(reader, on_detect), name="barge-in", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self, reader: BusReader, on_detect: Callable[[str], None]) -> None:
+        while not self._stop.is_set():
+            block = reader.read(self._frame, timeout=0.1)
+            if block is None:
+                if self._bus.closed:
+                    return
+                continue
+            word = self.process(block)
+            if word:
+                self.detected_at = time.perf_counter()
+                logger.info("✋ Přerušení: %s", word)
+                on_detect(word)
+                return
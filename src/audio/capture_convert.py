@@ -0,0 +1,117 @@
+"""Převod capture bloků na 16 kHz int16 + float32 v jediném průchodu.
+
+Mikrofon může běžet na své nativní frekvenci (typicky 44.1/48 kHz). Každý
+blok se jednou převzorkuje polyfázovým FIR filtrem (návrh přes scipy,
+výpočet vektorizovaně v NumPy se zachováním stavu mezi bloky), vynásobí
+`input_gain` a zapíše do předalokovaných bufferů ve dvou formátech: int16
+pro wake word/VAD/SR a float32 (-1..1) pro Whisper. Spotřebitelé už nic
+nepřevádějí.
+"""
+
+from __future__ import annotations
+
+from math import gcd
+from typing import Tuple
+
+import numpy as np
+from scipy.signal import firwin
+
+
+class StreamResampler:
+    """Streamový racionální resampler (up/down) s polyfázovou bankou filtrů.
+
+    Výstupní vzorek j odpovídá pozici j·down v up-krát nadvzorkovaném
+    signálu; počítají se jen potřebné fáze filtru (žádné nuly navíc).
+    Historie posledních vstupních vzorků zajistí plynulé navázání bloků.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, half_width: int = 10):
+        g = gcd(in_rate, out_rate)
+        self.up, self.down = out_rate // g, in_rate // g
+        limit = max(self.up, self.down)
+        # stejný návrh jako scipy.signal.resample_poly (Kaiser, beta 5)
+        h = firwin(2 * half_width * limit + 1, 1.0 / limit, window=("kaiser", 5.0))
+        h = h * self.up
+        taps = -(-len(h) // self.up)  # ceil
+        h = np.concatenate([h, np.zeros(taps * self.up - len(h))])
+        # bank[fáze, k] = h[fáze + k·up]; k indexuje vstup směrem do minulosti
+        self._bank = h.reshape(taps, self.up).T.astype(np.float32)
+        self._taps = taps
+        self._hist = np.zeros(taps - 1, dtype=np.float32)
+        self._in_total = 0  # zpracované vstupní vzorky
+        self._out_total = 0  # vydané výstupní vzorky
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Převzorkuj další blok (float32), vrať nové výstupní vzorky."""
+        x = np.concatenate([self._hist, block.astype(np.float32, copy=False)])
+        in_end = self._in_total + len(block)
+        # výstupy, jejichž nejnovější potřebný vstup už máme
+        n_out = (in_end * self.up - 1) // self.down + 1 - self._out_total
+        if n_out <= 0:
+            self._advance(x, in_end)
+            return np.zeros(0, dtype=np.float32)
+        pos = (self._out_total + np.arange(n_out)) * self.down
+        newest = pos // self.up  # globální index nejnovějšího vstupu
+        phase = pos % self.up
+        # index do x: x[0] odpovídá globálnímu vstupu in_total - (taps - 1)
+        base = newest - (self._in_total - (self._taps - 1))
+        idx = base[:, None] - np.arange(self._taps)[None, :]
+        out = np.einsum("ij,ij->i", self._bank[phase], x[idx])
+        self._out_total += n_out
+        self._advance(x, in_end)
+        return out.astype(np.float32, copy=False)
+
+    def _advance(self, x: np.ndarray, in_end: int) -> None:
+        self._hist = x[len(x) - (self._taps - 1) :].copy()
+        self._in_total = in_end
+
+
+class CaptureConverter:
+    """Capture blok (int16, nativní frekvence) → (int16, float32) na cílové frekvenci.
+
+    Výstupní pole jsou předalokovaná a znovu použitá; platí do dalšího volání
+    `convert` (sběrnice je hned zkopíruje do kruhových bufferů).
+    """
+
+    def __init__(
+        self,
+        capture_rate: int,
+        target_rate: int,
+        gain: float = 1.0,
+        max_block: int = 4096,
+    ):
+        self.capture_rate = capture_rate
+        self.target_rate = target_rate
+        self.gain = float(gain)
+        self._resampler = (
+            StreamResampler(capture_rate, target_rate)
+            if capture_rate != target_rate
+            else None
+        )
+        self._f32 = np.zeros(max_block, dtype=np.float32)
+        self._i16 = np.zeros(max_block, dtype=np.int16)
+
+    @property
+    def identity(self) -> bool:
+        return self._resampler is None and self.gain == 1.0
+
+    def _ensure(self, n: int) -> None:
+        if n > len(self._f32):
+            self._f32 = np.zeros(n, dtype=np.float32)
+            self._i16 = np.zeros(n, dtype=np.int16)
+
+    def convert(self, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vrať (int16, float32) pohledy do předalokovaných bufferů."""
+        if self._resampler is not None:
+            data = self._resampler.process(samples)
+        else:
+            data = samples
+        n = len(data)
+        self._ensure(n)
+        f32 = self._f32[:n]
+        # int16 → float32 a zesílení v jednom průchodu
+        np.multiply(data, self.gain / 32768.0, out=f32, casting="unsafe")
+        np.clip(f32, -1.0, 32767.0 / 32768.0, out=f32)
+        i16 = self._i16[:n]
+        np.multiply(f32, 32768.0, out=i16, casting="unsafe")
+        return i16, f32
@@ -0,0 +1,115 @@
+"""Offline rozpoznávač povelů s omezenou gramatikou (Vosk/Kaldi).
+
+Slovník `ActionExecutor` je malý a pevný, takže na povely nepotřebujeme
+Whisper ani Google. Vosk s gramatikou zná jen tyto fráze a třídu `[unk]`
+(cokoli jiného). Audio se dekóduje průběžně během zachytávání, takže po
+konci řeči zbývá jen `FinalResult()` (jednotky ms). Promluvy mimo gramatiku
+vrací None a jdou do Whisperu.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+import json
+import logging
+import os
+
+import numpy as np
+
+try:
+    from vosk import KaldiRecognizer, Model, SetLogLevel  # type: ignore
+except ImportError:  # pragma: no cover - volitelná závislost
+    KaldiRecognizer = Model = SetLogLevel = None  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN = "[unk]"
+
+
+@dataclass
+class CommandRecognizerConfig:
+    model_path: str = "models/vosk-model-small-cs-0.4-rhasspy"
+    sample_rate: int = 16000
+    min_confidence: float = 0.7  # průměrná jistota slov pro přijetí povelu
+
+
+class CommandRecognizer:
+    """Streamovaný rozpoznávač frází z pevného slovníku.
+
+    Použití: `reset()` na začátku promluvy, `feed(block)` pro každý blok
+    int16 audia, `result()` po konci řeči vrátí frázi, nebo None (garbage,
+    nízká jistota, ticho). `partial()` hledá frázi už během řeči.
+    """
+
+    def __init__(
+        self, phrases: Iterable[str], cfg: Optional[CommandRecognizerConfig] = None
+    ):
+        if Model is None:
+            raise ImportError("vosk není nainstalován")
+        self.cfg = cfg or CommandRecognizerConfig()
+        self.phrases = sorted({p.strip().lower() for p in phrases if p.strip()})
+        if not os.path.isdir(self.cfg.model_path):
+            # vosk by jinak vyhodil holé Exception("Failed to create a model")
+            raise OSError(f"Vosk model nenalezen: {self.cfg.model_path}")
+        SetLogLevel(-1)
+        self._model = Model(self.cfg.model_path)
+        self._grammar = json.dumps(self.phrases + [UNKNOWN], ensure_ascii=False)
+        self._rec = KaldiRecognizer(self._model, self.cfg.sample_rate, self._grammar)
+        self._rec.SetWords(True)
+        self._segments: List[dict] = []
+
+    def reset(self) -> None:
+        self._rec.Reset()
+        self._segments = []
+
+    def feed(self, block: np.ndarray) -> None:
+        """Dekóduj další blok int16 audia (volá se během zachytávání)."""
+        if self._rec.AcceptWaveform(block.astype(np.int16).tobytes()):
+            # Kaldi uzavřel segment vlastním endpointem – ulož, FinalResult vrací jen poslední
+            self._segments.append(json.loads(self._rec.Result()))
+
+    def partial(self) -> Optional[str]:
+        """Fráze z gramatiky v průběžné hypotéze (bez čekání na konec řeči).
+
+        Průběžné výsledky Vosk nenesou jistotu, proto se hledá jen celé slovo
+        či fráze z gramatiky; vhodné pro krátká klíčová slova (přerušení).
+        """
+        texts = [json.loads(self._rec.PartialResult()).get("partial", "")]
+        if self._segments:
+            texts.append(self._segments[-1].get("text", ""))
+        for text in texts:
+            text = " ".join(text.split())
+            if text in self.phrases:
+                return text
+            for word in text.split():
+                if word in self.phrases:
+                    return word
+        return None
+
+    def result(self) -> Optional[str]:
+        """Fráze z gramatiky, nebo None, pokud promluva mimo gramatiku."""
+        segments = self._segments + [json.loads(self._rec.FinalResult())]
+        self._segments = []
+        words = [w for seg in segments for w in seg.get("result", [])]
+        text = " ".join(seg.get("text", "") for seg in segments).split()
+        if not text or UNKNOWN in text:
+            return None
+        phrase = " ".join(text)
+        conf = float(np.mean([w.get("conf", 1.0) for w in words])) if words else 1.0
+        if phrase not in self.phrases or conf < self.cfg.min_confidence:
+            logger.debug("Povel zamítnut: %r (conf %.2f)", phrase, conf)
+            return None
+        return phrase
+
+
+def create_command_recognizer(
+    phrases: Iterable[str], cfg: Optional[CommandRecognizerConfig] = None
+) -> Optional[CommandRecognizer]:
+    """Vytvoř rozpoznávač, nebo vrať None, pokud chybí vosk či model."""
+    try:
+        return CommandRecognizer(phrases, cfg)
+    except (ImportError, OSError, RuntimeError) as exc:
+        logger.warning("Gramatika povelů nedostupná: %s", exc)
+        return None
@@ -0,0 +1,200 @@
+"""Potlačení ozvěny (AEC) vlastního hlasu Jarvise v capture streamu.
+
+Reproduktor hraje TTS a mikrofon ho slyší zpátky, proto se dřív wake word,
+STT i detekce přerušení na dobu mluvení vypínaly. Přehrávaný signál ale
+známe – `PlaybackEngine` ho přes tap předává sem jako referenci i s časem
+zaznění na DAC. Adaptivní filtr (partitioned-block frequency-domain NLMS,
+PBFDAF) z reference odhaduje cestu reproduktor → místnost → mikrofon a
+odhad ozvěny odečítá od každého capture bloku ještě před zápisem do
+sběrnice. Všichni čtenáři tak dostávají „vyčištěný“ signál.
+
+- zarovnání podle času: vzorek capture se páruje s referencí, která zazněla
+  ve stejnou chvíli (minus `delay_ms`); zbylé zpoždění a dozvuk pokryje
+  délka filtru (`filter_ms`),
+- double-talk (Geigel): když mluví uživatel, filtr se neadaptuje, jen
+  odečítá – řeč uživatele se tak „nenaučí“ jako ozvěna,
+- bez reference (ticho na výstupu) se blok propouští beze změny a bez FFT.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+from src.audio.audio_bus import RingBuffer
+from src.audio.capture_convert import StreamResampler
+
+
+@dataclass
+class EchoCancellerConfig:
+    sample_rate: int = 16000  # frekvence sběrnice (capture po převodu)
+    block: int = 256  # vzorků na krok filtru (16 ms)
+    filter_ms: int = 128  # délka modelované ozvěny (zpoždění + dozvuk)
+    delay_ms: float = 0.0  # pevné zpoždění reference vůči capture
+    step: float = 0.5  # krok NLMS (0–1)
+    smoothing: float = 0.9  # vyhlazení výkonu reference po pásmech
+    dtd_threshold: float = 0.5  # Geigel: |mic| > práh × |ref| → mluví uživatel
+    reference_seconds: float = 2.0  # historie reference
+    resync_ms: float = 5.0  # větší skok času reference = nové ukotvení
+
+
+class EchoCanceller:
+    """PBFDAF nad referencí z přehrávání.
+
+    `feed_reference` volá výstupní callback (vlákno PortAudio), `process`
+    capture vlákno sběrnice. Sdílená je jen kruhová reference (jeden
+    zapisovatel) a čas jejího prvního vzorku.
+    """
+
+    def __init__(self, cfg: Optional[EchoCancellerConfig] = None):
+        self.cfg = cfg or EchoCancellerConfig()
+        n = self.cfg.block
+        self._n = n
+        self._parts = max(1, self.cfg.filter_ms * self.cfg.sample_rate // 1000 // n)
+        bins = n + 1
+        self._w = np.zeros((self._parts, bins), dtype=np.complex128)
+        self._x = np.zeros((self._parts, bins), dtype=np.complex128)
+        self._power = np.zeros(bins)
+        self._x_prev = np.zeros(n)
+        self._peaks: Deque[float] = deque([0.0] * (self._parts + 1), self._parts + 1)
+        self._idle = self._parts + 1  # bloků bez reference po sobě
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._delay = int(round(self.cfg.delay_ms * self.cfg.sample_rate / 1000))
+        self._ref = RingBuffer(
+            int(self.cfg.sample_rate * self.cfg.reference_seconds), dtype=np.float32
+        )
+        self._ref_t0: Optional[float] = None  # kdy zazněl referenční vzorek 0
+        self._ref_in = 0  # vstupních vzorků reference (frekvence výstupu)
+        self._ref_lock = threading.Lock()
+        self._resampler: Optional[StreamResampler] = None
+        self._resampler_rate = 0
+        self.echo_energy = 0.0  # energie mikrofonu v aktivních blocích
+        self.residual_energy = 0.0  # energie po odečtení
+
+    @property
+    def active(self) -> bool:
+        """Filtr právě odečítá (na výstupu nedávno něco hrálo)."""
+        return self._idle <= self._parts
+
+    @property
+    def erle_db(self) -> float:
+        """Kumulativní útlum ozvěny (ERLE) v dB za aktivní bloky."""
+        if self.residual_energy <= 0.0 or self.echo_energy <= 0.0:
+            return 0.0
+        return float(10.0 * np.log10(self.echo_energy / self.residual_energy))
+
+    def feed_reference(
+        self, block: np.ndarray, rate: int, play_time: Optional[float] = None
+    ) -> None:
+        """Zapiš blok, který právě jde na výstup (int16, `rate`).
+
+        `play_time` je perf_counter, kdy zazní první vzorek bloku.
+        """
+        data = np.asarray(block, dtype=np.float32) / 32768.0
+        if rate != self._resampler_rate:
+            self._resampler = (
+                StreamResampler(rate, self.cfg.sample_rate)
+                if rate != self.cfg.sample_rate
+                else None
+            )
+            self._resampler_rate = rate
+            self._ref_in = self._ref.write_pos * rate // self.cfg.sample_rate
+            self._ref_t0 = None
+        if self._resampler is not None:
+            data = self._resampler.process(data)
+        when = time.perf_counter() if play_time is None else play_time
+        # kotva z počtu vstupních vzorků: převzorkování nezanáší zaokrouhlení
+        t0 = when - self._ref_in / rate
+        self._ref_in += len(block)
+        with self._ref_lock:
+            self._ref.write(data)
+            if (
+                self._ref_t0 is None
+                or abs(t0 - self._ref_t0) > self.cfg.resync_ms / 1e3
+            ):
+                self._ref_t0 = t0
+            else:
+                # časy DAC kolísají; pomalu sleduj jen drift hodin
+                self._ref_t0 += 0.01 * (t0 - self._ref_t0)
+
+    def process(
+        self, pcm: np.ndarray, captured_at: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Odečti ozvěnu z capture bloku (int16), vrať (int16, float32).
+
+        `captured_at` je perf_counter posledního vzorku bloku. Zpracovávají se
+        celé kroky filtru; zbytek čeká na další blok (výstup může být o méně
+        než `block` vzorků kratší/delší než vstup).
+        """
+        end_t = time.perf_counter() if captured_at is None else captured_at
+        rate = self.cfg.sample_rate
+        n = self._n
+        d_all = np.concatenate(
+            [self._pending, np.asarray(pcm, dtype=np.float32) / 32768.0]
+        )
+        steps = len(d_all) // n
+        out = np.empty(steps * n, dtype=np.float32)
+        for i in range(steps):
+            start = i * n
+            t_start = end_t - (len(d_all) - 1 - start) / rate
+            out[start : start + n] = self._step(
+                d_all[start : start + n], self._reference(t_start, n)
+            )
+        self._pending = d_all[steps * n :]
+        np.clip(out, -1.0, 32767.0 / 32768.0, out=out)
+        return (out * 32768.0).astype(np.int16), out
+
+    def _reference(self, t_start: float, count: int) -> np.ndarray:
+        """Reference, která zazněla v okně capture bloku začínajícím `t_start`."""
+        out = np.zeros(count)
+        with self._ref_lock:
+            t0 = self._ref_t0
+        if t0 is None:
+            return out
+        pos = int(round((t_start - t0) * self.cfg.sample_rate)) - self._delay
+        if pos + count <= 0:
+            return out
+        data, real = self._ref.read(max(pos, 0), count - max(0, -pos))
+        offset = real - pos
+        if 0 <= offset < count:
+            out[offset : offset + len(data)] = data[: count - offset]
+        return out
+
+    def _step(self, d: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """Jeden krok PBFDAF (overlap-save) pro `block` vzorků."""
+        n = self._n
+        peak = float(np.max(np.abs(x)))
+        self._peaks.append(peak)
+        self._idle = 0 if peak > 0.0 else self._idle + 1
+        if self._idle > self._parts:
+            # celá historie reference je ticho: ozvěna nemůže vzniknout
+            if self._idle == self._parts + 1:
+                self._x[:] = 0.0
+                self._x_prev[:] = 0.0
+            return d
+        spectrum = np.fft.rfft(np.concatenate([self._x_prev, x]))
+        self._x_prev = x
+        self._x = np.roll(self._x, 1, axis=0)
+        self._x[0] = spectrum
+        y = np.fft.irfft((self._w * self._x).sum(axis=0), n=2 * n)[n:]
+        e = d - y
+        self.echo_energy += float(np.dot(d, d))
+        self.residual_energy += float(np.dot(e, e))
+        s = self.cfg.smoothing
+        self._power = s * self._power + (1.0 - s) * (
+            spectrum.real**2 + spectrum.imag**2
+        )
+        # Geigel: mikrofon hlasitější než ozvěna může být → blízká řeč
+        if np.max(np.abs(d)) > self.cfg.dtd_threshold * max(self._peaks):
+            return e
+        err = np.fft.rfft(np.concatenate([np.zeros(n), e]))
+        norm = self._power * self._parts + 1e-6 * 2 * n
+        grad = np.fft.irfft(self._x.conj() * (err / norm), n=2 * n, axis=1)
+        grad[:, n:] = 0.0  # omezení gradientu (lineární, ne cyklická konvoluce)
+        self._w += self.cfg.step * np.fft.rfft(grad, axis=1)
+        return e
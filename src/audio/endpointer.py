@@ -0,0 +1,167 @@
+"""Detekce začátku a konce promluvy nad živými bloky audia.
+
+Endpointer dostává postupně bloky int16 (16 kHz) a hlásí, kdy promluva
+začala (`in_speech`) a kdy skončila (`feed` vrátí True). Používá ho
+streamovací STT, které podle toho řídí částečné a finální přepisy, i
+`recognize_once` při zachytávání povelu.
+
+- `EnergyEndpointer`: RMS proti prahu (chování `sr.Recognizer.listen`),
+- `VadEndpointer`: webrtcvad po 30ms framech s vyhlazením nástupu a
+  hangoverem – v hlučné místnosti nečeká na `phrase_time_limit`.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import Callable, Deque, Optional, Union
+
+import numpy as np
+
+from src.audio.vad_gate import frame_rms
+
+try:
+    import webrtcvad  # type: ignore
+except ImportError:  # pragma: no cover - volitelná závislost
+    webrtcvad = None  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+VAD_RATES = (8000, 16000, 32000, 48000)  # vzorkovací frekvence, které webrtcvad bere
+
+
+class EnergyEndpointer:
+    """Energetický endpointer se stejnými pravidly jako `sr.Recognizer.listen`.
+
+    Řeč začne, když RMS bloku překročí práh; skončí po `pause_s` ticha.
+    Práh se čte přes `threshold_fn` při každém bloku, takže může být dynamický.
+    """
+
+    def __init__(
+        self,
+        threshold_fn: Callable[[], float],
+        pause_s: float = 0.8,
+        sample_rate: int = 16000,
+    ):
+        self._threshold_fn = threshold_fn
+        self._pause_s = pause_s
+        self._rate = sample_rate
+        self.in_speech = False
+        self._silence_s = 0.0
+
+    def reset(self) -> None:
+        self.in_speech = False
+        self._silence_s = 0.0
+
+    def feed(self, block: np.ndarray) -> bool:
+        """Zpracuj blok; vrať True, jakmile promluva skončila."""
+        voiced = frame_rms(block) > self._threshold_fn()
+        if not self.in_speech:
+            self.in_speech = voiced
+            self._silence_s = 0.0
+            return False
+        if voiced:
+            self._silence_s = 0.0
+            return False
+        self._silence_s += len(block) / self._rate
+        return self._silence_s >= self._pause_s
+
+
+class VadEndpointer:
+    """Endpointer nad webrtcvad s vyhlazením a hangoverem.
+
+    Audio se krájí na 30ms framy (zbytek bloku se drží do dalšího volání).
+    Řeč začne, když je v posledních `onset_ms` aspoň `onset_ratio` framů
+    hlasových; skončí po `hangover_ms` souvislého ticha. Hluk bez řeči
+    (ventilátor, hudba v pozadí) tak konec promluvy neoddaluje jako u
+    energetického prahu.
+    """
+
+    def __init__(
+        self,
+        aggressiveness: int = 2,
+        hangover_ms: int = 500,
+        onset_ms: int = 300,
+        onset_ratio: float = 0.6,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+    ):
+        if webrtcvad is None:
+            raise ImportError("webrtcvad není nainstalován")
+        if sample_rate not in VAD_RATES:
+            raise ValueError(f"webrtcvad nepodporuje {sample_rate} Hz")
+        self._vad = webrtcvad.Vad(int(aggressiveness))
+        self._rate = sample_rate
+        self._frame = sample_rate * frame_ms // 1000
+        self._hangover = max(1, hangover_ms // frame_ms)
+        self._onset_ratio = onset_ratio
+        self._onset: Deque[bool] = deque(maxlen=max(1, onset_ms // frame_ms))
+        self._rest = np.zeros(0, dtype=np.int16)
+        self._silent_frames = 0
+        self.in_speech = False
+
+    def reset(self) -> None:
+        self.in_speech = False
+        self._silent_frames = 0
+        self._onset.clear()
+        self._rest = np.zeros(0, dtype=np.int16)
+
+    def _voiced(self, frame: np.ndarray) -> bool:
+        try:
+            return self._vad.is_speech(frame.tobytes(), self._rate)
+        except ValueError:  # pragma: no cover - neplatná délka framu
+            return False
+
+    def feed(self, block: np.ndarray) -> bool:
+        """Zpracuj blok; vrať True, jakmile promluva skončila."""
+        data = np.concatenate([self._rest, block.astype(np.int16)])
+        n = len(data) // self._frame
+        self._rest = data[n * self._frame :]
+        for i in range(n):
+            voiced = self._voiced(data[i * self._frame : (i + 1) * self._frame])
+            if not self.in_speech:
+                self._onset.append(voiced)
+                if len(self._onset) == self._onset.maxlen and sum(
+                    self._onset
+                ) >= self._onset_ratio * len(self._onset):
+                    self.in_speech = True
+                    self._silent_frames = 0
+                continue
+            if voiced:
+                self._silent_frames = 0
+                continue
+            self._silent_frames += 1
+            if self._silent_frames >= self._hangover:
+                return True
+        return False
+
+
+Endpointer = Union[EnergyEndpointer, VadEndpointer]
+
+
+def create_endpointer(
+    mode: str,
+    threshold_fn: Callable[[], float],
+    pause_s: float = 0.8,
+    sample_rate: int = 16000,
+    aggressiveness: int = 2,
+    hangover_ms: Optional[int] = None,
+) -> Endpointer:
+    """Vytvoř endpointer podle `mode` ("vad" | "energy").
+
+    Bez webrtcvad nebo při nepodporované frekvenci se použije energetický.
+    `hangover_ms` None znamená stejnou pauzu jako u energetického (`pause_s`).
+    """
+    if mode == "vad":
+        try:
+            return VadEndpointer(
+                aggressiveness=aggressiveness,
+                hangover_ms=(
+                    int(pause_s * 1000) if hangover_ms is None else int(hangover_ms)
+                ),
+                sample_rate=sample_rate,
+            )
+        except (ImportError, ValueError) as exc:
+            logger.warning("VAD endpointer nelze použít (%s), použiji energii", exc)
+    return EnergyEndpointer(threshold_fn, pause_s=pause_s, sample_rate=sample_rate)
@@ -0,0 +1,127 @@
+"""Optimalizované načtení HF Whisper pipeline pro CPU.
+
+Dva režimy, oba s cache převedeného modelu na disku (převod se platí jednou
+na stroj, další starty jen načtou hotové soubory):
+
+- ``int8``: dynamická kvantizace `torch.nn.Linear` vrstev enkodéru i dekodéru
+  na qint8; kvantizovaný state_dict se při dalších startech načítá přes
+  ``torch.load(mmap=True)``.
+- ``onnx``: export do ONNX přes optimum a běh na onnxruntime; další starty
+  načtou uložený export bez opakovaného převodu.
+"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+from pathlib import Path
+from typing import Tuple
+
+try:
+    import torch  # type: ignore
+    from transformers import (  # type: ignore
+        AutoConfig,
+        AutoModelForSpeechSeq2Seq,
+        AutoProcessor,
+        GenerationConfig,
+        pipeline,
+    )
+except ImportError:  # pragma: no cover - volitelná závislost
+    torch = None  # type: ignore
+    pipeline = None  # type: ignore
+
+try:
+    from optimum.onnxruntime import ORTModelForSpeechSeq2Seq  # type: ignore
+except ImportError:  # pragma: no cover - volitelná závislost
+    ORTModelForSpeechSeq2Seq = None  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+MODES = ("int8", "onnx")
+INT8_WEIGHTS = "model_int8.pt"
+
+
+def cache_path(cache_dir: str, model_name: str, mode: str) -> Path:
+    """Adresář převedeného modelu, např. models/cache/hf/openai__whisper-small-int8."""
+    return Path(cache_dir) / f"{model_name.replace('/', '__')}-{mode}"
+
+
+def _quantize(model):
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def _load_int8(model_name: str, target: Path) -> Tuple[object, object]:
+    weights = target / INT8_WEIGHTS
+    if weights.exists():
+        # architektura z configu, kvantizace struktury, váhy přes mmap
+        processor = AutoProcessor.from_pretrained(target)
+        model = _quantize(
+            AutoModelForSpeechSeq2Seq.from_config(AutoConfig.from_pretrained(target))
+        )
+        model.load_state_dict(torch.load(weights, mmap=True, weights_only=False))
+        model.generation_config = GenerationConfig.from_pretrained(target)
+        return model.eval(), processor
+
+    processor = AutoProcessor.from_pretrained(model_name)
+    model = _quantize(
+        AutoModelForSpeechSeq2Seq.from_pretrained(model_name, torch_dtype=torch.float32)
+    )
+    tmp = _tmp_dir(target)
+    model.config.save_pretrained(tmp)
+    model.generation_config.save_pretrained(tmp)
+    processor.save_pretrained(tmp)
+    torch.save(model.state_dict(), tmp / INT8_WEIGHTS)
+    tmp.rename(target)
+    return model.eval(), processor
+
+
+def _load_onnx(model_name: str, target: Path) -> Tuple[object, object]:
+    if ORTModelForSpeechSeq2Seq is None:
+        raise ImportError("optimum[onnxruntime] není nainstalován")
+    if (target / "config.json").exists():
+        return (
+            ORTModelForSpeechSeq2Seq.from_pretrained(target),
+            AutoProcessor.from_pretrained(target),
+        )
+    model = ORTModelForSpeechSeq2Seq.from_pretrained(model_name, export=True)
+    processor = AutoProcessor.from_pretrained(model_name)
+    tmp = _tmp_dir(target)
+    model.save_pretrained(tmp)
+    processor.save_pretrained(tmp)
+    tmp.rename(target)
+    return ORTModelForSpeechSeq2Seq.from_pretrained(target), processor
+
+
+def _tmp_dir(target: Path) -> Path:
+    """Dočasný adresář vedle cíle – přerušený převod nezanechá rozbitou cache."""
+    tmp = target.with_name(target.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    return tmp
+
+
+def load_optimized_asr(model_name: str, mode: str, cache_dir: str):
+    """Vrať ASR pipeline s int8/ONNX modelem, nebo None (pak běží fp32 pipeline)."""
+    if mode not in MODES or pipeline is None:
+        return None
+    target = cache_path(cache_dir, model_name, mode)
+    try:
+        if not target.exists():
+            logger.info(
+                "⚙️ Převádím %s (%s) do %s – jen poprvé", model_name, mode, target
+            )
+        loader = _load_int8 if mode == "int8" else _load_onnx
+        model, processor = loader(model_name, target)
+        return pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            device=-1,
+        )
+    except (OSError, RuntimeError, ValueError, ImportError) as exc:
+        logger.warning("Optimalizace HF Whisper (%s) selhala: %s", mode, exc)
+        return None
@@ -0,0 +1,24 @@
+"""Výjimky onnxruntime pro moduly, které spouští ONNX modely.
+
+Chyby onnxruntime nedědí z RuntimeError, proto je vyjmenovává `ORT_ERRORS`.
+Bez nainstalovaného onnxruntime zůstanou jen obecné výjimky.
+"""
+
+from __future__ import annotations
+
+try:
+    from onnxruntime.capi import onnxruntime_pybind11_state as _ort_state  # type: ignore
+
+    ORT_ERRORS: tuple = (
+        OSError,
+        RuntimeError,
+        ValueError,
+        _ort_state.Fail,
+        _ort_state.InvalidArgument,
+        _ort_state.InvalidGraph,
+        _ort_state.InvalidProtobuf,
+        _ort_state.NoSuchFile,
+        _ort_state.RuntimeException,
+    )
+except ImportError:  # pragma: no cover - volitelná závislost
+    ORT_ERRORS = (OSError, RuntimeError, ValueError)
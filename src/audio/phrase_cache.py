@@ -0,0 +1,72 @@
+"""Cache syntetizovaných frází (int16 PCM) adresovaná obsahem.
+
+Orchestrátor i `ActionExecutor` opakují stále stejné věty („Ano, poslouchám“,
+„Ztišuji zvuk“ …). Klíč je SHA-1 textu a parametrů hlasu, takže změna hlasu
+nebo rychlosti cache přirozeně zneplatní. Velikost hlídá LRU limit v bajtech;
+známé fráze se předpřipraví při startu a potvrzení pak hraje hned, bez syntézy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+class PhraseCache:
+    """LRU cache `klíč → (pcm, sample_rate)` s limitem `max_bytes`.
+
+    Sdílí ji vlákno syntézy TTS a předpřipravení frází, přístup je pod zámkem.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max(0, int(max_bytes))
+        self._items: "OrderedDict[str, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, voice: Dict[str, object]) -> str:
+        """Klíč z normalizovaného textu a parametrů hlasu."""
+        payload = json.dumps(
+            [" ".join(text.split()), voice], sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Vrať (pcm, rate) a označ položku jako naposledy použitou."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key: str, pcm: np.ndarray, rate: int) -> None:
+        """Ulož frázi; nejdéle nepoužité položky vypadnou nad limitem."""
+        pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+        if pcm.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[0].nbytes
+            self._items[key] = (pcm, int(rate))
+            self.nbytes += pcm.nbytes
+            while self.nbytes > self.max_bytes:
+                _, (evicted, _) = self._items.popitem(last=False)
+                self.nbytes -= evicted.nbytes
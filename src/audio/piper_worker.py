@@ -0,0 +1,128 @@
+"""Trvalý Piper worker: hlas se načte jednou a syntéza běží v procesu.
+
+Spouštět `piper` pro každou větu znamená pokaždé znovu načíst ONNX model
+hlasu, což bývá pomalejší než samotná syntéza. Worker drží `PiperVoice`
+(onnxruntime session) po celou dobu běhu a vrací int16 PCM přímo v paměti,
+bez dočasných WAV souborů. Když inference spadne, hlas se zahodí a načte
+znovu (restart); po `max_restarts` selháních po sobě se worker vzdá a TTS
+se vrátí k jednorázovému procesu `piper`.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from src.audio.onnx_errors import ORT_ERRORS
+
+try:
+    from piper import PiperVoice  # type: ignore
+except ImportError:  # pragma: no cover - volitelná závislost
+    PiperVoice = None  # type: ignore
+
+try:
+    from piper import SynthesisConfig  # type: ignore  # piper-tts >= 1.3
+except ImportError:  # pragma: no cover - starší piper-tts
+    SynthesisConfig = None  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PiperWorkerConfig:
+    model_path: str
+    config_path: Optional[str] = None  # None = <model>.onnx.json
+    speaker_id: Optional[int] = None
+    length_scale: Optional[float] = None  # >1 pomalejší řeč
+    max_restarts: int = 3  # selhání po sobě, po kterých se worker vzdá
+
+
+class PiperWorker:
+    """Piper hlas načtený jednou; `synthesize(text)` vrací int16 PCM.
+
+    Volání jsou serializovaná zámkem (ONNX session sdílí vlákno syntézy TTS
+    i případné předpřipravení frází).
+    """
+
+    def __init__(self, cfg: PiperWorkerConfig):
+        self.cfg = cfg
+        self._voice = None
+        self._lock = threading.RLock()
+        self.failures = 0  # selhání po sobě
+        self.restarts = 0
+
+    @property
+    def available(self) -> bool:
+        return PiperVoice is not None and self.failures < self.cfg.max_restarts
+
+    @property
+    def loaded(self) -> bool:
+        return self._voice is not None
+
+    @property
+    def sample_rate(self) -> int:
+        if self._voice is None:
+            self.load()
+        return int(self._voice.config.sample_rate)
+
+    def load(self) -> None:
+        """Načti hlas (idempotentní); chyby propagují volajícímu."""
+        if PiperVoice is None:
+            raise ImportError("piper-tts není nainstalován")
+        with self._lock:
+            if self._voice is None:
+                self._voice = PiperVoice.load(
+                    self.cfg.model_path, config_path=self.cfg.config_path
+                )
+
+    def stream(self, text: str) -> Iterator[np.ndarray]:
+        """Generuj int16 PCM po větách Piperu (bez zámku a obsluhy chyb)."""
+        if self._voice is None:
+            self.load()
+        if SynthesisConfig is not None and hasattr(self._voice, "synthesize"):
+            syn = SynthesisConfig(
+                speaker_id=self.cfg.speaker_id, length_scale=self.cfg.length_scale
+            )
+            for chunk in self._voice.synthesize(text, syn_config=syn):
+                yield np.asarray(chunk.audio_int16_array, dtype=np.int16)
+            return
+        for raw in self._voice.synthesize_stream_raw(
+            text, speaker_id=self.cfg.speaker_id, length_scale=self.cfg.length_scale
+        ):
+            yield np.frombuffer(raw, dtype=np.int16)
+
+    def synthesize(self, text: str) -> Optional[np.ndarray]:
+        """Celá věta jako int16 PCM; None, pokud syntéza selhala i po restartu."""
+        if not self.available:
+            return None
+        with self._lock:
+            for _ in range(2):
+                try:
+                    chunks: List[np.ndarray] = list(self.stream(text))
+                except ORT_ERRORS + (ImportError,) as exc:
+                    self._restart(exc)
+                    if not self.available:
+                        return None
+                    continue
+                self.failures = 0
+                if not chunks:
+                    return np.zeros(0, dtype=np.int16)
+                return np.concatenate(chunks)
+        return None
+
+    def _restart(self, exc: BaseException) -> None:
+        """Zahoď hlas; další pokus ho načte znovu."""
+        self.failures += 1
+        self.restarts += 1
+        self._voice = None
+        if self.failures >= self.cfg.max_restarts:
+            logger.error(
+                "❌ Piper worker se vzdává po %d selháních: %s", self.failures, exc
+            )
+        else:
+            logger.warning("⚠️ Piper worker spadl (%s), restartuji", exc)
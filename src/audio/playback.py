@@ -0,0 +1,207 @@
+"""Přehrávání PCM v procesu přes trvale otevřený výstupní stream PyAudio.
+
+Místo `paplay`/`aplay`/`espeak` procesu na každou větu (start procesu,
+dočasný WAV v /tmp, `poll()` po 50 ms) běží jediný výstupní stream v callback
+režimu. TTS do něj jen zařadí int16 buffer; callback skládá buffery za sebou
+bez mezer a mezi nimi posílá ticho, takže stream se nikdy nezavírá.
+
+- `stop_all()` zahodí frontu – zvuk utichne do jednoho bloku (~20 ms),
+- `PlaybackHandle.started_at` je odhad času (perf_counter), kdy první vzorek
+  opravdu zazní na DAC (z `output_buffer_dac_time` PortAudio); handle skončí
+  až po zaznění posledního vzorku, ne po jeho předání zařízení,
+- tapy dostávají každý odeslaný blok i s časem zaznění (reference pro AEC).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Optional
+
+import numpy as np
+from scipy.signal import resample_poly
+
+_PA_CONTINUE = 0  # pyaudio.paContinue
+
+
+@dataclass
+class PlaybackConfig:
+    sample_rate: int = 22050  # Piper (medium) i espeak-ng
+    block_size: int = 512
+    device_index: Optional[int] = None  # None = výchozí výstup
+
+
+class PlaybackHandle:
+    """Jeden zařazený buffer; rozhraní `poll()`/`terminate()` jako `subprocess.Popen`.
+
+    TTS smyčka tak čeká na dohrání stejně jako u procesu přehrávače.
+    """
+
+    def __init__(self, pcm: np.ndarray):
+        self.pcm = pcm
+        self.pos = 0
+        self.started_at: Optional[float] = None  # první vzorek na DAC
+        self.ends_at: Optional[float] = None  # poslední vzorek na DAC
+        self.stopped = False
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def stop(self) -> None:
+        """Přeskoč zbytek bufferu (projeví se v příštím bloku callbacku)."""
+        self.stopped = True
+        self._done.set()
+
+    def finish(self) -> None:
+        """Poslední vzorek bufferu už zazněl."""
+        self._done.set()
+
+    def poll(self) -> Optional[int]:
+        return 0 if self.done else None
+
+    def terminate(self) -> None:
+        self.stop()
+
+
+class PlaybackEngine:
+    """Trvalý výstupní stream nad frontou PCM bufferů.
+
+    Očekává externě vytvořený PyAudio (sdílený s AudioBus a wake detektorem).
+    """
+
+    def __init__(self, pyaudio_instance, cfg: Optional[PlaybackConfig] = None):
+        self._pa = pyaudio_instance
+        self.cfg = cfg or PlaybackConfig()
+        self._queue: Deque[PlaybackHandle] = deque()
+        # celé předané zařízení, ale konec ještě nezazněl (výstupní buffer)
+        self._draining: List[PlaybackHandle] = []
+        self._lock = threading.Lock()
+        self._stream = None
+        # (blok int16, frekvence, čas zaznění prvního vzorku); vlákno PortAudio
+        self._taps: List[Callable[[np.ndarray, int, float], None]] = []
+
+    @property
+    def sample_rate(self) -> int:
+        return self.cfg.sample_rate
+
+    @property
+    def active(self) -> bool:
+        return self._stream is not None
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._queue or self._draining)
+
+    def start(self) -> bool:
+        """Otevři výstupní stream v callback režimu. Vrací úspěch."""
+        if self._stream is not None:
+            return True
+        if self._pa is None:
+            return False
+        try:
+            self._stream = self._pa.open(
+                format=self._pa.get_format_from_width(2),
+                channels=1,
+                rate=self.cfg.sample_rate,
+                output=True,
+                output_device_index=self.cfg.device_index,
+                frames_per_buffer=self.cfg.block_size,
+                stream_callback=self._on_audio,
+            )
+        except (OSError, ValueError):  # pragma: no cover - driver chyby
+            self._stream = None
+            return False
+        return True
+
+    def close(self) -> None:
+        self.stop_all()
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except OSError:  # pragma: no cover
+                pass
+            self._stream = None
+
+    def play(self, pcm: np.ndarray, rate: Optional[int] = None) -> PlaybackHandle:
+        """Zařaď int16 mono buffer za ostatní; případně převzorkuj na stream."""
+        data = np.asarray(pcm, dtype=np.int16)
+        if rate and rate != self.cfg.sample_rate and len(data):
+            g = np.gcd(int(rate), self.cfg.sample_rate)
+            data = resample_poly(
+                data.astype(np.float32), self.cfg.sample_rate // g, int(rate) // g
+            )
+            data = np.clip(data, -32768, 32767).astype(np.int16)
+        handle = PlaybackHandle(data)
+        if len(data) == 0:
+            handle.started_at = time.perf_counter()
+            handle.stop()
+            return handle
+        with self._lock:
+            self._queue.append(handle)
+        return handle
+
+    def add_tap(self, callback: Callable[[np.ndarray, int, float], None]) -> None:
+        """Zaregistruj funkci volanou s každým výstupním blokem (i tichem).
+
+        Musí být rychlá a nesmí blokovat, jinak hrozí podtečení výstupu.
+        """
+        self._taps.append(callback)
+
+    def stop_all(self) -> None:
+        """Okamžitě zahoď vše zařazené (přerušení)."""
+        with self._lock:
+            pending = list(self._queue) + self._draining
+            self._queue.clear()
+            self._draining = []
+        for handle in pending:
+            handle.stop()
+
+    def pull(self, frames: int, dac_delay: float = 0.0) -> np.ndarray:
+        """Vrať další blok výstupu (ticho, když není co hrát).
+
+        `dac_delay` je zpoždění od teď do zaznění prvního vzorku bloku; volá
+        callback (případně testy).
+        """
+        out = np.zeros(frames, dtype=np.int16)
+        clock = time.perf_counter()
+        now = clock + dac_delay
+        filled = 0
+        with self._lock:
+            # dřív předané buffery, jejichž konec už zazněl
+            played = [h for h in self._draining if h.ends_at <= clock]
+            self._draining = [h for h in self._draining if h.ends_at > clock]
+            while filled < frames and self._queue:
+                handle = self._queue[0]
+                if handle.stopped:
+                    self._queue.popleft()
+                    continue
+                if handle.started_at is None:
+                    handle.started_at = now + filled / self.cfg.sample_rate
+                n = min(frames - filled, len(handle.pcm) - handle.pos)
+                out[filled : filled + n] = handle.pcm[handle.pos : handle.pos + n]
+                handle.pos += n
+                filled += n
+                if handle.pos >= len(handle.pcm):
+                    self._queue.popleft()
+                    handle.ends_at = now + filled / self.cfg.sample_rate
+                    self._draining.append(handle)
+        for handle in played:
+            handle.finish()
+        for tap in self._taps:
+            tap(out, self.cfg.sample_rate, now)
+        return out
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PyAudio callback – běží ve vlákně PortAudio."""
+        _ = (in_data, status)
+        info = time_info or {}
+        delay = info.get("output_buffer_dac_time", 0.0) - info.get("current_time", 0.0)
+        return self.pull(frame_count, max(0.0, delay)).tobytes(), _PA_CONTINUE
@@ -0,0 +1,232 @@
+"""Neblokující fronta promluv s prioritami a rušením.
+
+`JarvisOrchestrator.speak` dřív blokoval asyncio smyčku po celou dobu
+promluvy (`TextToSpeech.speak` čeká na dohrání). `SpeechQueue` promluvy
+řadí do prioritní fronty a mluví je ve vlastním vlákně; `submit` hned vrací
+`SpeechHandle`, na který lze `await`, synchronně počkat (`wait`) nebo ho
+zrušit (`cancel`). Smyčka mezitím může připravovat další kolo.
+
+- menší číslo = naléhavější; naléhavější promluva přeruší právě mluvenou
+  méně naléhavou (potvrzení předběhne „povídání“),
+- promluva s `max_age` se zahodí, pokud se na ni dostalo pozdě,
+- při stejné prioritě platí pořadí zařazení.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Generator, Iterable, List, Optional
+
+from src.audio.text_to_speech import TextToSpeech
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_URGENT = 0  # potvrzení, varování
+PRIORITY_NORMAL = 10  # odpovědi
+PRIORITY_CHATTER = 20  # doplňkové hlášky, smí zastarat
+
+# výsledek promluvy (hodnota future handle)
+SPOKEN = "spoken"
+INTERRUPTED = "interrupted"  # uživatel nebo naléhavější promluva
+CANCELLED = "cancelled"
+STALE = "stale"
+
+
+class SpeechHandle:
+    """Jedna zařazená promluva: `await handle`, `wait()`, `cancel()`."""
+
+    def __init__(
+        self,
+        text: str,
+        sentences: Optional[Iterable[str]],
+        priority: int,
+        max_age: Optional[float],
+        seq: int,
+    ):
+        self.text = text
+        self.sentences = sentences
+        self.priority = priority
+        self.max_age = max_age
+        self.created_at = time.monotonic()
+        self._seq = seq
+        self._future: Future = Future()
+        self._stop = threading.Event()  # `cancel` předaný TextToSpeech
+        self._cancelled = False
+        self._queue: Optional[SpeechQueue] = None
+
+    def __lt__(self, other: "SpeechHandle") -> bool:
+        return (self.priority, self._seq) < (other.priority, other._seq)
+
+    def __await__(self) -> Generator[Any, None, str]:
+        return asyncio.wrap_future(self._future).__await__()
+
+    @property
+    def done(self) -> bool:
+        return self._future.done()
+
+    @property
+    def result(self) -> Optional[str]:
+        """SPOKEN/INTERRUPTED/CANCELLED/STALE, dokud nedomluví None."""
+        return self._future.result() if self._future.done() else None
+
+    def stale(self, now: Optional[float] = None) -> bool:
+        if self.max_age is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self.created_at > self.max_age
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Synchronně počkej na výsledek; None při timeoutu."""
+        try:
+            return self._future.result(timeout=timeout)
+        except FutureTimeout:
+            return None
+
+    def add_done_callback(self, callback: Callable[["SpeechHandle"], None]) -> None:
+        """Zavolej `callback(handle)` po skončení (ve vlákně fronty)."""
+        self._future.add_done_callback(lambda _f: callback(self))
+
+    def cancel(self) -> bool:
+        """Zruš čekající promluvu nebo utni mluvenou. False, pokud už skončila."""
+        if self._queue is None:
+            return False
+        return self._queue.cancel(self)
+
+    def _finish(self, outcome: str) -> None:
+        if not self._future.done():
+            self._future.set_result(outcome)
+
+    def _close_source(self) -> None:
+        """Nepromluvený zdroj vět (LLM generátor) uzavři, ať negeneruje dál."""
+        close = getattr(self.sentences, "close", None)
+        if close is not None:
+            close()
+
+
+class SpeechQueue:
+    """Prioritní fronta nad `TextToSpeech` s jedním mluvícím vláknem."""
+
+    def __init__(self, tts: TextToSpeech):
+        self._tts = tts
+        self._heap: List[SpeechHandle] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current: Optional[SpeechHandle] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="tts-queue", daemon=True)
+        self._thread.start()
+
+    @property
+    def speaking(self) -> bool:
+        return self._current is not None
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return sum(1 for h in self._heap if not h.done)
+
+    def submit(
+        self,
+        text: str = "",
+        *,
+        sentences: Optional[Iterable[str]] = None,
+        priority: int = PRIORITY_NORMAL,
+        max_age: Optional[float] = None,
+    ) -> SpeechHandle:
+        """Zařaď text (nebo proud vět) a hned vrať handle.
+
+        `max_age` (s) – pokud promluva čeká déle, zahodí se jako STALE.
+        """
+        handle = SpeechHandle(text, sentences, priority, max_age, next(self._seq))
+        handle._queue = self
+        with self._cond:
+            if self._closed:
+                handle._finish(CANCELLED)
+                handle._close_source()
+                return handle
+            heapq.heappush(self._heap, handle)
+            current = self._current
+            if current is not None and priority < current.priority:
+                # event patří jen právě mluvené promluvě – další tím nezasáhne
+                logger.info("⏭️ Přednost: %s", text or "…")
+                current._stop.set()
+            self._cond.notify()
+        return handle
+
+    def cancel(self, handle: SpeechHandle) -> bool:
+        with self._cond:
+            if handle.done:
+                return False
+            handle._cancelled = True
+            if handle is self._current:
+                handle._stop.set()
+                return True
+            if handle in self._heap:
+                self._heap.remove(handle)
+                heapq.heapify(self._heap)
+        handle._finish(CANCELLED)
+        handle._close_source()
+        return True
+
+    def cancel_all(self) -> None:
+        """Zruš vše čekající i právě mluvené."""
+        with self._cond:
+            handles = list(self._heap)
+            if self._current is not None:
+                handles.append(self._current)
+        for handle in handles:
+            handle.cancel()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.cancel_all()
+        self._thread.join(timeout=2.0)
+
+    def _next(self) -> Optional[SpeechHandle]:
+        """Další promluva k mluvení (zastaralé zahodí); None po `close()`."""
+        with self._cond:
+            while True:
+                while not self._heap and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return None
+                handle = heapq.heappop(self._heap)
+                if handle.stale():
+                    logger.info("🗑️ Zastaralá hláška: %s", handle.text or "…")
+                    handle._finish(STALE)
+                    handle._close_source()
+                    continue
+                self._current = handle
+                return handle
+
+    def _run(self) -> None:
+        while True:
+            handle = self._next()
+            if handle is None:
+                return
+            interrupted = False
+            try:
+                if handle.sentences is not None:
+                    interrupted = self._tts.speak_stream(handle.sentences, handle._stop)
+                else:
+                    interrupted = self._tts.speak(handle.text, handle._stop)
+            except Exception:  # pylint: disable=broad-except
+                # jediné mluvící vlákno nesmí umřít – další promluvy by visely
+                logger.exception("❌ TTS selhalo: %s", handle.text or "…")
+                interrupted = True
+            finally:
+                with self._cond:
+                    self._current = None
+                if handle._cancelled:
+                    handle._finish(CANCELLED)
+                else:
+                    handle._finish(INTERRUPTED if interrupted else SPOKEN)
@@ -1,19 +1,32 @@
 """Speech-to-Text (STT) modul.
 
-Primárně používá OpenAI Whisper (lokálně přes balíček whisper) nebo
-transformers ASR. Pokud nic z toho není k dispozici nebo výsledek je
-nekvalitní, padá na Google SpeechRecognition jako zálohu.
+Primárně používá OpenAI Whisper (lokálně přes balíček whisper),
+faster-whisper (CTranslate2, int8 váhy) nebo transformers ASR. Pokud nic
+z toho není k dispozici nebo výsledek je nekvalitní, padá na Google
+SpeechRecognition jako zálohu.
+
+Nad sdílenou sběrnicí umí i streamovaný přepis (`stream_transcribe`), který
+během mluvení vydává částečné hypotézy a na konci promluvy finální text.
 """
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
-from typing import Optional
-import os
-import tempfile
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import logging
+import threading
 
 import numpy as np
 import speech_recognition as sr
+from scipy.signal import resample_poly
+
+from src.audio.audio_bus import BusAudioSource, BusReader
+from src.audio.command_recognizer import CommandRecognizer
+from src.audio.endpointer import Endpointer, create_endpointer
+from src.audio.hf_optimize import MODES, load_optimized_asr
+from src.audio.noise_floor import NoiseFloorEstimator
 
 
 try:
@@ -21,32 +34,190 @@ try:
 except ImportError:
     whisper = None  # type: ignore
 
+try:
+    from faster_whisper import WhisperModel  # type: ignore
+except ImportError:  # pragma: no cover - volitelná závislost
+    WhisperModel = None  # type: ignore
+
 try:
     from transformers import pipeline  # type: ignore
 except ImportError:  # pragma: no cover - volitelná závislost
     pipeline = None  # type: ignore
 
 
+logger = logging.getLogger(__name__)
+
+
+class _PrefixedStream:
+    """Stream, který nejprve vrátí pre-roll a pak čte z původního streamu."""
+
+    def __init__(self, prefix: bytes, inner):
+        self._prefix = prefix
+        self._inner = inner
+
+    def read(self, size: int, *args, **kwargs) -> bytes:
+        if self._prefix:
+            nbytes = size * 2  # int16 mono
+            out, self._prefix = self._prefix[:nbytes], self._prefix[nbytes:]
+            return out
+        return self._inner.read(size, *args, **kwargs)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class _PrerollSource(sr.AudioSource):
+    """Obal audio zdroje, který před živá data vloží pre-roll (int16, 16 kHz)."""
+
+    def __init__(self, inner: sr.AudioSource, preroll: np.ndarray):
+        # záměrně nevoláme super().__init__ (abstraktní, vyhazuje výjimku)
+        self._inner = inner
+        self._preroll = preroll.astype(np.int16).tobytes()
+        self.stream = None
+
+    def __enter__(self) -> "_PrerollSource":
+        src = self._inner.__enter__()
+        self.SAMPLE_RATE = src.SAMPLE_RATE
+        self.SAMPLE_WIDTH = src.SAMPLE_WIDTH
+        self.CHUNK = src.CHUNK
+        self.stream = _PrefixedStream(self._preroll, src.stream)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stream = None
+        self._inner.__exit__(exc_type, exc_value, traceback)
+
+
+class _BusSpan:
+    """Sleduje, zda bloky promluvy tvoří souvislý úsek sběrnice.
+
+    Pokud ano, float32 audio pro Whisper se vezme přímo z float bufferu
+    sběrnice (převedené už při zachycení); jinak se int16 převede tady.
+    """
+
+    def __init__(self, reader: Optional[BusReader]):
+        self._reader = reader
+        self._ok = reader is not None
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+
+    def add(self, start: Optional[int], n: int) -> None:
+        if not self._ok:
+            return
+        if start is None or (self.end is not None and start != self.end):
+            self._ok = False  # pre-roll nebo mezera (zaostalý čtenář)
+            return
+        if self.start is None:
+            self.start = start
+        self.end = start + n
+
+    def float32(self, pcm: np.ndarray) -> np.ndarray:
+        if self._ok and self.start is not None and self._reader is not None:
+            data = self._reader.float_range(self.start, self.end)
+            if data is not None and len(data) == len(pcm):
+                return data
+        return _to_float32(pcm)
+
+
 @dataclass
 class STTConfig:
     language: str = "cs"  # "cs" or locale like "cs-CZ" for Google
-    service: str = "google"  # "google" | "whisper" | "whisper_openai" | "whisper_hf"
-    whisper_model: str = "small"  # openai-whisper
+    # "google" | "whisper" | "whisper_openai" | "whisper_hf" | "faster_whisper"
+    service: str = "google"
+    whisper_model: str = "small"  # openai-whisper / faster-whisper
     hf_model: str = "openai/whisper-small"  # transformers
+    hf_optimize: str = "none"  # "none" | "int8" (dynamická kvantizace) | "onnx"
+    hf_cache_dir: str = "models/cache/hf"  # převedené modely (jednou na stroj)
     device: str = "auto"  # "auto" | "cuda" | "cpu"
     energy_threshold: int = 300
     pause_threshold: float = 0.8
     dynamic_energy: bool = True
+    # faster-whisper (CTranslate2)
+    compute_type: str = "int8"  # int8 | int8_float16 | float16 | float32
+    beam_size: int = 1
+    cpu_threads: int = 0  # 0 = podle CTranslate2 (počet jader)
+    # streamovaný přepis: jak často přepsat rostoucí okno během mluvení
+    partial_interval: float = 0.8
+    # konec promluvy: "energy" (práh RMS jako SR) | "vad" (webrtcvad)
+    endpointer: str = "energy"
+    vad_aggressiveness: int = 2  # webrtcvad 0–3
+    vad_hangover_ms: Optional[int] = None  # None = pause_threshold
+    # kaskáda podle důvěry (výchozí prahy jako ve Whisperu)
+    logprob_threshold: float = -1.0
+    no_speech_threshold: float = 0.6
+    compression_ratio_threshold: float = 2.4
+    # větší model pro nejisté přepisy (např. "medium")
+    retry_model: Optional[str] = None
+    # dvoustupňový přepis: přesný model jen pro promluvy, které jdou do LLM
+    accurate_model: Optional[str] = None
+
+
+@dataclass
+class Hypothesis:
+    """Průběžný (final=False) nebo finální přepis promluvy."""
+
+    text: str
+    final: bool
+    audio_seconds: float
+
+
+@dataclass
+class Transcript:
+    """Výsledek lokálního dekódování s metrikami důvěry (průměr přes segmenty)."""
+
+    text: str
+    avg_logprob: Optional[float] = None
+    no_speech_prob: Optional[float] = None
+    compression_ratio: Optional[float] = None
+    backend: str = ""
+
+    @classmethod
+    def from_segments(
+        cls,
+        text: str,
+        metrics: List[Tuple[Optional[float], Optional[float], Optional[float]]],
+        backend: str = "",
+    ) -> "Transcript":
+        def mean(values: List[Optional[float]]) -> Optional[float]:
+            known = [float(v) for v in values if v is not None]
+            return sum(known) / len(known) if known else None
+
+        ratios = [float(m[2]) for m in metrics if m[2] is not None]
+        return cls(
+            text=(text or "").strip(),
+            avg_logprob=mean([m[0] for m in metrics]),
+            no_speech_prob=mean([m[1] for m in metrics]),
+            compression_ratio=max(ratios) if ratios else None,
+            backend=backend,
+        )
+
+
+def _log_decision(decision: str, result: Transcript) -> None:
+    def fmt(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.2f}"
+
+    logger.info(
+        "🧭 STT %s [%s] logprob=%s no_speech=%s cr=%s: %r",
+        decision,
+        result.backend,
+        fmt(result.avg_logprob),
+        fmt(result.no_speech_prob),
+        fmt(result.compression_ratio),
+        result.text,
+    )
 
 
 class SpeechToText:
     """STT wrapper s více backendy a automatickou degradací.
 
     - Pokud je preferován Whisper a není dostupný, zkusí transformers ASR.
-    - Pokud výsledek není text nebo je prázdný, zkusí Google jako fallback.
+    - Lokální přepis se podle metrik důvěry přijme, zopakuje větším modelem
+      (`retry_model`), nebo zamítne jako ticho/šum.
+    - Google se zkusí jen bez lokálního výsledku nebo u nejistého přepisu.
     """
 
-    def __init__(self, cfg: Optional[STTConfig] = None):
+    def __init__(self, cfg: Optional[STTConfig] = None, defer_load: bool = False):
+        """`defer_load=True` odloží načtení modelů na `load_models()` (např. na pozadí)."""
         self.cfg = cfg or STTConfig()
         self.recognizer = sr.Recognizer()
         self.recognizer.energy_threshold = self.cfg.energy_threshold
@@ -60,12 +231,44 @@ class SpeechToText:
         except (AttributeError, ValueError, TypeError):  # pragma: no cover
             pass
         self._whisper_model = None
+        self._faster_model = None
         self._hf_pipe = None
+        # backend → model, který se skutečně načetl (na CPU třeba "tiny")
+        self._model_names: Dict[str, str] = {}
+        # větší modely (retry/přesný přepis) načtené líně, klíčem je název modelu
+        self._extra_models: Dict[str, Tuple[str, object]] = {}
+        self._extra_lock = threading.Lock()
+        # poslední finální promluva (float32 16 kHz) pro přesnější přepis
+        self.last_audio: Optional[np.ndarray] = None
+        self._last_model = ""
+        self._noise_floor: Optional[NoiseFloorEstimator] = None
+        self._commands: Optional[CommandRecognizer] = None
+        if not defer_load:
+            self.load_models()
 
+    def load_models(self) -> None:
+        """Načti lokální modely podle `cfg.service` (blokující, i desítky sekund)."""
         # Init backend according to service preference (prefer faster models on CPU)
         service = (self.cfg.service or "google").lower()
         use_cuda = self.cfg.device == "cuda"
 
+        if service == "faster_whisper":
+            if WhisperModel is not None:
+                try:
+                    # int8 váhy jsou na CPU dost rychlé i pro "small" – bez downgrade
+                    self._faster_model = WhisperModel(
+                        self.cfg.whisper_model,
+                        device="cuda" if use_cuda else "cpu",
+                        compute_type=self.cfg.compute_type,
+                        cpu_threads=max(0, int(self.cfg.cpu_threads)),
+                    )
+                    self._model_names["faster_whisper"] = self.cfg.whisper_model
+                except (RuntimeError, OSError, ValueError):
+                    self._faster_model = None
+            if self._faster_model is None:
+                # bez faster-whisper zkus stejný řetězec jako "whisper"
+                service = "whisper"
+
         if service in ("whisper", "whisper_openai") and whisper is not None:
             try:
                 # On CPU prefer a smaller model for latency
@@ -80,13 +283,30 @@ class SpeechToText:
                 self._whisper_model = whisper.load_model(
                     selected_whisper_model, device=device
                 )  # type: ignore[arg-type]
+                self._model_names["whisper"] = selected_whisper_model
             except (RuntimeError, OSError, ValueError):
                 self._whisper_model = None
                 # If generic "whisper" requested, try HF as next
                 if service == "whisper":
                     service = "whisper_hf"
 
-        if service in ("whisper", "whisper_hf") and pipeline is not None:
+        if (
+            service in ("whisper", "whisper_hf")
+            and not use_cuda
+            and self.cfg.hf_optimize in MODES
+        ):
+            # int8/ONNX na CPU: nastavený model bez downgrade na tiny
+            self._hf_pipe = load_optimized_asr(
+                self.cfg.hf_model, self.cfg.hf_optimize, self.cfg.hf_cache_dir
+            )
+            if self._hf_pipe is not None:
+                self._model_names["hf"] = self.cfg.hf_model
+
+        if (
+            service in ("whisper", "whisper_hf")
+            and pipeline is not None
+            and self._hf_pipe is None
+        ):
             try:
                 dev = 0 if use_cuda else -1
                 selected_hf_model = self.cfg.hf_model
@@ -97,74 +317,557 @@ class SpeechToText:
                     model=selected_hf_model,
                     device=dev,
                 )
+                self._model_names["hf"] = selected_hf_model
             except (OSError, ValueError, ImportError):
                 self._hf_pipe = None
 
+    def warmup(self) -> None:
+        """Zahřívací přepis krátkého ticha (alokace, JIT kernely, cache)."""
+        if all(
+            m is None for m in (self._faster_model, self._whisper_model, self._hf_pipe)
+        ):
+            return
+        self._transcribe_array(np.zeros(16000, dtype=np.float32), partial=True)
+
+    def set_noise_floor(self, estimator: Optional[NoiseFloorEstimator]) -> None:
+        """Použij průběžný odhad šumu místo kalibrace před každou promluvou."""
+        self._noise_floor = estimator
+        if estimator is not None:
+            # práh řídí odhad pozadí, SR ho nemá posouvat sám
+            self.recognizer.dynamic_energy_threshold = False
+
+    def set_command_recognizer(self, recognizer: Optional[CommandRecognizer]) -> None:
+        """Offline gramatika povelů: rozpoznané povely obejdou Whisper i Google."""
+        self._commands = recognizer
+
+    def _grammar_for(self, sample_rate: int) -> Optional[CommandRecognizer]:
+        """Gramatika pro průběžné krmení během zachytávání (jen při shodné frekvenci)."""
+        if self._commands is None or self._commands.cfg.sample_rate != sample_rate:
+            return None
+        return self._commands
+
+    def _command_result(self, pcm: np.ndarray, streamed: bool) -> Optional[str]:
+        """Povel z gramatiky pro promluvu (int16 16 kHz), nebo None."""
+        if self._commands is None:
+            return None
+        if not streamed:
+            self._commands.reset()
+            self._commands.feed(pcm)
+        command = self._commands.result()
+        if command:
+            logger.info("⚡ Povel z gramatiky: %s", command)
+        return command
+
+    def _energy_threshold(self) -> float:
+        if self._noise_floor is not None:
+            return self._noise_floor.threshold()
+        return float(self.recognizer.energy_threshold)
+
+    def _make_endpointer(self, sample_rate: int) -> Endpointer:
+        return create_endpointer(
+            self.cfg.endpointer,
+            self._energy_threshold,
+            pause_s=float(self.recognizer.pause_threshold),
+            sample_rate=sample_rate,
+            aggressiveness=self.cfg.vad_aggressiveness,
+            hangover_ms=self.cfg.vad_hangover_ms,
+        )
+
     def recognize_once(
         self,
         device_index: Optional[int] = None,
         timeout: Optional[float] = None,
         phrase_time_limit: Optional[float] = None,
+        source: Optional[sr.AudioSource] = None,
+        preroll: Optional[np.ndarray] = None,
     ) -> Optional[str]:
-        """Počkej na řeč z mikrofonu a vrať text (nebo None)."""
-        mic = sr.Microphone(device_index=device_index)
+        """Počkej na řeč z mikrofonu a vrať text (nebo None).
+
+        `source` umožní číst ze sdílené sběrnice (`BusAudioSource`) místo
+        otevírání nového `sr.Microphone` na `device_index`. `preroll` (int16,
+        16 kHz) je audio zachycené před začátkem poslechu, použije se jako
+        začátek promluvy.
+        """
+        use_vad = self.cfg.endpointer == "vad"
+        if source is not None:
+            mic = source
+        else:
+            mic = sr.Microphone(
+                device_index=device_index,
+                sample_rate=16000 if preroll is not None or use_vad else None,
+            )
+        if preroll is not None and len(preroll):
+            mic = _PrerollSource(mic, preroll)
         try:
-            with mic as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
-                audio = self.recognizer.listen(
-                    source, timeout=timeout, phrase_time_limit=phrase_time_limit
-                )
+            with mic as src:
+                if self._noise_floor is not None:
+                    # práh z průběžného odhadu – bez 0.3 s kalibrace
+                    self.recognizer.energy_threshold = self._noise_floor.threshold()
+                elif not isinstance(mic, _PrerollSource):
+                    # s pre-rollem by kalibrace spolkla začátek povelu jako šum
+                    self.recognizer.adjust_for_ambient_noise(src, duration=0.3)
+                grammar = self._grammar_for(int(src.SAMPLE_RATE)) if use_vad else None
+                audio_f32 = None
+                if use_vad:
+                    audio, audio_f32 = self._capture(
+                        src, timeout, phrase_time_limit, grammar
+                    )
+                else:
+                    audio = self.recognizer.listen(
+                        src, timeout=timeout, phrase_time_limit=phrase_time_limit
+                    )
         except sr.WaitTimeoutError:
             return None
+        if audio is None:
+            return None
 
-        # 1) openai-whisper lokálně (preferováno kvůli rychlosti na CPU)
-        if self._whisper_model is not None:
-            try:
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-                    f.write(audio.get_wav_data())
-                    tmp_path = f.name
-                try:
-                    # Whisper očekává ISO kód jazyka, pro cs-CZ mapuj na cs
-                    lang = self.cfg.language
-                    if lang.lower() in ("cs-cz", "cs_cz"):
-                        lang = "cs"
-                    result = self._whisper_model.transcribe(tmp_path, language=lang)
-                    text = (result or {}).get("text", "").strip()
-                    if text:
-                        return text
-                finally:
-                    try:
-                        os.unlink(tmp_path)
-                    except OSError:
-                        pass
-            except (RuntimeError, OSError, ValueError):
-                pass
+        # 1) lokální Whisper (faster/openai/HF) – přímo z paměti: PCM se
+        # jednou převede na float32 16 kHz, bez dočasného WAV a ffmpeg dekódování
+        pcm = np.frombuffer(
+            audio.get_raw_data(convert_rate=16000, convert_width=2), dtype=np.int16
+        )
+        self.last_audio = audio_f32 if audio_f32 is not None else _to_float32(pcm)
+        # 0) povel z offline gramatiky – dekódovaný už během zachytávání
+        command = self._command_result(pcm, streamed=grammar is not None)
+        if command:
+            return command
+        text = self._transcribe_array(self.last_audio)
+        if text is None:
+            return None  # zamítnuto kaskádou (ticho/šum) – Google už nezkoušet
+        if text:
+            return text
+
+        # 2) Fallback: Google online API
+        try:
+            lang = self.cfg.language
+            if lang == "cs":
+                lang = "cs-CZ"
+            return self.recognizer.recognize_google(audio, language=lang)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError:
+            return None
+
+    def _capture(
+        self,
+        src: sr.AudioSource,
+        timeout: Optional[float],
+        phrase_time_limit: Optional[float],
+        grammar: Optional[CommandRecognizer] = None,
+    ) -> Tuple[Optional[sr.AudioData], Optional[np.ndarray]]:
+        """Zachyť jednu promluvu ze zdroje s endpointerem (náhrada `listen`).
 
-        # 2) HF transformers Whisper
+        Vrací (audio, float32 ze sběrnice nebo None); audio je None, pokud řeč
+        nezačne do `timeout` sekund nebo zdroj skončí. `grammar` dostává
+        bloky promluvy průběžně, takže výsledek povelu je hotový hned po
+        konci řeči.
+        """
+        rate = int(src.SAMPLE_RATE)
+        if src.SAMPLE_WIDTH != 2:
+            audio = self.recognizer.listen(
+                src, timeout=timeout, phrase_time_limit=phrase_time_limit
+            )
+            return audio, None
+        endpointer = self._make_endpointer(rate)
+        if grammar is not None:
+            grammar.reset()
+        # přímo ze sběrnice (bez pre-rollu) lze float32 vzít z jejího bufferu
+        reader = src.reader if isinstance(src, BusAudioSource) else None
+        span = _BusSpan(reader)
+        # ~0.3 s před nástupem řeči, ať se neuřízne první hláska
+        lead: Deque[Tuple[np.ndarray, Optional[int]]] = deque(
+            maxlen=max(1, int(0.3 * rate / src.CHUNK) + 1)
+        )
+        chunks: List[np.ndarray] = []
+        waited = 0.0
+        speech_s = 0.0
+        while True:
+            raw = src.stream.read(src.CHUNK)
+            if not raw:
+                break
+            data = np.frombuffer(raw, dtype=np.int16)
+            start = reader.position - len(data) if reader is not None else None
+            seconds = len(data) / rate
+            was_speaking = endpointer.in_speech
+            ended = endpointer.feed(data)
+            if not endpointer.in_speech:
+                lead.append((data, start))
+                waited += seconds
+                if timeout is not None and waited >= timeout:
+                    return None, None
+                continue
+            if not was_speaking:
+                for lead_data, lead_start in lead:
+                    chunks.append(lead_data)
+                    span.add(lead_start, len(lead_data))
+                    if grammar is not None:
+                        grammar.feed(lead_data)
+                lead.clear()
+            chunks.append(data)
+            span.add(start, len(data))
+            if grammar is not None:
+                grammar.feed(data)
+            speech_s += seconds
+            if ended or (phrase_time_limit and speech_s >= phrase_time_limit):
+                break
+        if not chunks:
+            return None, None
+        pcm = np.concatenate(chunks)
+        audio = sr.AudioData(pcm.tobytes(), rate, 2)
+        return audio, (span.float32(pcm) if rate == 16000 else None)
+
+    # ---- přepis z paměti ---------------------------------------------------------
+    def _whisper_language(self) -> str:
+        """Whisper očekává ISO kód jazyka, pro cs-CZ mapuj na cs."""
+        lang = self.cfg.language
+        if lang.lower() in ("cs-cz", "cs_cz"):
+            lang = "cs"
+        return lang
+
+    def _transcribe_array(
+        self, audio: np.ndarray, partial: bool = False
+    ) -> Optional[str]:
+        """Přepiš float32 audio (16 kHz, -1..1) lokálním modelem.
+
+        Pole jde přímo do `whisper.transcribe` (log-mel se počítá z paměti,
+        žádný ffmpeg). Pro částečné hypotézy se vypíná teplotní fallback, aby
+        přepis stíhal. Finální přepis prochází kaskádou podle důvěry:
+        vrací text (přijato), None (zamítnuto – ticho/šum, nic dalšího už
+        nezkoušet) nebo "" (lokálně bez výsledku – zkus Google).
+        """
+        result = self._decode_local(audio, partial)
+        if partial:
+            return result.text if result is not None else ""
+        return self._cascade(audio, result)
+
+    def _decode_local(self, audio: np.ndarray, partial: bool) -> Optional[Transcript]:
+        """První lokální backend, který dekódování zvládl (i s prázdným textem)."""
+        if self._faster_model is not None:
+            result = self._decode_faster(self._faster_model, audio, partial)
+            if result is not None:
+                return result
+        if self._whisper_model is not None:
+            result = self._decode_whisper(self._whisper_model, audio, partial)
+            if result is not None:
+                return result
         if self._hf_pipe is not None:
             try:
-                wav_bytes = audio.get_wav_data(convert_rate=16000, convert_width=2)
-                np_audio = (
-                    np.frombuffer(wav_bytes, dtype=np.int16).astype(np.float32)
-                    / 32768.0
-                )
                 res = self._hf_pipe(
-                    {"array": np_audio, "sampling_rate": 16000},
+                    {"array": audio, "sampling_rate": 16000},
                     generate_kwargs={"language": "cs", "task": "transcribe"},
                 )
-                text = (res.get("text") if isinstance(res, dict) else str(res)).strip()
-                if text:
-                    return text
+                text = res.get("text") if isinstance(res, dict) else str(res)
+                # HF pipeline metriky důvěry nevrací
+                return Transcript(text=(text or "").strip(), backend="hf")
             except (RuntimeError, OSError, ValueError):
                 pass
+        return None
 
-        # 3) Fallback: Google online API
+    def _decode_whisper(
+        self, model, audio: np.ndarray, partial: bool
+    ) -> Optional[Transcript]:
+        kwargs = {
+            "language": self._whisper_language(),
+            "fp16": self.cfg.device == "cuda",
+        }
+        if partial:
+            kwargs.update(temperature=0.0, condition_on_previous_text=False)
         try:
-            lang = self.cfg.language
-            if lang == "cs":
-                lang = "cs-CZ"
-            return self.recognizer.recognize_google(audio, language=lang)
-        except sr.UnknownValueError:
+            result = model.transcribe(audio, **kwargs) or {}
+        except (RuntimeError, OSError, ValueError):
             return None
-        except sr.RequestError:
+        segments = result.get("segments") or []
+        return Transcript.from_segments(
+            result.get("text", ""),
+            [
+                (
+                    s.get("avg_logprob"),
+                    s.get("no_speech_prob"),
+                    s.get("compression_ratio"),
+                )
+                for s in segments
+            ],
+            backend="whisper",
+        )
+
+    def _decode_faster(
+        self, model, audio: np.ndarray, partial: bool
+    ) -> Optional[Transcript]:
+        """Přepis přes faster-whisper; segmenty se spojí do jednoho textu."""
+        kwargs = {
+            "language": self._whisper_language(),
+            "beam_size": 1 if partial else max(1, int(self.cfg.beam_size)),
+        }
+        if partial:
+            kwargs.update(temperature=0.0, condition_on_previous_text=False)
+        try:
+            segments, _info = model.transcribe(audio, **kwargs)
+            # segments je generátor – dekódování proběhne až při iteraci
+            segments = list(segments)
+        except (RuntimeError, OSError, ValueError):
+            return None
+        return Transcript.from_segments(
+            " ".join(seg.text.strip() for seg in segments),
+            [
+                (
+                    getattr(seg, "avg_logprob", None),
+                    getattr(seg, "no_speech_prob", None),
+                    getattr(seg, "compression_ratio", None),
+                )
+                for seg in segments
+            ],
+            backend="faster_whisper",
+        )
+
+    # ---- kaskáda podle důvěry ----------------------------------------------------
+    def _assess(self, result: Transcript) -> str:
+        """Rozhodni o přepisu: "accept" | "retry" | "reject".
+
+        Pravidla odpovídají heuristikám Whisperu: vysoká `no_speech_prob`
+        s nízkou pravděpodobností textu je ticho/šum, vysoký kompresní
+        poměr značí opakující se halucinaci, nízká `avg_logprob` nejistý
+        přepis. Bez metrik (HF pipeline) se neprázdný text přijme.
+        """
+        cfg = self.cfg
+        if not result.text:
+            return "reject"
+        low_logprob = (
+            result.avg_logprob is not None
+            and result.avg_logprob < cfg.logprob_threshold
+        )
+        if (
+            result.no_speech_prob is not None
+            and result.no_speech_prob >= cfg.no_speech_threshold
+            and (result.avg_logprob is None or low_logprob)
+        ):
+            return "reject"
+        if (
+            result.compression_ratio is not None
+            and result.compression_ratio > cfg.compression_ratio_threshold
+        ):
+            return "retry"
+        if low_logprob:
+            return "retry"
+        return "accept"
+
+    def _cascade(
+        self, audio: np.ndarray, result: Optional[Transcript]
+    ) -> Optional[str]:
+        # přesný přepis se přeskočí jen po modelu, který text opravdu vytvořil
+        self._last_model = ""
+        if result is None:
+            return ""
+        self._last_model = self._model_names.get(result.backend, "")
+        decision = self._assess(result)
+        _log_decision(decision, result)
+        if decision == "accept":
+            return result.text
+        if decision == "reject":
+            return None
+        # nejistý přepis: jednou zkus větší model, jinak nech rozhodnout Google
+        retry = self._decode_extra(self.cfg.retry_model, audio)
+        if retry is None:
+            return ""
+        decision = self._assess(retry)
+        _log_decision(decision, retry)
+        if decision == "accept":
+            self._last_model = self.cfg.retry_model or ""
+            return retry.text
+        if decision == "reject":
             return None
+        return ""
+
+    def _decode_extra(
+        self, name: Optional[str], audio: np.ndarray
+    ) -> Optional[Transcript]:
+        """Přepis větším modelem `name`, načteným až při první potřebě."""
+        primary = "faster_whisper" if self._faster_model is not None else "whisper"
+        if not name or name == self._model_names.get(primary):
+            return None
+        kind, model = self.load_extra_model(name)
+        if model is None:
+            return None
+        if kind == "faster_whisper":
+            return self._decode_faster(model, audio, partial=False)
+        return self._decode_whisper(model, audio, partial=False)
+
+    def load_extra_model(self, name: str) -> Tuple[str, object]:
+        """Načti (jednou) větší model stejného typu jako primární backend."""
+        with self._extra_lock:
+            if name not in self._extra_models:
+                self._extra_models[name] = self._load_extra_model(name)
+            return self._extra_models[name]
+
+    def _load_extra_model(self, name: str) -> Tuple[str, object]:
+        use_cuda = self.cfg.device == "cuda"
+        try:
+            if self._faster_model is not None:
+                return "faster_whisper", WhisperModel(
+                    name,
+                    device="cuda" if use_cuda else "cpu",
+                    compute_type=self.cfg.compute_type,
+                    cpu_threads=max(0, int(self.cfg.cpu_threads)),
+                )
+            if whisper is not None:
+                return "whisper", whisper.load_model(
+                    name, device="cuda" if use_cuda else None
+                )
+        except (RuntimeError, OSError, ValueError) as exc:
+            logger.warning("Model %s nelze načíst: %s", name, exc)
+        return "", None
+
+    # ---- dvoustupňový přepis -----------------------------------------------------
+    def redecode_accurate(self) -> Optional[str]:
+        """Přepiš poslední promluvu přesným modelem (`accurate_model`).
+
+        Rychlý model stačí na povely; orchestrátor volá tuto metodu jen pro
+        promluvy, které propadnou do LLM. Vrací None, pokud přesný model
+        není nastaven/dostupný, promluvu už přepsal, nebo ji zamítl.
+        """
+        name = self.cfg.accurate_model
+        if self.last_audio is None or not name or name == self._last_model:
+            return None
+        result = self._decode_extra(name, self.last_audio)
+        if result is None:
+            return None
+        decision = self._assess(result)
+        _log_decision(f"accurate/{decision}", result)
+        return result.text if decision != "reject" else None
+
+    def _recognize_google_pcm(self, pcm: np.ndarray) -> str:
+        """Záložní Google přepis int16 PCM (16 kHz); "" při neúspěchu."""
+        lang = self.cfg.language
+        if lang == "cs":
+            lang = "cs-CZ"
+        try:
+            audio = sr.AudioData(pcm.astype(np.int16).tobytes(), 16000, 2)
+            return self.recognizer.recognize_google(audio, language=lang) or ""
+        except (sr.UnknownValueError, sr.RequestError):
+            return ""
+
+    # ---- streamovaný přepis ------------------------------------------------------
+    def stream_transcribe(
+        self,
+        reader: BusReader,
+        timeout: Optional[float] = None,
+        phrase_time_limit: Optional[float] = None,
+        preroll: Optional[np.ndarray] = None,
+    ) -> Iterator[Hypothesis]:
+        """Přepisuj živé audio ze sběrnice během mluvení.
+
+        Každých `partial_interval` sekund řeči se přepíše celé dosud zachycené
+        okno a vydá se částečná hypotéza (jen pokud se text změnil). Po konci
+        promluvy se vydá finální hypotéza. Bez řeči do `timeout` sekund
+        generátor skončí bez výsledku. Sběrnici s jinou frekvencí než 16 kHz
+        čte nativně (endpointer), Whisper a gramatika dostanou převzorkované
+        audio.
+        """
+        rate = reader.sample_rate
+        block = rate // 10  # 100 ms
+        endpointer = self._make_endpointer(rate)
+        grammar = self._grammar_for(rate)
+        if grammar is not None:
+            grammar.reset()
+        span = _BusSpan(reader)
+        # kousek ticha před nástupem řeči, ať se neuřízne první hláska
+        lead: Deque[Tuple[np.ndarray, Optional[int]]] = deque(maxlen=3)
+        chunks: List[np.ndarray] = []
+        waited = 0.0
+        speech_s = 0.0
+        next_partial = self.cfg.partial_interval
+        last_text = ""
+
+        pending = []
+        if preroll is not None and len(preroll):
+            pending = [preroll[i : i + block] for i in range(0, len(preroll), block)]
+        while True:
+            if pending:
+                data, start = pending.pop(0), None
+            else:
+                data = reader.read(block, timeout=2.0)
+                if data is None:
+                    break
+                start = reader.position - len(data)
+            was_speaking = endpointer.in_speech
+            ended = endpointer.feed(data)
+            if not endpointer.in_speech:
+                lead.append((data, start))
+                waited += len(data) / rate
+                if timeout is not None and waited >= timeout:
+                    return
+                continue
+            if not was_speaking:
+                for lead_block, lead_start in lead:
+                    chunks.append(lead_block)
+                    span.add(lead_start, len(lead_block))
+                    if grammar is not None:
+                        grammar.feed(lead_block)
+                lead.clear()
+            chunks.append(data)
+            span.add(start, len(data))
+            if grammar is not None:
+                grammar.feed(data)
+            speech_s += len(data) / rate
+            if ended or (phrase_time_limit and speech_s >= phrase_time_limit):
+                break
+            if speech_s >= next_partial:
+                next_partial = speech_s + self.cfg.partial_interval
+                text = self._transcribe_array(
+                    _resample_16k(span.float32(np.concatenate(chunks)), rate), True
+                )
+                if text and text != last_text:
+                    last_text = text
+                    yield Hypothesis(text=text, final=False, audio_seconds=speech_s)
+
+        if not chunks:
+            return
+        raw = np.concatenate(chunks)
+        seconds = len(raw) / rate
+        self.last_audio = _resample_16k(span.float32(raw), rate)
+        pcm = _resample_16k(raw, rate)
+        command = self._command_result(pcm, streamed=grammar is not None)
+        if command:
+            yield Hypothesis(text=command, final=True, audio_seconds=seconds)
+            return
+        text = self._transcribe_array(self.last_audio)
+        if text == "":
+            text = self._recognize_google_pcm(pcm)
+        if text:
+            yield Hypothesis(text=text, final=True, audio_seconds=seconds)
+
+    async def astream_transcribe(
+        self, reader: BusReader, **kwargs
+    ) -> AsyncIterator[Hypothesis]:
+        """Asynchronní varianta `stream_transcribe` (přepis běží ve vlákně)."""
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Optional[Hypothesis]]" = asyncio.Queue()
+
+        def worker() -> None:
+            try:
+                for hyp in self.stream_transcribe(reader, **kwargs):
+                    loop.call_soon_threadsafe(queue.put_nowait, hyp)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        threading.Thread(target=worker, name="stt-stream", daemon=True).start()
+        while True:
+            hyp = await queue.get()
+            if hyp is None:
+                return
+            yield hyp
+
+
+def _resample_16k(audio: np.ndarray, rate: int) -> np.ndarray:
+    """Převzorkuj audio (int16 i float32) na 16 kHz, které čeká Whisper; dtype zachová."""
+    if rate == 16000 or not len(audio):
+        return audio
+    g = np.gcd(int(rate), 16000)
+    out = resample_poly(audio.astype(np.float32), 16000 // g, int(rate) // g)
+    if audio.dtype == np.int16:
+        return np.clip(out, -32768, 32767).astype(np.int16)
+    return out.astype(np.float32)
+
+
+def _to_float32(pcm: np.ndarray) -> np.ndarray:
+    """int16 PCM → float32 v rozsahu -1..1 (formát, který čeká Whisper)."""
+    return pcm.astype(np.float32) / 32768.0
@@ -1,22 +1,188 @@
 """Text-to-Speech modul pro Jarvis.
 
-Podporuje backendy: Piper (preferovaný, pokud je k dispozici model), espeak-ng/espeak
-nebo spd-say. Přerušení hlasem je ve výchozím stavu vypnuté, aby se Jarvis
-nepřerušoval vlastním hlasem.
+Podporuje backendy: Piper (preferovaný, pokud je k dispozici model; hlas
+drží trvalý worker v procesu), espeak-ng/espeak nebo spd-say. Přerušení
+hlasem je ve výchozím stavu vypnuté, aby se Jarvis nepřerušoval vlastním hlasem.
 """
 
 from __future__ import annotations
 
-from typing import Optional, Sequence
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import io
+import logging
 import os
+import queue
 import re
 import shutil
 import subprocess
 import tempfile
+import threading
 import time
+import wave
 
+import numpy as np
 import speech_recognition as sr
 
+from src.audio.barge_in import BargeInDetector
+from src.audio.noise_floor import NoiseFloorEstimator
+from src.audio.onnx_errors import ORT_ERRORS
+from src.audio.phrase_cache import PhraseCache
+from src.audio.piper_worker import PiperWorker, PiperWorkerConfig
+from src.audio.playback import PlaybackEngine, PlaybackHandle
+
+
+logger = logging.getLogger(__name__)
+
+# běžící přehrávání: proces přehrávače, nebo buffer v PlaybackEngine
+Playing = Union[subprocess.Popen, PlaybackHandle]
+
+
+@dataclass
+class _Clip:
+    """Věta připravená k přehrání."""
+
+    text: str
+    wav_path: Optional[str] = None  # syntetizovaný WAV (Piper), jinak přímé přehrání
+    failed: bool = False  # syntéza selhala – jen simulace délky
+    pcm: Optional[np.ndarray] = None  # int16 z Piper workeru (bez souboru)
+    sample_rate: int = 0
+
+
+_END = object()  # konec fronty klipů
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _discard(item) -> None:
+    """Ukliď dočasný WAV klipu (ostatní položky fronty ignoruj)."""
+    if isinstance(item, _Clip) and item.wav_path:
+        _unlink(item.wav_path)
+        item.wav_path = None
+
+
+def _feed_stdin(proc: subprocess.Popen, data: bytes) -> None:
+    try:
+        proc.stdin.write(data)
+        proc.stdin.close()
+    except (OSError, ValueError):
+        # přehrávač ukončen (přerušení) – zbytek dat se zahodí
+        pass
+
+
+def _put_unless(q: "queue.Queue", item, stop: threading.Event) -> bool:
+    """Vlož do omezené fronty; vrať False, pokud mezitím přišel `stop`."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.05)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def split_sentences(text: str) -> List[str]:
+    """Rozděl text na věty a zachovej interpunkci."""
+    sentences = [
+        s.strip() for s in re.split(r"([.!?…]+)\s+", text) if s and not s.isspace()
+    ]
+    chunks: List[str] = []
+    i = 0
+    while i < len(sentences):
+        if i + 1 < len(sentences) and re.match(r"[.!?…]+", sentences[i + 1]):
+            chunks.append(sentences[i] + sentences[i + 1])
+            i += 2
+        else:
+            chunks.append(sentences[i])
+            i += 1
+    return chunks
+
+
+def _wav_to_pcm(data: bytes) -> Optional[Tuple[np.ndarray, int]]:
+    """WAV v paměti (16bit mono) → (int16 PCM, rate)."""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                return None
+            rate = wf.getframerate()
+            # espeak --stdout nezná délku předem, čti do konce dat
+            raw = wf.readframes(len(data))
+    except (wave.Error, EOFError):
+        return None
+    return np.frombuffer(raw, dtype=np.int16).copy(), rate
+
+
+_BOUNDARY = re.compile(r"[.!?…]+\s+")  # konec věty podle `split_sentences`
+
+
+class SentenceSegmenter:
+    """Průběžné dělení proudu textu (tokeny LLM) na věty.
+
+    Používá stejná pravidla jako `split_sentences`: věta je hotová, až když
+    za koncovou interpunkcí přijde mezera (jinak může jít o „...“ nebo
+    desetinné číslo, které ještě pokračuje).
+    """
+
+    def __init__(self):
+        self._buf = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Přidej kus textu; vrať věty, které jsou už kompletní."""
+        self._buf += text
+        last = None
+        for last in _BOUNDARY.finditer(self._buf):
+            pass
+        if last is None:
+            return []
+        done, self._buf = self._buf[: last.end()], self._buf[last.end() :]
+        return split_sentences(done)
+
+    def flush(self) -> List[str]:
+        """Konec proudu: vrať zbytek jako poslední větu."""
+        rest, self._buf = self._buf, ""
+        return split_sentences(rest) if rest.strip() else []
+
+
+def _drain_into(source: Iterable[str], q: "queue.Queue", stop: threading.Event) -> None:
+    """Čti zdroj vět do fronty, dokud nepřijde `stop`; pak zdroj uzavři."""
+    it = iter(source)
+    try:
+        for item in it:
+            if stop.is_set():
+                break
+            q.put(item)
+    finally:
+        close = getattr(it, "close", None)
+        if close is not None:
+            close()
+        q.put(_END)
+
+
+def _iter_queue(q: "queue.Queue", stop: threading.Event) -> Iterator[str]:
+    while not stop.is_set():
+        try:
+            item = q.get(timeout=0.05)
+        except queue.Empty:
+            continue
+        if item is _END:
+            return
+        yield item
+
 
 class TextToSpeech:
     """TTS s možností volitelného přerušení během mluvení.
@@ -32,129 +198,393 @@ class TextToSpeech:
         self.cfg = cfg or {}
         self.recognizer = recognizer
         self.mic_device = mic_device
-        self._last_tmp_wav: Optional[str] = None
         # hooky pro pozastavení/obnovení wake streamu nastavuje orchestrátor
         self._close_wake_stream = None  # type: ignore
         self._restore_wake_stream = None  # type: ignore
+        # továrna na audio zdroj (sdílená sběrnice) místo nového mikrofonu
+        self._source_factory: Optional[Callable[[], sr.AudioSource]] = None
+        self._noise_floor: Optional[NoiseFloorEstimator] = None
+        # trvalý Piper hlas (vytvoří se líně nebo přes `load_voice`)
+        self._piper: Optional[PiperWorker] = None
+        self._piper_lock = threading.Lock()
+        self._piper_disabled = False
+        self._playback: Optional[PlaybackEngine] = None
+        # kdy zazněl první vzorek poslední promluvy (jen přehrávání v procesu)
+        self.first_audio_at: Optional[float] = None
+        # lokální detekce přerušení nad živým streamem (místo Google pollingu)
+        self._barge_in: Optional[BargeInDetector] = None
+        self._interrupted = threading.Event()
+        # PCM cache opakovaných frází (klíč = text + parametry hlasu)
+        self._cache: Optional[PhraseCache] = None
+        if self.cfg.get("phrase_cache", True):
+            mb = float(self.cfg.get("phrase_cache_mb", 16))
+            self._cache = PhraseCache(max_bytes=int(mb * 1024 * 1024))
 
     def set_wake_stream_hooks(self, close_cb, restore_cb) -> None:
         """Nastaví callbacky pro pozastavení/obnovení wake-word streamu."""
         self._close_wake_stream = close_cb
         self._restore_wake_stream = restore_cb
 
+    def set_audio_source_factory(
+        self, factory: Optional[Callable[[], sr.AudioSource]]
+    ) -> None:
+        """Nastaví zdroj zvuku pro naslouchání přerušení (např. sdílená sběrnice)."""
+        self._source_factory = factory
+
+    def set_playback(self, engine: Optional[PlaybackEngine]) -> None:
+        """Přehrávej PCM v procesu přes trvalý výstupní stream místo přehrávačů."""
+        self._playback = engine
+
+    def set_barge_in(self, detector: Optional[BargeInDetector]) -> None:
+        """Hlídej přerušení lokálně (VAD + keyword spotter) místo `recognize_google`."""
+        self._barge_in = detector
+
+    def set_noise_floor(self, estimator: Optional[NoiseFloorEstimator]) -> None:
+        """Použij průběžný odhad šumu místo kalibrace před každou kontrolou."""
+        self._noise_floor = estimator
+
+    def load_voice(self) -> None:
+        """Načti Piper hlas předem (volá ModelLoader); bez Piper workeru nic nedělá."""
+        worker = self._piper_worker()
+        if worker is None:
+            return
+        try:
+            worker.load()
+        except ORT_ERRORS + (ImportError,) as exc:
+            logger.warning("Piper hlas nelze načíst (%s), použiji proces piper", exc)
+            self._piper_disabled = True
+
+    def warmup(self) -> None:
+        """Zahřívací syntéza, aby první věta nenesla alokace ONNX session."""
+        if self._piper is not None and self._piper.loaded:
+            self._piper.synthesize("Ahoj.")
+
     # ---- vnitřní pomocné funkce -------------------------------------------------
-    def _spawn_tts(self, chunk: str) -> Optional[subprocess.Popen]:
-        """Spustí syntézu a vrátí Popen přehrávače, je-li k dispozici.
+    def _piper_worker(self) -> Optional[PiperWorker]:
+        """Trvalý Piper worker, pokud je Piper nakonfigurovaný a piper-tts dostupný."""
+        if (self.cfg.get("service") or "espeak").lower() != "piper":
+            return None
+        if self._piper_disabled or not self.cfg.get("piper_worker", True):
+            return None
+        model = self.cfg.get("model") or self.cfg.get("voice_path")
+        if not model or not os.path.exists(model):
+            return None
+        with self._piper_lock:
+            if self._piper is None:
+                length_scale = self.cfg.get("length_scale")
+                speaker = self.cfg.get("speaker")
+                self._piper = PiperWorker(
+                    PiperWorkerConfig(
+                        model_path=model,
+                        config_path=self.cfg.get("voice_config"),
+                        speaker_id=None if speaker is None else int(speaker),
+                        length_scale=(
+                            None if length_scale is None else float(length_scale)
+                        ),
+                    )
+                )
+        return self._piper if self._piper.available else None
 
-        U Piper se nejprve vygeneruje WAV do dočasného souboru a ten se přehraje
-        paplay/aplay. U espeak/spd-say se přehrává přímo procesem.
+    def _synthesize(self, chunk: str) -> Optional[_Clip]:
+        """Připrav větu k přehrání (běží ve vlákně syntézy).
+
+        Fráze z cache se vrátí hned. U Piper vrátí PCM z trvalého workeru,
+        bez něj se spustí proces `piper` a WAV se vygeneruje do dočasného
+        souboru; None znamená, že syntéza selhala. S přehráváním v procesu se
+        i espeak syntetizuje předem do PCM, jinak syntetizuje až při přehrání
+        a klip nese jen text.
         """
+        cached = self._cached_clip(chunk)
+        if cached is not None:
+            return cached
         service = (self.cfg.get("service") or "espeak").lower()
+        if service != "piper":
+            if self._playback is not None and self._playback.active:
+                rendered = self._render_pcm(chunk)
+                if rendered is not None:
+                    self._cache_put(chunk, *rendered)
+                    return _Clip(chunk, pcm=rendered[0], sample_rate=rendered[1])
+            return _Clip(chunk)
+        worker = self._piper_worker()
+        if worker is not None:
+            pcm = worker.synthesize(chunk)
+            if pcm is not None:
+                self._cache_put(chunk, pcm, worker.sample_rate)
+                return _Clip(chunk, pcm=pcm, sample_rate=worker.sample_rate)
+            # worker se vzdal – pokračuj jednorázovým procesem
+        if not self._piper_cli_available():
+            # fallback na espeak pokud Piper nelze použít
+            return _Clip(chunk)
+        if self._playback is not None and self._playback.active:
+            # přehrání v procesu: WAV hned načti do paměti a smaž
+            loaded = self._piper_cli_pcm(chunk)
+            if loaded is None:
+                return None
+            return _Clip(chunk, pcm=loaded[0], sample_rate=loaded[1])
+        tmp_path = self._piper_cli_wav(chunk)
+        return None if tmp_path is None else _Clip(chunk, tmp_path)
+
+    def _piper_cli_available(self) -> bool:
+        model = self.cfg.get("model") or self.cfg.get("voice_path")
+        return bool(model) and shutil.which("piper") is not None
+
+    def _piper_cli_wav(self, chunk: str) -> Optional[str]:
+        """Jednorázový proces `piper` → cesta k dočasnému WAV (None při chybě)."""
+        model = self.cfg.get("model") or self.cfg.get("voice_path")
+        voice_cfg = self.cfg.get("voice_config")
+        tmp_wav = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+        tmp_path = tmp_wav.name
+        tmp_wav.close()
+        cmd = ["piper", "--model", str(model), "--output_file", tmp_path]
+        if voice_cfg:
+            cmd.extend(["--config", voice_cfg])
+        try:
+            p = subprocess.run(
+                cmd,
+                input=chunk.encode("utf-8"),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+        except (OSError, ValueError):
+            _unlink(tmp_path)
+            return None
+        if p.returncode != 0:
+            _unlink(tmp_path)
+            return None
+        return tmp_path
+
+    def _piper_cli_pcm(self, chunk: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Věta přes proces `piper` rovnou do paměti (dočasný WAV se smaže)."""
+        tmp_path = self._piper_cli_wav(chunk)
+        if tmp_path is None:
+            return None
+        try:
+            with open(tmp_path, "rb") as f:
+                return _wav_to_pcm(f.read())
+        except OSError:
+            return None
+        finally:
+            _unlink(tmp_path)
+
+    def _cache_put(self, chunk: str, pcm: np.ndarray, rate: int) -> None:
+        if self._cache is not None:
+            self._cache.put(PhraseCache.key(chunk, self._voice_params()), pcm, rate)
+
+    def _play_clip(self, clip: _Clip) -> Optional[Playing]:
+        """Spustí přehrání klipu a vrátí Popen přehrávače (či handle), je-li k dispozici.
+
+        PCM jde do přehrávacího enginu v procesu, bez něj paplay/aplay na
+        stdin; WAV z Piper přehraje paplay/aplay, u espeak/spd-say se
+        přehrává přímo procesem syntézy.
+        """
+        if clip.pcm is not None:
+            if self._playback is not None and self._playback.active:
+                return self._playback.play(clip.pcm, clip.sample_rate)
+            proc = self._play_pcm(clip.pcm, clip.sample_rate)
+            if proc is not None:
+                return proc
+            # bez přehrávače PCM aspoň přímá syntéza (espeak/spd-say)
+            return self._spawn_direct(clip.text)
+        if clip.wav_path:
+            # vyber přehrávač
+            if shutil.which("paplay"):
+                play_cmd = ["paplay", clip.wav_path]
+            elif shutil.which("aplay"):
+                play_cmd = ["aplay", "-q", clip.wav_path]
+            else:
+                play_cmd = ["play", "-q", clip.wav_path]
+            try:
+                return subprocess.Popen(
+                    play_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+            except (OSError, ValueError):
+                return None
+        return self._spawn_direct(clip.text)
+
+    def _play_pcm(self, pcm: np.ndarray, rate: int) -> Optional[subprocess.Popen]:
+        """Přehraj int16 mono PCM přes paplay/aplay (raw na stdin)."""
+        if shutil.which("paplay"):
+            cmd = [
+                "paplay",
+                "--raw",
+                f"--rate={rate}",
+                "--format=s16le",
+                "--channels=1",
+            ]
+        elif shutil.which("aplay"):
+            cmd = [
+                "aplay",
+                "-q",
+                "-t",
+                "raw",
+                "-f",
+                "S16_LE",
+                "-c",
+                "1",
+                "-r",
+                str(rate),
+            ]
+        else:
+            return None
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except (OSError, ValueError):
+            return None
+        # zápis blokuje po dobu přehrávání – krmí ho samostatné vlákno
+        threading.Thread(
+            target=_feed_stdin, args=(proc, pcm.tobytes()), daemon=True
+        ).start()
+        return proc
 
-        # Preferuj Piper, pokud je nakonfigurován model a binárka je dostupná
+    def _espeak_args(self) -> list[str]:
+        return [
+            "-v",
+            self.cfg.get("voice", "cs"),
+            "-s",
+            str(self.cfg.get("speed", 150)),
+            "-a",
+            str(self.cfg.get("volume", 90)),
+            "-p",
+            str(self.cfg.get("pitch", 50)),
+            "-g",
+            str(self.cfg.get("gap", 10)),
+        ]
+
+    def _render_pcm(self, chunk: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Syntéza věty do paměti (pro cache frází); None, pokud backend neumí."""
+        service = (self.cfg.get("service") or "espeak").lower()
+        worker = self._piper_worker()
+        if worker is not None:
+            pcm = worker.synthesize(chunk)
+            return None if pcm is None else (pcm, worker.sample_rate)
         if service == "piper":
-            model = self.cfg.get("model") or self.cfg.get("voice_path")
-            voice_cfg = self.cfg.get("voice_config")
-            if model and shutil.which("piper"):
-                tmp_wav = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-                tmp_path = tmp_wav.name
-                tmp_wav.close()
-                try:
-                    cmd = ["piper", "--model", model, "--output_file", tmp_path]
-                    if voice_cfg:
-                        cmd.extend(["--config", voice_cfg])
-                    p = subprocess.run(
-                        cmd,
-                        input=chunk.encode("utf-8"),
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                        check=False,
-                    )
-                    if p.returncode != 0:
-                        try:
-                            os.unlink(tmp_path)
-                        except OSError:
-                            pass
-                        return None
-                    # vyber přehrávač
-                    if shutil.which("paplay"):
-                        play_cmd = ["paplay", tmp_path]
-                    elif shutil.which("aplay"):
-                        play_cmd = ["aplay", "-q", tmp_path]
-                    else:
-                        play_cmd = ["play", "-q", tmp_path]
-                    proc = subprocess.Popen(
-                        play_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-                    )
-                    self._last_tmp_wav = tmp_path
-                    return proc
-                except (OSError, ValueError):
-                    try:
-                        os.unlink(tmp_path)
-                    except OSError:
-                        pass
-                    return None
-            # fallback na espeak pokud Piper nelze použít
-            service = "espeak"
-
-        if service == "espeak":
-            voice = self.cfg.get("voice", "cs")
-            speed = str(self.cfg.get("speed", 150))
-            volume = str(self.cfg.get("volume", 90))
-            pitch = str(self.cfg.get("pitch", 50))
-            gap = str(self.cfg.get("gap", 10))
-            for bin_name in ("espeak-ng", "espeak"):
-                if shutil.which(bin_name):
-                    cmd = [
-                        bin_name,
-                        "-v",
-                        voice,
-                        "-s",
-                        speed,
-                        "-a",
-                        volume,
-                        "-p",
-                        pitch,
-                        "-g",
-                        gap,
-                        chunk,
-                    ]
-                    try:
-                        return subprocess.Popen(
-                            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-                        )
-                    except (OSError, ValueError):
-                        continue
-            if shutil.which("spd-say"):
+            # jen hlas Piper – espeak by se uložil pod klíčem Piper hlasu
+            return self._piper_cli_pcm(chunk) if self._piper_cli_available() else None
+        if service != "espeak":
+            return None
+        for bin_name in ("espeak-ng", "espeak"):
+            if not shutil.which(bin_name):
+                continue
+            try:
+                p = subprocess.run(
+                    [bin_name, *self._espeak_args(), "--stdout", chunk],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    check=False,
+                )
+            except (OSError, ValueError):
+                continue
+            if p.returncode == 0 and p.stdout:
+                return _wav_to_pcm(p.stdout)
+        return None
+
+    def _voice_params(self) -> Dict[str, object]:
+        """Parametry, které mění zvuk fráze (součást klíče cache)."""
+        keys = ("service", "model", "voice_path", "speaker", "length_scale")
+        keys += ("voice", "speed", "volume", "pitch", "gap")
+        return {k: self.cfg.get(k) for k in keys}
+
+    def _cached_clip(self, chunk: str) -> Optional[_Clip]:
+        if self._cache is None:
+            return None
+        hit = self._cache.get(PhraseCache.key(chunk, self._voice_params()))
+        if hit is None:
+            return None
+        return _Clip(chunk, pcm=hit[0], sample_rate=hit[1])
+
+    def prebuild_phrases(self, phrases: Iterable[str]) -> int:
+        """Předpřiprav PCM známých frází do cache; vrať počet nově uložených vět."""
+        if self._cache is None:
+            return 0
+        voice = self._voice_params()
+        added = 0
+        for phrase in phrases:
+            for chunk in split_sentences(phrase):
+                key = PhraseCache.key(chunk, voice)
+                if key in self._cache:
+                    continue
+                rendered = self._render_pcm(chunk)
+                if rendered is None:
+                    continue
+                self._cache.put(key, *rendered)
+                added += 1
+        return added
+
+    def _spawn_direct(self, chunk: str) -> Optional[subprocess.Popen]:
+        """Syntéza i přehrání jedním procesem (espeak-ng/espeak, spd-say)."""
+        service = (self.cfg.get("service") or "espeak").lower()
+        if service not in ("piper", "espeak"):
+            # neznámý service -> konzole
+            print(f"🗣️ {chunk}")
+            return None
+        for bin_name in ("espeak-ng", "espeak"):
+            if shutil.which(bin_name):
+                cmd = [bin_name, *self._espeak_args(), chunk]
                 try:
                     return subprocess.Popen(
-                        ["spd-say", "-l", "cs", chunk],
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
+                        cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
                     )
-                except OSError:
-                    return None
-            # poslední fallback – aspoň zaloguj do konzole
-            print(f"🗣️ {chunk}")
-            return None
-
-        # neznámý service -> konzole
+                except (OSError, ValueError):
+                    continue
+        if shutil.which("spd-say"):
+            try:
+                return subprocess.Popen(
+                    ["spd-say", "-l", "cs", chunk],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+            except OSError:
+                return None
+        # poslední fallback – aspoň zaloguj do konzole
         print(f"🗣️ {chunk}")
         return None
 
+    def _produce(
+        self, chunks: Iterable[str], clips: "queue.Queue", stop: threading.Event
+    ) -> None:
+        """Vlákno syntézy: plní omezenou frontu klipy s předstihem před přehráním.
+
+        `_END` se zařadí vždy (i po chybě syntézy), jinak by přehrávání čekalo
+        na další klip donekonečna.
+        """
+        try:
+            for chunk in chunks:
+                if stop.is_set():
+                    break
+                item = self._synthesize(chunk) or _Clip(chunk, failed=True)
+                if not _put_unless(clips, item, stop):
+                    _discard(item)
+                    return
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("❌ Syntéza řeči selhala")
+        finally:
+            _put_unless(clips, _END, stop)
+
     def _listen_for_interrupt(self, timeout_s: Optional[float]) -> bool:
         """Krátce poslouchej pro klíčová slova (stop/konec); defaultně vypnuto."""
-        if not self.mic_device:
+        if not self.mic_device and self._source_factory is None:
             return False
         if not self.cfg.get("interrupt_enabled", False):
             return False
         if timeout_s is None:
             timeout_s = float(self.cfg.get("interrupt_listen_timeout", 0.6))
         phrase_limit = float(self.cfg.get("interrupt_phrase_limit", 0.8))
-        mic = sr.Microphone(device_index=self.mic_device)
+        if self._source_factory is not None:
+            mic = self._source_factory()
+        else:
+            mic = sr.Microphone(device_index=self.mic_device)
         try:
             with mic as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.15)
+                if self._noise_floor is not None:
+                    self.recognizer.energy_threshold = self._noise_floor.threshold()
+                else:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.15)
                 audio = self.recognizer.listen(
                     source, timeout=timeout_s, phrase_time_limit=phrase_limit
                 )
@@ -178,29 +608,102 @@ class TextToSpeech:
         except (OSError, ValueError):
             return False
 
+    def _on_barge_in(self, word: str) -> None:
+        """Callback detektoru (jeho vlákno): ztiš výstup hned, smyčka se probudí."""
+        _ = word
+        self.interrupt()
+
+    def interrupt(self) -> None:
+        """Přeruš právě mluvenou promluvu (z libovolného vlákna)."""
+        self._interrupted.set()
+        if self._playback is not None:
+            self._playback.stop_all()
+
+    def _local_barge_in(self) -> bool:
+        return self._barge_in is not None and bool(
+            self.cfg.get("interrupt_enabled", False)
+        )
+
+    def _interrupt_requested(self) -> bool:
+        """Přerušil uživatel (či volající)? Lokální detektor, jinak krátké naslouchání."""
+        if self._interrupted.is_set() or self._local_barge_in():
+            return self._interrupted.is_set()
+        return self._listen_for_interrupt(timeout_s=None)
+
+    def _play_and_wait(self, clip: _Clip) -> bool:
+        """Přehraj klip do konce (s kontrolou přerušení); vrať True při přerušení."""
+        proc = None if clip.failed else self._play_clip(clip)
+        interrupted = False
+        if proc is None:
+            # fallback simulace – přibližná délka mluvení
+            time.sleep(max(0.1, len(clip.text) / 8 / 10))
+        else:
+            while proc.poll() is None:
+                if self._interrupt_requested():
+                    interrupted = True
+                    try:
+                        proc.terminate()
+                    except OSError:
+                        pass
+                    break
+                if isinstance(proc, PlaybackHandle):
+                    proc.wait(0.05)  # probudí se hned po dohrání bufferu
+                else:
+                    time.sleep(0.05)
+            if isinstance(proc, PlaybackHandle) and self.first_audio_at is None:
+                self.first_audio_at = proc.started_at
+        # úklid dočasného WAV po dohrání
+        _discard(clip)
+        return interrupted
+
     # ---- veřejné API -------------------------------------------------------------
-    def speak(self, text: str) -> None:
+    def speak(self, text: str, cancel: Optional[threading.Event] = None) -> bool:
         """Řekni text po větách a případně umožni přerušení.
 
-        Dělí text na věty, pozastaví wake stream, přehraje věty postupně a poté
-        wake stream obnoví. Dočasné WAVy (Piper) se uklidí.
+        Dělí text na věty, pozastaví wake stream a přehrává věty postupně;
+        vlákno syntézy mezitím připravuje další věty do omezené fronty, takže
+        přehrávání nečeká na Piper. Poté wake stream obnoví, dočasné WAVy se
+        uklidí (i ty nepřehrané po přerušení). Nastavení `cancel` (z jiného
+        vlákna) promluvu ukončí jako přerušení. Vrací True, byla-li přerušena.
         """
         if not text:
-            return
+            return False
+        return self._speak_chunks(split_sentences(text), threading.Event(), cancel)
 
-        # rozděl text na věty a zachovej interpunkci
-        sentences = [
-            s.strip() for s in re.split(r"([.!?…]+)\s+", text) if s and not s.isspace()
-        ]
-        chunks: list[str] = []
-        i = 0
-        while i < len(sentences):
-            if i + 1 < len(sentences) and re.match(r"[.!?…]+", sentences[i + 1]):
-                chunks.append(sentences[i] + sentences[i + 1])
-                i += 2
-            else:
-                chunks.append(sentences[i])
-                i += 1
+    def speak_stream(
+        self, sentences: Iterable[str], cancel: Optional[threading.Event] = None
+    ) -> bool:
+        """Mluv věty tak, jak přicházejí (např. z LLM streamu přes `SentenceSegmenter`).
+
+        Zdroj vět se čte ve vlastním vlákně, takže generování pokračuje během
+        syntézy i přehrávání; první věta zazní hned, jak je hotová. Po
+        přerušení se zdroj uzavře (`close()` generátoru zastaví LLM).
+        """
+        stop = threading.Event()
+        ready: "queue.Queue" = queue.Queue()
+        reader = threading.Thread(
+            target=_drain_into,
+            args=(sentences, ready, stop),
+            name="tts-text",
+            daemon=True,
+        )
+        reader.start()
+        try:
+            return self._speak_chunks(_iter_queue(ready, stop), stop, cancel)
+        finally:
+            stop.set()
+
+    def _speak_chunks(
+        self,
+        chunks: Iterable[str],
+        stop: threading.Event,
+        cancel: Optional[threading.Event] = None,
+    ) -> bool:
+        """Společná smyčka `speak`/`speak_stream`: syntéza napřed, přehrávání, přerušení."""
+        self.first_audio_at = None
+        # každá promluva má vlastní event: pozdní `interrupt()` nezasáhne další
+        self._interrupted = cancel if cancel is not None else threading.Event()
+        interrupted = False
 
         # pozastav wake stream (pokud je k dispozici)
         if self._close_wake_stream:
@@ -209,37 +712,56 @@ class TextToSpeech:
             except OSError:
                 pass
 
-        pause_ms = int(self.cfg.get("sentence_pause_ms", 300))
-        for chunk in chunks:
-            proc = self._spawn_tts(chunk)
-            if proc is None:
-                # fallback simulace – přibližná délka mluvení
-                time.sleep(max(0.1, len(chunk) / 8 / 10))
-            else:
-                interrupted = False
-                while proc.poll() is None:
-                    if self._listen_for_interrupt(timeout_s=None):
+        # syntéza běží o `synth_lookahead` vět napřed, přehrávání na ni nečeká
+        lookahead = max(1, int(self.cfg.get("synth_lookahead", 2)))
+        clips: "queue.Queue" = queue.Queue(maxsize=lookahead)
+        producer = threading.Thread(
+            target=self._produce,
+            args=(chunks, clips, stop),
+            name="tts-synth",
+            daemon=True,
+        )
+        producer.start()
+        if self._local_barge_in():
+            self._barge_in.start(self._on_barge_in)
+
+        # další věta je díky syntéze napřed hotová – umělá pauza by mezeru,
+        # kterou pipeline odstraňuje, jen vrátila (volitelné `sentence_pause_ms`)
+        pause_ms = int(self.cfg.get("sentence_pause_ms", 0))
+        try:
+            while True:
+                try:
+                    clip = clips.get(timeout=0.05)
+                except queue.Empty:
+                    # syntéza (či LLM) ještě nedodala větu – přerušení platí i teď
+                    if self._interrupted.is_set():
                         interrupted = True
-                        try:
-                            proc.terminate()
-                        except OSError:
-                            pass
                         break
-                    time.sleep(0.05)
-                # úklid dočasného WAV po dohrání
-                if self._last_tmp_wav:
-                    try:
-                        os.unlink(self._last_tmp_wav)
-                    except OSError:
-                        pass
-                    finally:
-                        self._last_tmp_wav = None
+                    if not producer.is_alive() and clips.empty():
+                        break  # producent skončil bez `_END`
+                    continue
+                if clip is _END:
+                    break
+                interrupted = self._play_and_wait(clip)
                 if interrupted:
                     break
-
-            time.sleep(pause_ms / 1000.0)
-            if self._listen_for_interrupt(timeout_s=None):
-                break
+                # čekání na event = pauza, kterou přerušení zkrátí
+                if pause_ms > 0 and self._interrupted.wait(pause_ms / 1000.0):
+                    interrupted = True
+                    break
+                if self._interrupt_requested():
+                    interrupted = True
+                    break
+        finally:
+            # zastav syntézu a ukliď WAVy, které se už nepřehrají
+            stop.set()
+            if self._barge_in is not None:
+                self._barge_in.stop()
+            while producer.is_alive() or not clips.empty():
+                try:
+                    _discard(clips.get(timeout=0.05))
+                except queue.Empty:
+                    continue
 
         # obnova wake streamu
         if self._restore_wake_stream:
@@ -247,11 +769,4 @@ class TextToSpeech:
                 self._restore_wake_stream()
             except OSError:
                 pass
-        # finální úklid případného tmp souboru
-        if self._last_tmp_wav:
-            try:
-                os.unlink(self._last_tmp_wav)
-            except OSError:
-                pass
-            finally:
-                self._last_tmp_wav = None
+        return interrupted
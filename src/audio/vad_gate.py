@@ -0,0 +1,118 @@
+"""Předřazená brána řeči (VAD/energie) před wake word engine.
+
+Většinu dne je v místnosti ticho a posílat každý 32ms frame do Porcupine/ONNX
+je zbytečné. Brána pustí frame dál jen tehdy, když obsahuje řeč (NumPy RMS
+nebo webrtcvad). Krátký lookback drží poslední tiché framy, aby se při
+nástupu řeči neuřízl začátek slova, a hangover nechá bránu chvíli otevřenou
+po konci řeči.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import webrtcvad  # type: ignore
+except ImportError:  # pragma: no cover - volitelná závislost
+    webrtcvad = None  # type: ignore
+
+
+@dataclass
+class SpeechGateConfig:
+    mode: str = "rms"  # "rms" | "webrtc"
+    rms_threshold: float = 300.0  # int16 RMS, pod ním je frame „ticho“
+    vad_aggressiveness: int = 2  # webrtcvad 0–3
+    lookback_ms: int = 300  # kolik ticha před nástupem se dopošle
+    hangover_ms: int = 500  # jak dlouho zůstat otevřený po řeči
+    sample_rate: int = 16000
+
+
+def frame_rms(frame: np.ndarray) -> float:
+    """RMS int16 framu (stejné jednotky jako `energy_threshold` v SR)."""
+    if len(frame) == 0:
+        return 0.0
+    data = frame.astype(np.float32)
+    return float(np.sqrt(np.mean(data * data)))
+
+
+class SpeechGate:
+    """Rozhodne, které framy má wake word engine opravdu zpracovat.
+
+    `feed(frame)` vrací seznam framů k inferenci: prázdný při tichu, při
+    nástupu řeči lookback + aktuální frame. Statistiky `processed`/`skipped`
+    počítají framy, které engine zpracoval, resp. ušetřil.
+    """
+
+    def __init__(
+        self,
+        cfg: Optional[SpeechGateConfig] = None,
+        threshold_fn: Optional[Callable[[], float]] = None,
+    ):
+        self.cfg = cfg or SpeechGateConfig()
+        # volitelný dynamický práh (např. odhad šumového pozadí)
+        self._threshold_fn = threshold_fn
+        self._vad = None
+        if self.cfg.mode == "webrtc" and webrtcvad is not None:
+            self._vad = webrtcvad.Vad(int(self.cfg.vad_aggressiveness))
+        self._lookback: Deque[np.ndarray] = deque()
+        self._hang = 0
+        self.processed = 0
+        self.skipped = 0
+
+    @property
+    def threshold(self) -> float:
+        if self._threshold_fn is not None:
+            return max(self.cfg.rms_threshold, float(self._threshold_fn()))
+        return self.cfg.rms_threshold
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """Obsahuje frame řeč? (webrtcvad, nebo RMS nad prahem)"""
+        if self._vad is None:
+            return frame_rms(frame) >= self.threshold
+        # webrtcvad bere jen 10/20/30 ms – projdi frame po 30 ms (příp. 10 ms)
+        sub = 480 if len(frame) >= 480 else 160
+        pcm = frame.astype(np.int16)
+        for off in range(0, len(pcm) - sub + 1, sub):
+            try:
+                if self._vad.is_speech(
+                    pcm[off : off + sub].tobytes(), self.cfg.sample_rate
+                ):
+                    return True
+            except ValueError:  # pragma: no cover - neplatná délka framu
+                return True
+        return False
+
+    def _frames_for(self, ms: int, frame_len: int) -> int:
+        return max(0, int(ms * self.cfg.sample_rate / 1000 / max(1, frame_len)))
+
+    def feed(self, frame: np.ndarray) -> List[np.ndarray]:
+        """Vrať framy, které se mají poslat do enginu (může být prázdné)."""
+        if self.is_speech(frame):
+            self._hang = self._frames_for(self.cfg.hangover_ms, len(frame))
+            out = list(self._lookback) + [frame]
+            # lookback framy byly započteny jako přeskočené, teď se zpracují
+            self.skipped -= len(self._lookback)
+            self._lookback.clear()
+            self.processed += len(out)
+            return out
+        if self._hang > 0:
+            self._hang -= 1
+            self.processed += 1
+            return [frame]
+        self._lookback.append(frame)
+        while len(self._lookback) > self._frames_for(self.cfg.lookback_ms, len(frame)):
+            self._lookback.popleft()
+        self.skipped += 1
+        return []
+
+    def stats(self) -> Dict[str, float]:
+        total = self.processed + self.skipped
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "skipped_ratio": (self.skipped / total) if total else 0.0,
+        }
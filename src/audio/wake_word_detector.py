@@ -1,107 +1,240 @@
-"""Wake word detektor (Porcupine) oddělený od main.
+"""Wake word detektor (Porcupine nebo ONNX/openWakeWord) oddělený od main.
 
 Poskytuje jednoduché API:
 - start() / stop(): správa Porcupine a audio streamu
 - detect() -> bool: přečte jeden frame a vrátí, zda bylo klíčové slovo detekováno
 - stop_stream() / start_stream(): dočasné pozastavení/obnovení pouze streamu
+- start_background() / wait_for_detection(): detekce ve vlastním capture vlákně,
+  výsledky se předávají do asyncio smyčky přes frontu (smyčka neblokuje I/O)
+- take_preroll(): framy přečtené po poslední detekci (začátek povelu řečeného
+  jedním dechem s wake wordem)
+- volitelná brána řeči (`SpeechGate`) před enginem, stats() hlásí přeskočené
+  vs. zpracované framy
+
+Pokud je předána sdílená `AudioBus`, detektor vlastní stream neotevírá a čte
+framy jako jeden ze čtenářů sběrnice.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import threading
+import time
 
 import numpy as np
 
+from src.audio.audio_bus import AudioBus, BusReader
+from src.audio import wake_word_onnx
+from src.audio.onnx_errors import ORT_ERRORS
+from src.audio.vad_gate import SpeechGate, SpeechGateConfig
+
 try:
     import pvporcupine  # type: ignore
 except ImportError:  # pragma: no cover - volitelná závislost
     pvporcupine = None  # type: ignore
 
 
+logger = logging.getLogger(__name__)
+
+
 @dataclass
 class WakeWordConfig:
     access_key: str
     model_path: str
     keyword: str = ""
     threshold: float = 0.5
+    preroll_seconds: float = 3.0  # délka historie přečtených framů
+    service: str = "porcupine"  # "porcupine" | "openwakeword"
+    # openWakeWord (ONNX): více keyword modelů se skóruje v jednom průchodu
+    model_paths: List[str] = field(default_factory=list)
+    embedding_model_path: str = ""
+    melspec_model_path: Optional[str] = wake_word_onnx.DEFAULT_MELSPEC_MODEL
+    batch_frames: int = 2
+    # brána řeči před enginem (None = každý frame jde do inference)
+    gate: Optional[SpeechGateConfig] = None
+
+
+def wake_word_config_from_dict(raw: dict) -> WakeWordConfig:
+    """Sestav WakeWordConfig ze sekce `wake_word` v config.yaml."""
+    gate_raw = raw.get("gate") or {}
+    gate_cfg = None
+    if gate_raw.get("enabled", False):
+        gate_cfg = SpeechGateConfig(
+            mode=gate_raw.get("mode", "rms"),
+            rms_threshold=float(gate_raw.get("rms_threshold", 300)),
+            vad_aggressiveness=int(gate_raw.get("vad_aggressiveness", 2)),
+            lookback_ms=int(gate_raw.get("lookback_ms", 300)),
+            hangover_ms=int(gate_raw.get("hangover_ms", 500)),
+        )
+    return WakeWordConfig(
+        access_key=raw.get("access_key", ""),
+        model_path=raw.get("model_path", ""),
+        keyword=raw.get("keyword", ""),
+        threshold=float(raw.get("threshold", 0.5)),
+        preroll_seconds=float(raw.get("preroll_seconds", 3.0)),
+        service=raw.get("service", "porcupine"),
+        model_paths=list(raw.get("model_paths") or []),
+        embedding_model_path=raw.get("embedding_model_path", ""),
+        melspec_model_path=raw.get(
+            "melspec_model_path", wake_word_onnx.DEFAULT_MELSPEC_MODEL
+        ),
+        batch_frames=int(raw.get("batch_frames", 2)),
+        gate=gate_cfg,
+    )
 
 
 class WakeWordDetector:
-    """Zapouzdření Porcupine, neřeší výběr mikrofonu ani PyAudio init.
+    """Zapouzdření wake word enginu, neřeší výběr mikrofonu ani PyAudio init.
+
+    Engine je Porcupine nebo `OnnxWakeWordEngine` se stejným rozhraním
+    (`frame_length`, `process`, `delete`).
 
-    Očekává externě vytvořený PyAudio a zvolený `input_device_index`.
+    Očekává externě vytvořený PyAudio a zvolený `input_device_index`, případně
+    sdílenou sběrnici `bus`, ze které pak čte místo vlastního streamu.
     """
 
     def __init__(
-        self, pyaudio_instance, device_index: Optional[int], cfg: WakeWordConfig
+        self,
+        pyaudio_instance,
+        device_index: Optional[int],
+        cfg: WakeWordConfig,
+        bus: Optional[AudioBus] = None,
     ):
         self._pa = pyaudio_instance
         self._device_index = device_index
         self._cfg = cfg
-        self._porcupine = None
+        self._bus = bus
+        self._engine = None
         self._stream = None
+        self._reader: Optional[BusReader] = None
+        # režim capture vlákna
+        self._lock = threading.RLock()
+        self._paused = False
+        self._thread: Optional[threading.Thread] = None
+        self._thread_stop = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._detections: Optional["asyncio.Queue[float]"] = None
+        # omezená historie přečtených framů pro pre-roll (index framu, data)
+        self._history: Deque[Tuple[int, np.ndarray]] = deque()
+        self._frames_read = 0
+        self._detected_frame: Optional[int] = None
+        # pozice sběrnice hned za framem s detekcí (začátek povelu)
+        self._detected_position: Optional[int] = None
+        self.gate: Optional[SpeechGate] = SpeechGate(cfg.gate) if cfg.gate else None
+        self._frames_total = 0
 
     @property
     def active(self) -> bool:
-        return self._porcupine is not None and self._stream is not None
+        return self._engine is not None and (
+            self._stream is not None or self._reader is not None
+        )
 
     def start(self) -> bool:
-        """Inicializuj Porcupine a otevři kontinuální stream. Vrací úspěch."""
-        if pvporcupine is None or self._device_index is None:
+        """Inicializuj engine a otevři kontinuální stream. Vrací úspěch."""
+        if self._device_index is None and not self._bus_active():
+            return False
+        if self._engine is None and not self.load_engine():
+            return False
+        # otevři stream (nebo se připoj ke sdílené sběrnici)
+        return self.start_stream()
+
+    def load_engine(self) -> bool:
+        """Vytvoř engine podle `service` (bez otevírání audio streamu)."""
+        if self._engine is not None:
+            return True
+        service = (self._cfg.service or "porcupine").lower()
+        if service == "openwakeword":
+            self._engine = wake_word_onnx.create_engine(
+                self._cfg.model_paths or [self._cfg.model_path],
+                self._cfg.embedding_model_path,
+                melspec_model_path=self._cfg.melspec_model_path,
+                threshold=self._cfg.threshold,
+                batch_frames=self._cfg.batch_frames,
+            )
+            return self._engine is not None
+        if pvporcupine is None:
             return False
-        if self._porcupine is None:
-            try:
-                self._porcupine = pvporcupine.create(
-                    access_key=self._cfg.access_key,
-                    keyword_paths=[self._cfg.model_path],
-                    sensitivities=[self._cfg.threshold],
-                )
-            except (
-                OSError,
-                ValueError,
-                AttributeError,
-            ):  # pragma: no cover - knihovní chyby
-                self._porcupine = None
-                return False
-        # otevři stream
         try:
-            self._stream = self._pa.open(
-                format=self._pa.get_format_from_width(2),
-                channels=1,
-                rate=16000,
-                input=True,
-                input_device_index=self._device_index,
-                frames_per_buffer=self._porcupine.frame_length,  # type: ignore[union-attr]
+            self._engine = pvporcupine.create(
+                access_key=self._cfg.access_key,
+                keyword_paths=[self._cfg.model_path],
+                sensitivities=[self._cfg.threshold],
             )
-            return True
-        except (OSError, ValueError):  # pragma: no cover - driver chyby
-            self._stream = None
+        except (
+            OSError,
+            ValueError,
+            AttributeError,
+        ):  # pragma: no cover - knihovní chyby
+            self._engine = None
             return False
+        return True
 
     def stop(self) -> None:
-        """Ukonči stream i Porcupine."""
+        """Ukonči capture vlákno, stream i engine."""
+        self.stop_background()
+        self._reader = None
         self.stop_stream()
-        if self._porcupine is not None:
+        if self._engine is not None:
             try:
-                self._porcupine.delete()
+                self._engine.delete()
             except (OSError, AttributeError):  # pragma: no cover
                 pass
-            self._porcupine = None
+            self._engine = None
+
+    @property
+    def frame_length(self) -> int:
+        """Délka framu, kterou engine očekává (0 bez načteného enginu)."""
+        return int(getattr(self._engine, "frame_length", 0))
+
+    @property
+    def position(self) -> Optional[int]:
+        """Pozice čtenáře na sběrnici (None při vlastním streamu)."""
+        return self._reader.position if self._reader is not None else None
+
+    def _bus_active(self) -> bool:
+        return self._bus is not None and self._bus.active
 
     def stop_stream(self) -> None:
-        """Dočasně zavři pouze stream (např. kvůli STT/TTS)."""
-        if self._stream is not None:
-            try:
-                self._stream.close()
-            except OSError:  # pragma: no cover
-                pass
-            self._stream = None
+        """Dočasně zavři pouze stream (např. kvůli STT/TTS).
+
+        Při čtení ze sběrnice se zařízení nezavírá, čtenář jen přestane číst.
+        """
+        with self._lock:
+            self._paused = True
+            if self._reader is not None:
+                return
+            if self._stream is not None:
+                try:
+                    self._stream.close()
+                except OSError:  # pragma: no cover
+                    pass
+                self._stream = None
 
     def start_stream(self) -> bool:
-        """Obnov pouze stream, Porcupine musí být inicializován."""
-        if self._porcupine is None or self._device_index is None:
+        """Obnov pouze stream, engine musí být inicializován."""
+        with self._lock:
+            return self._start_stream_locked()
+
+    def _start_stream_locked(self) -> bool:
+        if self._engine is None:
+            return False
+        if self._bus_active():
+            if self._reader is None:
+                self._reader = self._bus.reader()  # type: ignore[union-attr]
+            else:
+                # framy nasbírané během pauzy už nejsou zajímavé
+                self._reader.skip_to_live()
+            self._paused = False
+            return True
+        if self._device_index is None:
             return False
+        if self._stream is not None:
+            self._paused = False
+            return True
         try:
             self._stream = self._pa.open(
                 format=self._pa.get_format_from_width(2),
@@ -109,21 +242,162 @@ class WakeWordDetector:
                 rate=16000,
                 input=True,
                 input_device_index=self._device_index,
-                frames_per_buffer=self._porcupine.frame_length,  # type: ignore[union-attr]
+                frames_per_buffer=self._engine.frame_length,  # type: ignore[union-attr]
             )
+            self._paused = False
             return True
         except (OSError, ValueError):  # pragma: no cover
             self._stream = None
             return False
 
     def detect(self) -> bool:
-        """Zpracuj jeden frame a vrať True, pokud Porcupine detekoval keyword."""
-        if self._porcupine is None or self._stream is None:
+        """Zpracuj jeden frame a vrať True, pokud engine detekoval keyword."""
+        if self._engine is None:
             return False
-        try:
-            audio_data = self._stream.read(self._porcupine.frame_length, exception_on_overflow=False)  # type: ignore[union-attr]
+        frame_length = self._engine.frame_length  # type: ignore[union-attr]
+        if self._reader is not None:
+            audio_np = self._reader.read(frame_length, timeout=0.5)
+            if audio_np is None:
+                return False
+        elif self._stream is None:
+            return False
+        else:
+            try:
+                audio_data = self._stream.read(
+                    frame_length, exception_on_overflow=False
+                )
+            except (OSError, ValueError, IOError):  # pragma: no cover
+                return False
             audio_np = np.frombuffer(audio_data, dtype=np.int16)
-            idx = self._porcupine.process(audio_np)
-            return idx >= 0
-        except (OSError, ValueError, IOError):  # pragma: no cover
+        hit = self.process_frame(audio_np)
+        if hit and self._reader is not None:
+            self._detected_position = self._reader.position
+        return hit
+
+    def process_frame(self, audio_np: np.ndarray) -> bool:
+        """Zpracuj už načtený frame (`frame_length` vzorků int16, 16 kHz).
+
+        Používá detect() i offline evaluace nad WAV soubory.
+        """
+        if self._engine is None:
+            return False
+        self._remember(audio_np)
+        self._frames_total += 1
+        frames = self.gate.feed(audio_np) if self.gate is not None else [audio_np]
+        hit = False
+        try:
+            for frame in frames:
+                # zpracuj i zbytek lookbacku, ať má engine souvislý stav
+                hit = (self._engine.process(frame) >= 0) or hit
+        except ORT_ERRORS as exc:
+            # chyba inference nesmí ukončit capture vlákno – frame se zahodí
+            logger.warning("⚠️ Wake word inference selhala: %s", exc)
+            return False
+        if hit:
+            self._detected_frame = self._frames_read
+        return hit
+
+    def stats(self) -> Dict[str, float]:
+        """Počet přečtených framů a kolik z nich brána ušetřila inference."""
+        if self.gate is None:
+            return {"frames": self._frames_total, "processed": self._frames_total}
+        return {"frames": self._frames_total, **self.gate.stats()}
+
+    def _remember(self, frame: np.ndarray) -> None:
+        """Ulož frame do omezené historie pro pre-roll."""
+        self._history.append((self._frames_read, frame))
+        self._frames_read += 1
+        max_frames = int(self._cfg.preroll_seconds * 16000 / max(1, len(frame)))
+        while len(self._history) > max(1, max_frames):
+            self._history.popleft()
+
+    def take_preroll(self) -> Optional[np.ndarray]:
+        """Vrať int16 audio přečtené od poslední detekce a detekci spotřebuj.
+
+        Jde o začátek povelu, který uživatel řekl hned po wake wordu, zatímco
+        orchestrátor ještě neposlouchal. None, pokud nic takového není.
+        """
+        with self._lock:
+            start = self._detected_frame
+            self._detected_frame = None
+            if start is None:
+                return None
+            frames = [f for idx, f in self._history if idx >= start]
+        if not frames:
+            return None
+        return np.concatenate(frames)
+
+    def take_command_start(self) -> Optional[int]:
+        """Vrať pozici sběrnice hned za poslední detekcí a spotřebuj ji.
+
+        Na rozdíl od `position` ji neposune pauza/obnovení streamu kolem
+        potvrzení („Ano, poslouchám“), takže STT odtud dostane i řeč z doby,
+        kdy detektor nečetl. None bez sběrnice nebo bez detekce.
+        """
+        with self._lock:
+            position = self._detected_position
+            self._detected_position = None
+        return position
+
+    # ---- režim capture vlákna ----------------------------------------------------
+    @property
+    def background(self) -> bool:
+        return self._thread is not None
+
+    def start_background(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """Spusť detekci ve vlastním vlákně; detekce jdou do fronty `loop`.
+
+        Vlákno blokuje na čtení audia (ne na event loopu), takže ostatní
+        korutiny běží a nečinný asistent nespaluje CPU pollingem.
+        """
+        if not self.active:
             return False
+        if self._thread is not None:
+            return True
+        self._loop = loop
+        self._detections = asyncio.Queue()
+        self._thread_stop.clear()
+        self._thread = threading.Thread(
+            target=self._capture_loop, name="wake-word", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop_background(self) -> None:
+        """Zastav capture vlákno (blokuje do jeho ukončení)."""
+        if self._thread is None:
+            return
+        self._thread_stop.set()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _capture_loop(self) -> None:
+        while not self._thread_stop.is_set():
+            with self._lock:
+                listening = not self._paused and (
+                    self._stream is not None or self._reader is not None
+                )
+                hit = self.detect() if listening else False
+            if not listening:
+                # pozastaveno kvůli STT/TTS – čekej bez pollingu audio zařízení
+                self._thread_stop.wait(0.05)
+                continue
+            if hit and self._loop is not None and self._detections is not None:
+                try:
+                    self._loop.call_soon_threadsafe(
+                        self._detections.put_nowait, time.monotonic()
+                    )
+                except RuntimeError:  # pragma: no cover - smyčka už skončila
+                    return
+
+    async def wait_for_detection(self, since: float = 0.0) -> float:
+        """Počkej na detekci z capture vlákna a vrať její čas (monotonic).
+
+        Detekce starší než `since` (např. z doby konverzace) se zahodí.
+        """
+        if self._detections is None:
+            raise RuntimeError("capture vlákno neběží, zavolej start_background()")
+        while True:
+            ts = await self._detections.get()
+            if ts >= since:
+                return ts
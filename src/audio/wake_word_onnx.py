@@ -0,0 +1,266 @@
+"""ONNX (openWakeWord) backend pro WakeWordDetector.
+
+Engine má stejné rozhraní jako objekt z `pvporcupine.create` (`frame_length`,
+`process(pcm) -> int`, `delete()`), takže detektor zůstává nezávislý na
+backendu a nepotřebuje Porcupine access key.
+
+Zpracování probíhá po dávkách:
+1) framy se sbírají do dávky `batch_frames` × 80 ms,
+2) log-mel příznaky se spočítají najednou přes openWakeWord
+   `melspectrogram.onnx` (na těch jsou embedding i keyword modely
+   trénované); vestavěný NumPy log-mel je jen explicitní záložní volba
+   (`melspec_model_path: "numpy"`) – příznaky přibližuje, recall je horší,
+3) sdílený embedding model zpracuje všechna nová okna jedním voláním,
+4) všechny keyword modely se vyhodnotí nad stejnými embeddingy.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from src.audio.onnx_errors import ORT_ERRORS
+
+try:
+    import onnxruntime as ort  # type: ignore
+except ImportError:  # pragma: no cover - volitelná závislost
+    ort = None  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 1280  # 80 ms – krok openWakeWord
+N_FFT = 512
+WIN_LENGTH = 400  # 25 ms
+HOP_LENGTH = 160  # 10 ms
+N_MELS = 32
+MEL_WINDOW = 76  # mel framů na jeden embedding
+MEL_STEP = 8  # posun embedding okna (80 ms)
+EMB_DIM = 96
+EMB_WINDOW = 16  # embeddingů na vstup keyword modelu
+DEFAULT_MELSPEC_MODEL = "models/oww/melspectrogram.onnx"
+NUMPY_MELSPEC = "numpy"  # záložní NumPy log-mel místo ONNX modelu
+
+
+@dataclass
+class OnnxWakeWordConfig:
+    model_paths: List[str]
+    embedding_model_path: str
+    melspec_model_path: Optional[str] = DEFAULT_MELSPEC_MODEL  # "numpy" = záloha
+    threshold: float = 0.5
+    batch_frames: int = 2  # 2 × 80 ms na jedno vyhodnocení
+    threads: int = 1
+
+
+def _hz_to_mel(hz: np.ndarray) -> np.ndarray:
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _mel_to_hz(mel: np.ndarray) -> np.ndarray:
+    return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+
+def mel_filterbank(
+    n_mels: int = N_MELS,
+    n_fft: int = N_FFT,
+    sample_rate: int = SAMPLE_RATE,
+    fmin: float = 60.0,
+    fmax: float = 3800.0,
+) -> np.ndarray:
+    """Trojúhelníková mel banka tvaru (n_fft // 2 + 1, n_mels)."""
+    freqs = np.linspace(0.0, sample_rate / 2.0, n_fft // 2 + 1)
+    mel_pts = np.linspace(
+        _hz_to_mel(np.array(fmin)), _hz_to_mel(np.array(fmax)), n_mels + 2
+    )
+    hz_pts = _mel_to_hz(mel_pts)
+    lower, center, upper = hz_pts[:-2], hz_pts[1:-1], hz_pts[2:]
+    up = (freqs[:, None] - lower[None, :]) / (center - lower)[None, :]
+    down = (upper[None, :] - freqs[:, None]) / (upper - center)[None, :]
+    return np.maximum(0.0, np.minimum(up, down)).astype(np.float32)
+
+
+class LogMelFrontend:
+    """Vektorizovaný log-mel výpočet s předpočítaným oknem a mel bankou.
+
+    Drží konec předchozího audia, takže STFT okna navazují přes hranice dávek.
+    """
+
+    def __init__(self):
+        self._window = np.hanning(WIN_LENGTH).astype(np.float32)
+        self._fbank = mel_filterbank()
+        self._tail = np.zeros(WIN_LENGTH - HOP_LENGTH, dtype=np.float32)
+
+    def reset(self) -> None:
+        self._tail[:] = 0.0
+
+    def __call__(self, pcm: np.ndarray) -> np.ndarray:
+        """int16/float PCM → mel framy tvaru (n_frames, N_MELS)."""
+        audio = np.concatenate([self._tail, pcm.astype(np.float32)])
+        n_frames = 1 + (len(audio) - WIN_LENGTH) // HOP_LENGTH
+        if n_frames <= 0:
+            self._tail = audio
+            return np.zeros((0, N_MELS), dtype=np.float32)
+        idx = np.arange(WIN_LENGTH)[None, :] + HOP_LENGTH * np.arange(n_frames)[:, None]
+        frames = audio[idx] * self._window
+        power = np.abs(np.fft.rfft(frames, n=N_FFT, axis=1)) ** 2
+        mel = power.astype(np.float32) @ self._fbank
+        self._tail = audio[n_frames * HOP_LENGTH :]
+        # stejná transformace jako openWakeWord (x / 10 + 2 nad dB)
+        return (10.0 * np.log10(np.maximum(mel, 1e-10))) / 10.0 + 2.0
+
+
+class OnnxWakeWordEngine:
+    """openWakeWord-kompatibilní engine nad onnxruntime s dávkovým zpracováním."""
+
+    frame_length = CHUNK_SAMPLES
+
+    def __init__(self, cfg: OnnxWakeWordConfig):
+        if ort is None:
+            raise ImportError("onnxruntime není nainstalován")
+        if not cfg.model_paths:
+            raise ValueError("chybí cesta ke keyword modelu")
+        self.cfg = cfg
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = max(1, cfg.threads)
+        opts.inter_op_num_threads = 1
+        providers = ["CPUExecutionProvider"]
+        numpy_mel = cfg.melspec_model_path in (None, "", NUMPY_MELSPEC)
+        if numpy_mel:
+            logger.warning("⚠️ Wake word: NumPy log-mel (jen přibližné příznaky)")
+        self._melspec = (
+            None
+            if numpy_mel
+            else ort.InferenceSession(cfg.melspec_model_path, opts, providers=providers)
+        )
+        self._frontend = LogMelFrontend()
+        # melspectrogram.onnx potřebuje překryv 3 hopů jako v openWakeWord
+        self._onnx_tail = np.zeros(3 * HOP_LENGTH, dtype=np.float32)
+        self._embedding = ort.InferenceSession(
+            cfg.embedding_model_path, opts, providers=providers
+        )
+        self._keywords = [
+            ort.InferenceSession(path, opts, providers=providers)
+            for path in cfg.model_paths
+        ]
+        # dávkovat přes batch dimenzi lze jen u modelů s dynamickým vstupem
+        self._kw_batchable = [
+            not isinstance(s.get_inputs()[0].shape[0], int) for s in self._keywords
+        ]
+        self._pending: List[np.ndarray] = []
+        self._mel = np.zeros((0, N_MELS), dtype=np.float32)
+        self._mel_consumed = 0  # mel framy, od kterých už začalo embedding okno
+        self._emb = np.zeros((0, EMB_DIM), dtype=np.float32)
+        self.last_scores: List[float] = [0.0] * len(self._keywords)
+
+    # ---- rozhraní kompatibilní s Porcupine ---------------------------------------
+    def process(self, pcm: np.ndarray) -> int:
+        """Přidej frame; po naplnění dávky vrať index keywordu nebo -1."""
+        self._pending.append(np.asarray(pcm, dtype=np.int16))
+        if len(self._pending) < max(1, self.cfg.batch_frames):
+            return -1
+        audio = np.concatenate(self._pending)
+        self._pending = []
+        scores = self._score(audio)
+        if scores.size == 0:
+            return -1
+        best = scores.max(axis=0)
+        self.last_scores = [float(x) for x in best]
+        for i, score in enumerate(best):
+            if score >= self.cfg.threshold:
+                self.reset()  # bez opakovaných spuštění na stejný výskyt
+                return i
+        return -1
+
+    def delete(self) -> None:
+        self._melspec = None
+        self._embedding = None  # type: ignore[assignment]
+        self._keywords = []
+
+    def reset(self) -> None:
+        self._pending = []
+        self._frontend.reset()
+        self._onnx_tail[:] = 0.0
+        self._mel = np.zeros((0, N_MELS), dtype=np.float32)
+        self._mel_consumed = 0
+        self._emb = np.zeros((0, EMB_DIM), dtype=np.float32)
+
+    # ---- pipeline ----------------------------------------------------------------
+    def _mel_features(self, audio: np.ndarray) -> np.ndarray:
+        if self._melspec is None:
+            return self._frontend(audio)
+        inp = self._melspec.get_inputs()[0].name
+        data = np.concatenate([self._onnx_tail, audio.astype(np.float32)])
+        self._onnx_tail = data[-3 * HOP_LENGTH :]
+        out = self._melspec.run(None, {inp: data[None, :]})[0]
+        return np.squeeze(out).reshape(-1, N_MELS) / 10.0 + 2.0
+
+    def _score(self, audio: np.ndarray) -> np.ndarray:
+        """Vrať skóre tvaru (n_oken, n_keywordů) pro novou dávku audia."""
+        self._mel = np.concatenate([self._mel, self._mel_features(audio)])
+        starts = list(
+            range(self._mel_consumed, len(self._mel) - MEL_WINDOW + 1, MEL_STEP)
+        )
+        if not starts:
+            return np.zeros((0, len(self._keywords)), dtype=np.float32)
+        windows = np.stack([self._mel[s : s + MEL_WINDOW] for s in starts])
+        self._mel_consumed = starts[-1] + MEL_STEP
+        # zahoď mel framy, které už žádné další okno nepotřebuje
+        drop = self._mel_consumed
+        self._mel = self._mel[drop:]
+        self._mel_consumed -= drop
+
+        emb_in = self._embedding.get_inputs()[0].name
+        emb = self._embedding.run(None, {emb_in: windows[..., None]})[0]
+        self._emb = np.concatenate([self._emb, emb.reshape(len(starts), EMB_DIM)])
+        if len(self._emb) < EMB_WINDOW:
+            return np.zeros((0, len(self._keywords)), dtype=np.float32)
+        new = min(len(starts), len(self._emb) - EMB_WINDOW + 1)
+        feats = np.stack(
+            [
+                self._emb[len(self._emb) - EMB_WINDOW - k : len(self._emb) - k]
+                for k in range(new - 1, -1, -1)
+            ]
+        ).astype(np.float32)
+        self._emb = self._emb[-EMB_WINDOW:]
+        return np.stack(
+            [self._run_keyword(i, feats) for i in range(len(self._keywords))], axis=1
+        )
+
+    def _run_keyword(self, i: int, feats: np.ndarray) -> np.ndarray:
+        sess = self._keywords[i]
+        name = sess.get_inputs()[0].name
+        if self._kw_batchable[i]:
+            return sess.run(None, {name: feats})[0].reshape(-1)
+        return np.array(
+            [sess.run(None, {name: f[None]})[0].reshape(-1)[0] for f in feats],
+            dtype=np.float32,
+        )
+
+
+def create_engine(
+    model_paths: Sequence[str],
+    embedding_model_path: str,
+    melspec_model_path: Optional[str] = DEFAULT_MELSPEC_MODEL,
+    threshold: float = 0.5,
+    batch_frames: int = 2,
+) -> Optional[OnnxWakeWordEngine]:
+    """Vytvoř engine, nebo vrať None, pokud chybí onnxruntime či modely."""
+    if ort is None:
+        return None
+    try:
+        return OnnxWakeWordEngine(
+            OnnxWakeWordConfig(
+                model_paths=list(model_paths),
+                embedding_model_path=embedding_model_path,
+                melspec_model_path=melspec_model_path,
+                threshold=threshold,
+                batch_frames=batch_frames,
+            )
+        )
+    except ORT_ERRORS + (ImportError,) as exc:
+        logger.warning("ONNX wake word nelze inicializovat: %s", exc)
+        return None
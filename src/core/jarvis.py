@@ -3,23 +3,57 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
+import threading
 import time
-from typing import Optional
+from typing import Iterator, Optional
 
+import numpy as np
 import yaml
 import pyaudio
 import speech_recognition as sr
 
-from src.audio.text_to_speech import TextToSpeech
+from src.audio.audio_bus import AudioBus, AudioBusConfig, BusAudioSource, BusReader
+from src.audio.barge_in import BargeInConfig, BargeInDetector
+from src.audio.command_recognizer import (
+    CommandRecognizerConfig,
+    create_command_recognizer,
+)
+from src.audio.echo_canceller import EchoCanceller, EchoCancellerConfig
+from src.audio.noise_floor import NoiseFloorConfig, NoiseFloorEstimator
+from src.audio.playback import PlaybackConfig, PlaybackEngine
+from src.audio.speech_queue import (
+    PRIORITY_CHATTER,
+    PRIORITY_NORMAL,
+    PRIORITY_URGENT,
+    SpeechHandle,
+    SpeechQueue,
+)
+from src.audio.text_to_speech import SentenceSegmenter, TextToSpeech, split_sentences
 from src.audio.speech_to_text import SpeechToText, STTConfig
-from src.audio.wake_word_detector import WakeWordDetector, WakeWordConfig
-from src.system.action_executor import ActionExecutor
+from src.audio.wake_word_detector import (
+    WakeWordDetector,
+    wake_word_config_from_dict,
+)
+from src.core.model_loader import ModelLoader
+from src.system.action_executor import (
+    COMMAND_PHRASES,
+    SPOKEN_PHRASES,
+    ActionExecutor,
+)
 from src.llm.engine import LlmEngine, LlmConfig
 
 
 logger = logging.getLogger("JarvisOrchestrator")
 
+# Hlášky orchestrátoru (viz `run`) pro předpřipravení v cache frází TTS
+PROMPT_PHRASES = (
+    "Ano, poslouchám",
+    "Přecházím zpět do wake word režimu",
+    "Nerozuměl jsem, zkuste to znovu",
+)
+
 
 class JarvisOrchestrator:
     """Hlavní orchestrátor hlasového asistenta.
@@ -42,6 +76,62 @@ class JarvisOrchestrator:
         # Mikrofon
         self.mic_device: Optional[int] = self._pick_microphone()
 
+        # Sdílená sběrnice: jediný trvale otevřený vstupní stream
+        audio_cfg_raw = self.config.get("audio", {})
+        self.bus = AudioBus(
+            self.audio,
+            self.mic_device,
+            AudioBusConfig(
+                sample_rate=int(audio_cfg_raw.get("sample_rate", 16000)),
+                block_size=int(audio_cfg_raw.get("bus_block_size", 512)),
+                buffer_seconds=float(audio_cfg_raw.get("bus_buffer_seconds", 10.0)),
+                capture_rate=audio_cfg_raw.get("capture_rate"),
+                input_gain=float(audio_cfg_raw.get("input_gain", 1.0)),
+            ),
+        )
+        if not audio_cfg_raw.get("shared_stream", True) or not self.bus.start():
+            logger.warning("⚠️ Sdílený stream nedostupný; mikrofon se bude přepínat")
+
+        # Průběžný odhad šumu z capture streamu (místo kalibrace před promluvou)
+        nf_raw = audio_cfg_raw.get("noise_floor") or {}
+        self.noise_floor: Optional[NoiseFloorEstimator] = None
+        if self.bus.active and nf_raw.get("enabled", True):
+            self.noise_floor = NoiseFloorEstimator(
+                NoiseFloorConfig(
+                    alpha=float(nf_raw.get("alpha", 0.05)),
+                    margin=float(nf_raw.get("margin", 2.5)),
+                    min_threshold=float(nf_raw.get("min_threshold", 150)),
+                    max_threshold=float(nf_raw.get("max_threshold", 4000)),
+                )
+            )
+            self.bus.add_tap(self.noise_floor.update)
+
+        # Těžké modely (STT, LLM) se načítají paralelně na pozadí
+        startup_raw = self.config.get("startup", {})
+        background = bool(startup_raw.get("background_load", True))
+        warmup = bool(startup_raw.get("warmup", True))
+        self.loader = ModelLoader(max_workers=int(startup_raw.get("load_workers", 2)))
+
+        # LLM – nejpomalejší načtení jde do poolu první
+        llm_cfg_raw = self.config.get("llm", {})
+        self.llm = LlmEngine(
+            LlmConfig(
+                model_path=llm_cfg_raw.get(
+                    "model_path", "models/Llama-3.2-1B-Instruct.Q5_K_M.gguf"
+                ),
+                n_ctx=int(llm_cfg_raw.get("n_ctx", 4096)),
+                n_threads=int(llm_cfg_raw.get("n_threads", 4)),
+                max_tokens=int(llm_cfg_raw.get("max_tokens", 200)),
+                temperature=float(llm_cfg_raw.get("temperature", 0.2)),
+                top_p=float(llm_cfg_raw.get("top_p", 0.9)),
+                repeat_penalty=float(llm_cfg_raw.get("repeat_penalty", 1.1)),
+            ),
+            defer_load=True,
+        )
+        self.loader.submit(
+            "llm", self.llm.load_model, self.llm.warmup if warmup else None
+        )
+
         # STT / TTS
         stt_cfg_raw = self.config.get("stt", {})
         self.stt = SpeechToText(
@@ -50,58 +140,182 @@ class JarvisOrchestrator:
                 service=stt_cfg_raw.get("service", "google"),
                 whisper_model=stt_cfg_raw.get("model", "small"),
                 hf_model=stt_cfg_raw.get("hf_model", "openai/whisper-small"),
+                hf_optimize=stt_cfg_raw.get("hf_optimize", "none"),
+                hf_cache_dir=stt_cfg_raw.get("hf_cache_dir", "models/cache/hf"),
                 device=stt_cfg_raw.get("device", "auto"),
                 energy_threshold=stt_cfg_raw.get("energy_threshold", 300),
                 pause_threshold=stt_cfg_raw.get("pause_threshold", 0.8),
                 dynamic_energy=stt_cfg_raw.get("dynamic_energy_threshold", True),
-            )
+                compute_type=stt_cfg_raw.get("compute_type", "int8"),
+                beam_size=int(stt_cfg_raw.get("beam_size", 1)),
+                cpu_threads=int(stt_cfg_raw.get("cpu_threads", 0)),
+                partial_interval=float(stt_cfg_raw.get("partial_interval", 0.8)),
+                endpointer=stt_cfg_raw.get("endpointer", "energy"),
+                vad_aggressiveness=int(stt_cfg_raw.get("vad_aggressiveness", 2)),
+                vad_hangover_ms=stt_cfg_raw.get("vad_hangover_ms"),
+                logprob_threshold=float(stt_cfg_raw.get("logprob_threshold", -1.0)),
+                no_speech_threshold=float(stt_cfg_raw.get("no_speech_threshold", 0.6)),
+                compression_ratio_threshold=float(
+                    stt_cfg_raw.get("compression_ratio_threshold", 2.4)
+                ),
+                retry_model=stt_cfg_raw.get("retry_model"),
+                accurate_model=stt_cfg_raw.get("accurate_model"),
+            ),
+            defer_load=True,
         )
+        self.loader.submit(
+            "stt", self.stt.load_models, self.stt.warmup if warmup else None
+        )
+        if self.stt.cfg.accurate_model:
+            self.loader.submit("stt-accurate", self._load_accurate_stt, after="stt")
+        if (stt_cfg_raw.get("command_grammar") or {}).get("enabled", False):
+            self.loader.submit("stt-commands", self._load_command_grammar)
         self.tts = TextToSpeech(
             self.config.get("tts", {}), self.recognizer, self.mic_device
         )
+        self.stt.set_noise_floor(self.noise_floor)
+        self.tts.set_noise_floor(self.noise_floor)
+        # promluvy běží ve vlastním vlákně; smyčka dostane handle
+        self.speech = SpeechQueue(self.tts)
+
+        # Přehrávání TTS v procesu: trvalý výstupní stream na sdíleném PyAudio
+        pb_raw = self.config.get("tts", {}).get("playback") or {}
+        self.playback: Optional[PlaybackEngine] = None
+        if pb_raw.get("in_process", True):
+            self.playback = PlaybackEngine(
+                self.audio,
+                PlaybackConfig(
+                    sample_rate=int(pb_raw.get("sample_rate", 22050)),
+                    block_size=int(pb_raw.get("block_size", 512)),
+                    device_index=pb_raw.get("device_index"),
+                ),
+            )
+            if self.playback.start():
+                self.tts.set_playback(self.playback)
+            else:
+                logger.warning("⚠️ Výstupní stream nedostupný; TTS použije přehrávače")
+                self.playback = None
+
+        # Potlačení ozvěny: přehrávání dává referenci, sběrnice z ní odečítá
+        aec_raw = audio_cfg_raw.get("echo_cancel") or {}
+        self.echo_canceller: Optional[EchoCanceller] = None
+        if (
+            aec_raw.get("enabled", True)
+            and self.bus.active
+            and self.playback is not None
+        ):
+            self.echo_canceller = EchoCanceller(
+                EchoCancellerConfig(
+                    sample_rate=self.bus.sample_rate,
+                    filter_ms=int(aec_raw.get("filter_ms", 128)),
+                    delay_ms=float(aec_raw.get("delay_ms", 0.0)),
+                    step=float(aec_raw.get("step", 0.5)),
+                    dtd_threshold=float(aec_raw.get("dtd_threshold", 0.5)),
+                )
+            )
+            self.playback.add_tap(self.echo_canceller.feed_reference)
+            self.bus.set_echo_canceller(self.echo_canceller)
+        self.loader.submit(
+            "tts", self.tts.load_voice, self.tts.warmup if warmup else None
+        )
+        self.loader.submit("tts-phrases", self._prebuild_phrases, after="tts")
+        tts_raw = self.config.get("tts", {})
+        if tts_raw.get("interrupt_enabled", False) and self.bus.active:
+            self.loader.submit("tts-barge-in", self._load_barge_in)
 
         # Wake-word
-        ww_cfg_raw = self.config.get("wake_word", {})
         self.detector = WakeWordDetector(
             self.audio,
             self.mic_device,
-            WakeWordConfig(
-                access_key=ww_cfg_raw.get("access_key", ""),
-                model_path=ww_cfg_raw.get("model_path", ""),
-                keyword=ww_cfg_raw.get("keyword", ""),
-                threshold=float(ww_cfg_raw.get("threshold", 0.5)),
-            ),
+            wake_word_config_from_dict(self.config.get("wake_word", {})),
+            bus=self.bus,
         )
         if not self.detector.start():
             logger.warning("⚠️ Wake word nedostupný; poběží kontinuální režim")
 
-        # LLM
-        llm_cfg_raw = self.config.get("llm", {})
-        self.llm = LlmEngine(
-            LlmConfig(
-                model_path=llm_cfg_raw.get(
-                    "model_path", "models/Llama-3.2-1B-Instruct.Q5_K_M.gguf"
-                ),
-                n_ctx=int(llm_cfg_raw.get("n_ctx", 4096)),
-                n_threads=int(llm_cfg_raw.get("n_threads", 4)),
-                max_tokens=int(llm_cfg_raw.get("max_tokens", 200)),
-                temperature=float(llm_cfg_raw.get("temperature", 0.2)),
-                top_p=float(llm_cfg_raw.get("top_p", 0.9)),
-                repeat_penalty=float(llm_cfg_raw.get("repeat_penalty", 1.1)),
-            )
-        )
+        if not background:
+            self.loader.wait("stt")
+            self.loader.wait("llm")
 
         # Akce
         self.actions = ActionExecutor(
             speak=self.speak, listen=self.listen_for_command, config=self.config
         )
 
-        # Napoj TTS hooky na wake stream pause/resume
-        self.tts.set_wake_stream_hooks(
-            self._pause_wake_stream, self._resume_wake_stream
-        )
+        # Napoj TTS hooky na wake stream pause/resume; s AEC mikrofon vlastní
+        # hlas neslyší, takže wake word poslouchá i během mluvení
+        if self.echo_canceller is None:
+            self.tts.set_wake_stream_hooks(
+                self._pause_wake_stream, self._resume_wake_stream
+            )
+        if self.bus.active:
+            self.tts.set_audio_source_factory(self._bus_source)
 
         self.failed_attempts = 0
+        # první povel po wake wordu převezme pre-roll z detektoru
+        self._fresh_wake = False
+
+    def _load_accurate_stt(self) -> None:
+        """Přesný STT model až po rychlém (typ backendu určí primární model)."""
+        if self.stt.cfg.accurate_model:
+            self.stt.load_extra_model(self.stt.cfg.accurate_model)
+
+    def _prebuild_phrases(self) -> None:
+        """Opakované hlášky do cache TTS, aby potvrzení hrálo bez syntézy."""
+        count = self.tts.prebuild_phrases(PROMPT_PHRASES + SPOKEN_PHRASES)
+        logger.info("🗣️ Předpřipraveno %d frází", count)
+
+    def _load_barge_in(self) -> None:
+        """Lokální detektor přerušení: VAD + Vosk gramatika z `interrupt_words`."""
+        tts_raw = self.config.get("tts", {})
+        raw = tts_raw.get("barge_in") or {}
+        grammar_raw = self.config.get("stt", {}).get("command_grammar") or {}
+        words = tts_raw.get("interrupt_words") or ["stop", "konec"]
+        spotter = create_command_recognizer(
+            words,
+            CommandRecognizerConfig(
+                model_path=raw.get(
+                    "model_path",
+                    grammar_raw.get(
+                        "model_path", "models/vosk-model-small-cs-0.4-rhasspy"
+                    ),
+                ),
+                sample_rate=self.bus.sample_rate,
+                min_confidence=float(raw.get("min_confidence", 0.6)),
+            ),
+        )
+        if spotter is None:
+            logger.warning("⚠️ Lokální přerušení nedostupné; použije se online STT")
+            return
+        self.tts.set_barge_in(
+            BargeInDetector(
+                self.bus,
+                spotter,
+                BargeInConfig(
+                    gate_mode=raw.get("gate_mode", "webrtc"),
+                    vad_aggressiveness=int(raw.get("vad_aggressiveness", 2)),
+                    rms_threshold=float(raw.get("rms_threshold", 300)),
+                ),
+            )
+        )
+
+    def _load_command_grammar(self) -> None:
+        """Offline gramatika povelů (Vosk) nad slovníkem ActionExecutoru."""
+        raw = self.config.get("stt", {}).get("command_grammar") or {}
+        self.stt.set_command_recognizer(
+            create_command_recognizer(
+                COMMAND_PHRASES,
+                CommandRecognizerConfig(
+                    model_path=raw.get(
+                        "model_path", "models/vosk-model-small-cs-0.4-rhasspy"
+                    ),
+                    sample_rate=int(
+                        self.config.get("audio", {}).get("sample_rate", 16000)
+                    ),
+                    min_confidence=float(raw.get("min_confidence", 0.7)),
+                ),
+            )
+        )
 
     def _pick_microphone(self) -> Optional[int]:
         """Zvol funkční vstupní zařízení (mikrofon)."""
@@ -138,25 +352,94 @@ class JarvisOrchestrator:
         """Obnov wake-word audio stream."""
         self.detector.start_stream()
 
-    def speak(self, text: str) -> None:
-        """Řekni text přes TTS a zaloguj ho."""
+    def _bus_source(self) -> BusAudioSource:
+        """Nový čtenář sdílené sběrnice jako `sr.AudioSource` od aktuální chvíle."""
+        return BusAudioSource(self.bus.reader())
+
+    def say(
+        self,
+        text: str,
+        priority: int = PRIORITY_NORMAL,
+        max_age: Optional[float] = None,
+    ) -> SpeechHandle:
+        """Zařaď text do fronty promluv a hned vrať handle (await/cancel)."""
         logger.info("🗣️ %s", text)
-        self.tts.speak(text)
+        return self.speech.submit(text, priority=priority, max_age=max_age)
+
+    def speak(self, text: str) -> None:
+        """Řekni text a počkej na dohrání (synchronní API pro akce)."""
+        self.say(text).wait()
+
+    async def _await_speech(self, handle: SpeechHandle) -> bool:
+        """Počkej na promluvu bez blokování smyčky; vrať True po wake wordu.
+
+        S AEC wake word poslouchá i během mluvení: jeho detekce promluvu utne
+        a další kolo začne hned (povel jde rovnou do STT).
+        """
+        if self.echo_canceller is None or not self.detector.background:
+            await handle
+            return False
+        wake = asyncio.ensure_future(
+            self.detector.wait_for_detection(since=time.monotonic())
+        )
+        spoken = asyncio.ensure_future(handle)
+        done, _ = await asyncio.wait(
+            {wake, spoken}, return_when=asyncio.FIRST_COMPLETED
+        )
+        if wake in done:
+            handle.cancel()
+            await spoken
+            return True
+        wake.cancel()
+        return False
 
     def listen_for_command(self) -> Optional[str]:
         """Získá jeden hlasový příkaz z mikrofonu pomocí STT."""
         if self.mic_device is None:
             return None
-        # pauza wake-streamu a krátká prodleva na uvolnění zařízení
+        stt_cfg = self.config.get("stt", {})
+        # pauza wake-streamu (se sběrnicí jen přestane číst detektor); musí být
+        # před čekáním na model, jinak detektor dál čte a pre-roll (omezený na
+        # `preroll_seconds`) začátek povelu ztratí
         self._pause_wake_stream()
+        preroll = self.detector.take_preroll() if self._fresh_wake else None
+        start = self.detector.take_command_start() if self._fresh_wake else None
+        self._fresh_wake = False
+        reader: Optional[BusReader] = None
+        if self.bus.active:
+            # sběrnice je stále otevřená – žádné zavírání zařízení ani prodlevy;
+            # STT naváže přesně tam, kde detektor přestal číst
+            pos = self.detector.position
+            if start is not None:
+                # po wake wordu čti od detekce: obnovení detektoru po potvrzení
+                # skočí na živá data a řeč z doby potvrzení by se ztratila;
+                # sběrnice ji drží celou, pre-roll by ji jen zdvojil
+                pos, preroll = start, None
+            reader = self.bus.reader() if pos is None else self.bus.reader_at(pos)
+        # STT model se může ještě načítat; pozice čtenáře je už daná, audio
+        # mezitím čeká v kruhovém bufferu sběrnice (až `bus_buffer_seconds`)
+        self.loader.wait("stt")
+        if reader is not None:
+            try:
+                if stt_cfg.get("streaming", False):
+                    return self._listen_streaming(reader, preroll)
+                result = self.stt.recognize_once(
+                    timeout=stt_cfg.get("timeout", 5),
+                    phrase_time_limit=stt_cfg.get("phrase_timeout", 6),
+                    source=BusAudioSource(reader),
+                    preroll=preroll,
+                )
+                return result if isinstance(result, str) else None
+            finally:
+                self._resume_wake_stream()
         # Některé ALSA/Pulse konfigurace potřebují delší čas na uvolnění
         time.sleep(0.2)
-        stt_cfg = self.config.get("stt", {})
         try:
             result = self.stt.recognize_once(
                 device_index=self.mic_device,
                 timeout=stt_cfg.get("timeout", 5),
                 phrase_time_limit=stt_cfg.get("phrase_timeout", 6),
+                preroll=preroll,
             )
             return result if isinstance(result, str) else None
         finally:
@@ -164,6 +447,22 @@ class JarvisOrchestrator:
             time.sleep(0.05)
             self._resume_wake_stream()
 
+    def _listen_streaming(
+        self, reader: BusReader, preroll: Optional[np.ndarray]
+    ) -> Optional[str]:
+        """Streamovaný přepis: průběžné hypotézy se logují, vrací se finální."""
+        stt_cfg = self.config.get("stt", {})
+        for hyp in self.stt.stream_transcribe(
+            reader,
+            timeout=stt_cfg.get("timeout", 5),
+            phrase_time_limit=stt_cfg.get("phrase_timeout", 6),
+            preroll=preroll,
+        ):
+            if hyp.final:
+                return hyp.text
+            logger.info("… %s", hyp.text)
+        return None
+
     def _load_system_prompt(self) -> Optional[str]:
         """Načti systémový prompt z disku, pokud existuje."""
         for path in (
@@ -178,22 +477,98 @@ class JarvisOrchestrator:
                 continue
         return None
 
-    def generate_ai_response(self, text: str) -> str:
-        """Vygeneruj odpověď LLM s lehkým očištěním prefixů."""
+    def _build_prompt(self, text: str) -> str:
         base = self._load_system_prompt()
         if base:
-            prompt = base.replace("{otazka}", text).replace("{question}", text)
-        else:
-            prompt = (
-                "Jsi užitečný český asistent. Odpovídej vždy pravdivě a stručně.\n\n"
-                f"Otázka: {text}\n\nOdpověď:"
-            )
-        ans = self.llm.generate(prompt)
+            return base.replace("{otazka}", text).replace("{question}", text)
+        return (
+            "Jsi užitečný český asistent. Odpovídej vždy pravdivě a stručně.\n\n"
+            f"Otázka: {text}\n\nOdpověď:"
+        )
+
+    @staticmethod
+    def _strip_answer_prefix(ans: str) -> str:
         # lehké očištění
         for prefix in ("Odpověď:", "Asistent:", "Assistant:"):
             if ans.startswith(prefix):
                 ans = ans[len(prefix) :].strip()
-        return ans or "Nevím"
+        return ans
+
+    def generate_ai_response(self, text: str) -> str:
+        """Vygeneruj odpověď LLM s lehkým očištěním prefixů."""
+        prompt = self._build_prompt(text)
+        self.loader.wait("llm")
+        return self._strip_answer_prefix(self.llm.generate(prompt)) or "Nevím"
+
+    def stream_ai_response(
+        self, text: str, stop: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        """Odpověď LLM po větách, jak se generuje (pro `TextToSpeech.speak_stream`).
+
+        `stop` se kontroluje po každém tokenu: po přerušení generování skončí
+        hned, ne až na konci věty (a uvolní model pro další kolo).
+        """
+        stop = stop or threading.Event()
+        prompt = self._build_prompt(text)
+        self.loader.wait("llm")
+        segmenter = SentenceSegmenter()
+        first = True
+        spoken = False
+        parts = self.llm.generate_stream(prompt)
+        try:
+            for part in itertools.chain(parts, [None]):
+                if stop.is_set():
+                    return
+                sentences = segmenter.flush() if part is None else segmenter.feed(part)
+                for sentence in sentences:
+                    if first:
+                        sentence = self._strip_answer_prefix(sentence)
+                        first = False
+                    if sentence:
+                        spoken = True
+                        logger.info("🗣️ %s", sentence)
+                        yield sentence
+        finally:
+            # přerušení mluvení uzavře i generování LLM
+            parts.close()
+        if not spoken:
+            yield "Nevím"
+
+    def _whole_ai_response(self, text: str) -> Iterator[str]:
+        """Odpověď bez streamování; generuje se až ve vlákně fronty promluv."""
+        answer = self.generate_ai_response(text)
+        logger.info("🗣️ %s", answer)
+        yield from split_sentences(answer)
+
+    def speak_ai_response(self, question: str) -> SpeechHandle:
+        """Zařaď odpověď na dotaz; se streamováním mluví už během generování."""
+        t0 = time.perf_counter()
+        stop = threading.Event()
+        if self.config.get("llm", {}).get("stream", True):
+            sentences = self.stream_ai_response(question, stop)
+        else:
+            sentences = self._whole_ai_response(question)
+        handle = self.speech.submit(sentences=sentences, priority=PRIORITY_NORMAL)
+
+        def report(_handle: SpeechHandle) -> None:
+            # promluva skončila (i přerušením) – generování už nikdo neposlouchá
+            stop.set()
+            if self.tts.first_audio_at is not None:
+                logger.info(
+                    "⏱️ První zvuk odpovědi za %.0f ms",
+                    (self.tts.first_audio_at - t0) * 1000.0,
+                )
+
+        handle.add_done_callback(report)
+        return handle
+
+    def _accurate_question(self, command: str) -> str:
+        """Volný dotaz přepiš znovu přesným modelem (povelům stačí rychlý)."""
+        self.loader.wait("stt-accurate")
+        question = self.stt.redecode_accurate() or command
+        if question != command:
+            logger.info("📝 Přesný přepis: %s", question)
+        return question
 
     async def run(self) -> None:
         """Hlavní asynchronní smyčka aplikace."""
@@ -201,41 +576,61 @@ class JarvisOrchestrator:
         conversation_mode = False
         if self.detector.active:
             logger.info("👂 Čekám na wake word…")
+            if self.config.get("wake_word", {}).get("threaded", True):
+                self.detector.start_background(asyncio.get_running_loop())
         else:
             logger.info("👂 Wake word nevhodný – kontinuální režim")
+        wake_armed_at = time.monotonic()
 
         try:
             while self.running:
                 if self.detector.active and not conversation_mode:
-                    if self.detector.detect():
-                        self.speak("Ano, poslouchám")
-                        conversation_mode = True
-                        self.failed_attempts = 0
+                    if self.detector.background:
+                        # detekce běží v capture vlákně, smyčka je volná
+                        await self.detector.wait_for_detection(since=wake_armed_at)
+                    elif not self.detector.detect():
+                        await asyncio.sleep(0.01)
                         continue
-                    await asyncio.sleep(0.01)
+                    if self.config.get("wake_word", {}).get("acknowledge", True):
+                        await self.say("Ano, poslouchám", PRIORITY_URGENT)
+                    conversation_mode = True
+                    self._fresh_wake = True
+                    self.failed_attempts = 0
                     continue
 
-                # konverzační režim
-                command = self.listen_for_command()
+                # konverzační režim – blokující kroky kola běží mimo smyčku
+                loop = asyncio.get_running_loop()
+                command = await loop.run_in_executor(None, self.listen_for_command)
                 if command:
-                    sys_result = self.actions.handle(command)
+                    sys_result = await loop.run_in_executor(
+                        None, self.actions.handle, command
+                    )
                     if sys_result is True:
                         conversation_mode = False
+                        wake_armed_at = time.monotonic()
                         continue
                     if sys_result is False:
                         continue
-                    # AI odpověď
-                    self.speak(self.generate_ai_response(command))
+                    question = await loop.run_in_executor(
+                        None, self._accurate_question, command
+                    )
+                    if await self._await_speech(self.speak_ai_response(question)):
+                        self._fresh_wake = True
+                        self.failed_attempts = 0
                     continue
 
                 self.failed_attempts += 1
                 if self.failed_attempts >= 3:
                     if conversation_mode:
-                        self.speak("Přecházím zpět do wake word režimu")
+                        await self.say("Přecházím zpět do wake word režimu")
                     conversation_mode = False
+                    wake_armed_at = time.monotonic()
                     self.failed_attempts = 0
                 else:
-                    self.speak("Nerozuměl jsem, zkuste to znovu")
+                    # pozdní výzva by jen rušila – po 2 s se zahodí
+                    await self.say(
+                        "Nerozuměl jsem, zkuste to znovu", PRIORITY_CHATTER, max_age=2.0
+                    )
                 await asyncio.sleep(0.2)
         except KeyboardInterrupt:
             pass
@@ -244,10 +639,19 @@ class JarvisOrchestrator:
 
     def cleanup(self) -> None:
         """Ukonči audio zdroje a wake word detektor."""
+        logger.info("📊 Wake word framy: %s", self.detector.stats())
+        self.loader.shutdown()
+        self.speech.close()
+        if self.playback is not None:
+            self.playback.close()
         try:
             self.detector.stop()
         except (OSError, AttributeError):  # pragma: no cover - best effort
             pass
+        try:
+            self.bus.stop()
+        except (OSError, AttributeError):  # pragma: no cover
+            pass
         try:
             self.audio.terminate()
         except (OSError, AttributeError):  # pragma: no cover
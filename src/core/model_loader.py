@@ -0,0 +1,114 @@
+"""Paralelní načítání modelů na pozadí s futures připravenosti.
+
+Orchestrátor zaregistruje načtení (a zahřátí) každé těžké komponenty jako
+úlohu; ty běží souběžně ve vláknech, zatímco hlavní smyčka už čeká na wake
+word. Kolo konverzace blokuje jen tehdy, když model, který právě potřebuje,
+ještě není připravený. Úloha závislá na jiné (`after=`) se do poolu zařadí
+až po jejím dokončení, takže čekáním neblokuje pracovní vlákno.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelLoader:
+    """Registr úloh načítání: `submit(name, load, warmup)` → `wait(name)`."""
+
+    def __init__(self, max_workers: int = 2):
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="model-load"
+        )
+        self._futures: Dict[str, Future] = {}
+
+    def submit(
+        self,
+        name: str,
+        load: Callable[[], None],
+        warmup: Optional[Callable[[], None]] = None,
+        after: Optional[str] = None,
+    ) -> Future:
+        """Spusť načtení (a případně zahřátí) komponenty na pozadí.
+
+        S `after` se úloha spustí až po úspěšném načtení dané komponenty; když
+        ta selže, úloha se přeskočí.
+        """
+
+        def task() -> float:
+            t0 = time.perf_counter()
+            load()
+            loaded = time.perf_counter()
+            if warmup is not None:
+                warmup()
+            logger.info(
+                "✅ %s připraven (načtení %.1f s, zahřátí %.1f s)",
+                name,
+                loaded - t0,
+                time.perf_counter() - loaded,
+            )
+            return time.perf_counter() - t0
+
+        dependency = self._futures.get(after) if after else None
+        if dependency is None:
+            future = self._pool.submit(task)
+            self._futures[name] = future
+            return future
+
+        future = Future()
+        self._futures[name] = future
+
+        def start(dep: Future) -> None:
+            if dep.cancelled() or dep.exception() is not None:
+                logger.info("⏭️ %s přeskočen: %s se nenačetl", name, after)
+                future.set_result(0.0)
+                return
+            try:
+                inner = self._pool.submit(task)
+            except RuntimeError as exc:  # pool už je ukončený
+                future.set_exception(exc)
+                return
+            inner.add_done_callback(lambda done: _copy_outcome(done, future))
+
+        dependency.add_done_callback(start)
+        return future
+
+    def ready(self, name: str) -> bool:
+        """Je komponenta připravená? Neregistrované komponenty jsou vždy připravené."""
+        future = self._futures.get(name)
+        return future is None or future.done()
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Blokuj, dokud se komponenta nenačte; False při chybě nebo timeoutu."""
+        future = self._futures.get(name)
+        if future is None:
+            return True
+        if not future.done():
+            logger.info("⏳ Čekám na načtení: %s", name)
+        try:
+            future.result(timeout=timeout)
+            return True
+        except FutureTimeout:
+            return False
+        except Exception as exc:  # pylint: disable=broad-except
+            # chyba z vlákna se jen zaloguje – komponenta poběží v degradovaném režimu
+            logger.error("❌ Načtení %s selhalo: %s", name, exc)
+            return False
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _copy_outcome(source: Future, target: Future) -> None:
+    """Přenes výsledek (či chybu) vnitřní úlohy do registrované future."""
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
@@ -1,13 +1,15 @@
 """LlmEngine: tenká vrstva nad llama-cpp pro generování odpovědí.
 
 Závislosti jsou volitelné; pokud nejsou k dispozici, engine vrátí
-deterministickou zprávu o nedostupnosti.
+deterministickou zprávu o nedostupnosti. `Llama` není thread-safe, proto
+všechna volání modelu (i rozpracovaný stream) drží jeden zámek.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
+import threading
 
 
 try:
@@ -28,9 +30,15 @@ class LlmConfig:
 
 
 class LlmEngine:
-    def __init__(self, cfg: LlmConfig):
+    def __init__(self, cfg: LlmConfig, defer_load: bool = False):
         self.cfg = cfg
         self._llm = None
+        self._lock = threading.Lock()
+        if not defer_load:
+            self.load_model()
+
+    def load_model(self) -> None:
+        """Načti GGUF model (blokující; lze volat z vlákna na pozadí)."""
         if Llama is not None:
             try:
                 self._llm = Llama(
@@ -42,20 +50,64 @@ class LlmEngine:
             except (OSError, RuntimeError, ValueError):  # pragma: no cover
                 self._llm = None
 
+    def warmup(self) -> None:
+        """Jeden token na zahřátí (mmap stránky, KV cache, kernely)."""
+        if self._llm is None:
+            return
+        try:
+            with self._lock:
+                self._llm("Ahoj", max_tokens=1, temperature=0.0)
+        except (OSError, RuntimeError, ValueError):  # pragma: no cover
+            pass
+
+    def _params(self) -> Dict[str, Any]:
+        return {
+            "max_tokens": self.cfg.max_tokens,
+            "temperature": self.cfg.temperature,
+            "top_p": self.cfg.top_p,
+            "repeat_penalty": self.cfg.repeat_penalty,
+            "stop": ["\n\n", "Otázka:", "Pokyny:"],
+        }
+
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         if self._llm is None:
             return "LLM není dostupný"
         full_prompt = (system_prompt + "\n\n" if system_prompt else "") + prompt
         try:
-            res: Dict[str, Any] = self._llm(
-                full_prompt,
-                max_tokens=self.cfg.max_tokens,
-                temperature=self.cfg.temperature,
-                top_p=self.cfg.top_p,
-                repeat_penalty=self.cfg.repeat_penalty,
-                stop=["\n\n", "Otázka:", "Pokyny:"],
-            )
+            with self._lock:
+                res: Dict[str, Any] = self._llm(full_prompt, **self._params())
             text = (res.get("choices", [{}])[0] or {}).get("text", "").strip()
             return text or "Nevím"
         except (OSError, RuntimeError, ValueError):  # pragma: no cover
             return "Promiňte, momentálně nemohu odpovědět"
+
+    def generate_stream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        """Generuj odpověď po kouscích textu, jak je model vrací.
+
+        Stejné parametry a zastavovací řetězce jako `generate`. Uzavření
+        generátoru (`close()`) generování přeruší a uvolní model; další
+        generování do té doby čeká na zámek.
+        """
+        if self._llm is None:
+            yield "LLM není dostupný"
+            return
+        full_prompt = (system_prompt + "\n\n" if system_prompt else "") + prompt
+        produced = False
+        try:
+            with self._lock:
+                parts = self._llm(full_prompt, stream=True, **self._params())
+                try:
+                    for part in parts:
+                        text = (part.get("choices", [{}])[0] or {}).get("text", "")
+                        if text:
+                            produced = True
+                            yield text
+                finally:
+                    close = getattr(parts, "close", None)
+                    if close is not None:
+                        close()
+        except (OSError, RuntimeError, ValueError):  # pragma: no cover
+            if not produced:
+                yield "Promiňte, momentálně nemohu odpovědět"
@@ -13,6 +13,62 @@ import urllib.parse
 import webbrowser
 
 
+# Celé fráze povelů pro offline gramatiku (CommandRecognizer). Každá (kromě
+# potvrzení ano/ne) musí projít klíčovými slovy v `ActionExecutor.handle`;
+# volné dotazy a vyhledávání sem nepatří, ty jdou přes Whisper.
+COMMAND_PHRASES = (
+    "konec",
+    "stop",
+    "ukončit",
+    "vypni jarvis",
+    "kolik je hodin",
+    "kolik je",
+    "čas",
+    "vypni počítač",
+    "ano",
+    "ne",
+    "ztiš",
+    "ztiš zvuk",
+    "ztlum",
+    "tišeji",
+    "zesil",
+    "zesil zvuk",
+    "nahlas",
+    "přidej hlasitost",
+    "ztlum zvuk",
+    "umlč",
+    "zamkni",
+    "zamkni obrazovku",
+    "uzamkni",
+    "kalkulačka",
+    "spusť kalkulačku",
+    "editor",
+    "spusť editor",
+    "firefox",
+    "spusť firefox",
+    "prohlížeč",
+    "otevři prohlížeč",
+)
+
+# Pevné odpovědi akcí pro předpřipravení v cache frází TTS (bez proměnných částí).
+SPOKEN_PHRASES = (
+    "Z bezpečnostních důvodů nemohu mazat ani upravovat soubory.",
+    "Přecházím do wake word režimu",
+    "Opravdu chcete vypnout počítač? Řekněte ano pro potvrzení",
+    "Vypínám počítač",
+    "Vypnutí zrušeno",
+    "Ztišuji zvuk",
+    "Zvyšuji hlasitost",
+    "Přepínám ztlumení",
+    "Zamykám obrazovku",
+    "Spouštím kalkulačku",
+    "Spouštím editor",
+    "Spouštím Firefox",
+    "Výsledky jsou otevřené v prohlížeči",
+    "Co mám vyhledat?",
+)
+
+
 class ActionExecutor:
     """Zpracuje systémové příkazy a vrací tri-state výsledek.
 
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Unit testy pro sdílenou audio sběrnici (bez HW)."""
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy.signal import resample_poly
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio.audio_bus import AudioBus, AudioBusConfig, RingBuffer  # noqa: E402
+from src.audio.capture_convert import StreamResampler  # noqa: E402
+from src.audio.noise_floor import NoiseFloorConfig, NoiseFloorEstimator  # noqa: E402
+
+
+def test_ring_buffer_wraps_around():
+    """Čtení přes hranici bufferu vrací souvislá data."""
+    ring = RingBuffer(8)
+    ring.write(np.arange(6, dtype=np.int16))
+    ring.write(np.arange(6, 10, dtype=np.int16))
+    data, start = ring.read(4, 6)
+    assert start == 4
+    assert data.tolist() == [4, 5, 6, 7, 8, 9]
+
+
+def test_ring_buffer_lagging_reader_skips_to_oldest():
+    """Čtenář, který zaostal o víc než kapacitu, čte od nejstaršího vzorku."""
+    ring = RingBuffer(4)
+    ring.write(np.arange(10, dtype=np.int16))
+    data, start = ring.read(0, 4)
+    assert start == 6
+    assert data.tolist() == [6, 7, 8, 9]
+
+
+def test_readers_have_independent_cursors():
+    """Každý čtenář sběrnice čte stejná data nezávisle na ostatních."""
+    bus = AudioBus(None, None, AudioBusConfig(sample_rate=16000, buffer_seconds=1))
+    wake, stt = bus.reader(), bus.reader()
+    bus.push(np.arange(512, dtype=np.int16))
+    assert wake.read(512, timeout=0.1).tolist() == list(range(512))
+    assert stt.read(256, timeout=0.1).tolist() == list(range(256))
+    assert stt.read(256, timeout=0.1).tolist() == list(range(256, 512))
+    assert wake.read(1, timeout=0.01) is None
+
+
+def test_blocking_read_wakes_on_push():
+    """Blokující čtení se probudí, jakmile capture vlákno zapíše data."""
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=1))
+    reader = bus.reader()
+    timer = threading.Timer(0.05, bus.push, args=(np.ones(160, dtype=np.int16),))
+    timer.start()
+    data = reader.read(160, timeout=2.0)
+    timer.join()
+    assert data is not None and int(data.sum()) == 160
+
+
+def test_noise_floor_tracks_background_from_bus_tap():
+    """Odhad šumu se plní z capture tapu a řeč ho nezvedne."""
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=1))
+    noise = NoiseFloorEstimator(NoiseFloorConfig(initial=1000.0, min_threshold=0))
+    bus.add_tap(noise.update)
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        bus.push((rng.standard_normal(512) * 50).astype(np.int16))
+    quiet = noise.floor
+    assert 40 < quiet < 70
+    for _ in range(20):
+        bus.push(np.full(512, 3000, dtype=np.int16))
+    assert noise.floor < quiet * 1.5
+    assert noise.threshold() == pytest.approx(noise.floor * 2.5)
+
+
+def test_stream_resampler_matches_resample_poly_across_blocks():
+    """Streamový polyfázový resampler dá po blocích totéž co resample_poly."""
+    rate = 44100
+    t = np.arange(rate) / rate
+    x = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.float32)
+    resampler = StreamResampler(rate, 16000)
+    out = np.concatenate(
+        [resampler.process(x[i : i + 1000]) for i in range(0, len(x), 1000)]
+    )
+    ref = resample_poly(x, resampler.up, resampler.down)
+    assert len(out) == len(ref) == 16000
+    # stejný filtr, jen kauzální zpoždění o polovinu délky
+    delay = 10
+    assert np.abs(out[delay:] - ref[:-delay]).max() < 1.0
+
+
+def test_bus_converts_capture_once_into_int16_and_float32():
+    """48 kHz capture + gain → 16 kHz int16 i float32 se stejnými pozicemi."""
+    bus = AudioBus(
+        None,
+        None,
+        AudioBusConfig(buffer_seconds=1, capture_rate=48000, input_gain=2.0),
+    )
+    reader = bus.reader()
+    bus.push(np.full(4800, 1000, dtype=np.int16))  # 100 ms
+    pcm = reader.read(1500, timeout=0.1)
+    assert pcm is not None
+    # ustálená část: 1000 × gain 2
+    assert abs(int(pcm[-1]) - 2000) <= 2
+    floats = reader.float_range(reader.position - 1500, reader.position)
+    assert floats.dtype == np.float32
+    assert np.allclose(floats * 32768.0, pcm, atol=1.0)
+
+
+def test_input_gain_saturates_instead_of_wrapping():
+    """Přebuzený vstup se ořízne na rozsah int16, nepřeteče do opačného znaménka."""
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=1, input_gain=3.0))
+    reader = bus.reader()
+    bus.push(np.array([20000, -20000, 1000], dtype=np.int16))
+    pcm = reader.read(3, timeout=0.1)
+    assert pcm is not None
+    assert pcm.tolist() == [32767, -32768, 3000]
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Unit testy pro lokální detekci přerušení (Vosk nahrazen stubem)."""
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio import command_recognizer  # noqa: E402
+from src.audio.audio_bus import AudioBus, AudioBusConfig  # noqa: E402
+from src.audio.barge_in import BargeInConfig, BargeInDetector  # noqa: E402
+from src.audio.command_recognizer import (  # noqa: E402
+    CommandRecognizerConfig,
+    create_command_recognizer,
+)
+from src.audio.playback import PlaybackConfig, PlaybackEngine  # noqa: E402
+from src.audio.text_to_speech import TextToSpeech, _Clip  # noqa: E402
+
+RATE = 16000
+WORDS = ["stop", "konec", "ticho"]
+
+
+class FakeSpotter:
+    """Stub KaldiRecognizer: po `after` nenulových vzorcích hlásí `word` v partial."""
+
+    word = "stop"
+    after = 4800  # 0.3 s řeči
+
+    def __init__(self, model, rate, grammar):
+        self.grammar = json.loads(grammar)
+        self.samples = 0
+
+    def SetWords(self, enabled):  # noqa: N802 - API voskového rozpoznávače
+        pass
+
+    def Reset(self):  # noqa: N802
+        self.samples = 0
+
+    def AcceptWaveform(self, data):  # noqa: N802
+        # počítá jen vzorky řeči (lookback ticha slovo „nedokončí“)
+        self.samples += int(np.count_nonzero(np.frombuffer(data, dtype=np.int16)))
+        return False
+
+    def _text(self):
+        return self.word if self.samples >= self.after else ""
+
+    def PartialResult(self):  # noqa: N802
+        return json.dumps({"partial": self._text()})
+
+    def Result(self):  # noqa: N802
+        return json.dumps({"text": ""})
+
+    def FinalResult(self):  # noqa: N802
+        text = self._text()
+        return json.dumps(
+            {"text": text, "result": [{"word": w, "conf": 0.9} for w in text.split()]}
+        )
+
+
+@pytest.fixture(name="bus")
+def fixture_bus():
+    return AudioBus(None, None, AudioBusConfig(sample_rate=RATE, buffer_seconds=5))
+
+
+@pytest.fixture(name="spotter")
+def fixture_spotter(monkeypatch, tmp_path):
+    monkeypatch.setattr(command_recognizer, "Model", lambda path: path)
+    monkeypatch.setattr(command_recognizer, "KaldiRecognizer", FakeSpotter)
+    monkeypatch.setattr(command_recognizer, "SetLogLevel", lambda level: None)
+    FakeSpotter.word, FakeSpotter.after = "stop", 4800
+    return create_command_recognizer(
+        WORDS, CommandRecognizerConfig(model_path=str(tmp_path))
+    )
+
+
+def _tone(seconds: float, amp: int = 4000) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (np.sin(2 * np.pi * 220 * t) * amp).astype(np.int16)
+
+
+def _detector(bus, spotter) -> BargeInDetector:
+    return BargeInDetector(bus, spotter, BargeInConfig(gate_mode="rms"))
+
+
+def test_silence_is_not_fed_to_spotter(bus, spotter):
+    """Ticho zastaví brána; spotter dostane jen řeč (s krátkým lookbackem)."""
+    detector = _detector(bus, spotter)
+    for _ in range(20):
+        assert detector.process(np.zeros(480, dtype=np.int16)) is None
+    assert spotter._rec.samples == 0 and not detector._in_speech
+    tone = _tone(0.5)
+    words = [detector.process(tone[i : i + 480]) for i in range(0, len(tone), 480)]
+    assert "stop" in words
+
+
+def test_words_outside_grammar_do_not_interrupt(bus, spotter):
+    FakeSpotter.word = "[unk]"
+    detector = _detector(bus, spotter)
+    tone = np.concatenate([_tone(0.6), np.zeros(RATE, dtype=np.int16)])
+    words = [detector.process(tone[i : i + 480]) for i in range(0, len(tone), 480)]
+    assert not any(words)
+
+
+def test_stop_word_silences_playback_quickly(bus, spotter):
+    """„stop“ na živém streamu zastaví přehrávání do ~150 ms."""
+    engine = PlaybackEngine(None, PlaybackConfig(sample_rate=RATE, block_size=160))
+    engine._stream = object()  # „otevřený“ výstup bez PyAudio
+    tts = TextToSpeech({"interrupt_enabled": True, "sentence_pause_ms": 0}, None, None)
+    tts.set_playback(engine)
+    tts.set_barge_in(_detector(bus, spotter))
+    tts._synthesize = lambda chunk: _Clip(  # type: ignore[method-assign]
+        chunk, pcm=np.ones(5 * RATE, dtype=np.int16), sample_rate=RATE
+    )
+    tts._listen_for_interrupt = None  # online naslouchání se nesmí volat
+    done = threading.Event()
+    trigger = {}
+
+    def world() -> None:
+        """Výstupní zařízení a mikrofon v reálném čase (bloky po 10 ms)."""
+        speech = _tone(1.0)
+        pos = 0
+        while not done.is_set():
+            engine.pull(160)
+            block = np.zeros(160, dtype=np.int16)
+            if time.perf_counter() - start > 0.2 and pos < len(speech):
+                block = speech[pos : pos + 160]
+                pos += 160
+                if pos >= FakeSpotter.after and "t" not in trigger:
+                    trigger["t"] = time.perf_counter()
+            bus.push(block)
+            time.sleep(0.01)
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=world, daemon=True)
+    thread.start()
+    tts.speak("Dlouhá odpověď. Další věta.")
+    stopped = time.perf_counter()
+    done.set()
+    thread.join()
+    assert "t" in trigger
+    assert stopped - trigger["t"] < 0.15
+    assert stopped - start < 2.0  # ne celých 10 s audia
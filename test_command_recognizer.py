@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Unit testy pro offline gramatiku povelů (Vosk nahrazen stubem)."""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio import command_recognizer  # noqa: E402
+from src.audio.audio_bus import AudioBus, AudioBusConfig  # noqa: E402
+from src.audio.command_recognizer import (  # noqa: E402
+    CommandRecognizerConfig,
+    create_command_recognizer,
+)
+from src.audio.speech_to_text import SpeechToText, STTConfig  # noqa: E402
+from src.system.action_executor import COMMAND_PHRASES  # noqa: E402
+
+
+class FakeKaldi:
+    """Stub KaldiRecognizer: vrací předem nastavený text, počítá přijaté vzorky."""
+
+    text = ""
+    conf = 1.0
+
+    def __init__(self, model, rate, grammar):
+        self.model, self.rate = model, rate
+        self.grammar = json.loads(grammar)
+        self.samples = 0
+        FakeKaldi.last = self
+
+    def SetWords(self, enabled):  # noqa: N802 - API voskového rozpoznávače
+        self.words = enabled
+
+    def Reset(self):  # noqa: N802
+        self.samples = 0
+
+    def AcceptWaveform(self, data):  # noqa: N802
+        self.samples += len(data) // 2
+        return False
+
+    def Result(self):  # noqa: N802
+        return json.dumps({"text": ""})
+
+    def FinalResult(self):  # noqa: N802
+        words = [{"word": w, "conf": self.conf} for w in self.text.split()]
+        return json.dumps({"text": self.text, "result": words})
+
+
+@pytest.fixture(name="grammar")
+def fixture_grammar(monkeypatch, tmp_path):
+    monkeypatch.setattr(command_recognizer, "Model", lambda path: path)
+    monkeypatch.setattr(command_recognizer, "KaldiRecognizer", FakeKaldi)
+    monkeypatch.setattr(command_recognizer, "SetLogLevel", lambda level: None)
+    FakeKaldi.text, FakeKaldi.conf = "", 1.0
+    return create_command_recognizer(
+        COMMAND_PHRASES, CommandRecognizerConfig(model_path=str(tmp_path))
+    )
+
+
+def test_grammar_contains_vocabulary_and_garbage_class(grammar):
+    """Gramatika obsahuje fráze povelů a třídu [unk]."""
+    assert "zamkni obrazovku" in FakeKaldi.last.grammar
+    assert FakeKaldi.last.grammar[-1] == "[unk]"
+    assert grammar.phrases == sorted(set(COMMAND_PHRASES))
+
+
+@pytest.mark.parametrize(
+    "text, conf, expected",
+    [
+        ("zamkni obrazovku", 0.95, "zamkni obrazovku"),
+        ("zesil [unk]", 0.95, None),  # část mimo gramatiku → Whisper
+        ("kolik je hodin", 0.4, None),  # nízká jistota
+        ("", 1.0, None),  # ticho
+    ],
+)
+def test_result_accepts_only_confident_in_grammar_phrases(
+    grammar, text, conf, expected
+):
+    """Povel projde jen celý, z gramatiky a s dostatečnou jistotou."""
+    FakeKaldi.text, FakeKaldi.conf = text, conf
+    grammar.reset()
+    grammar.feed(np.zeros(1600, dtype=np.int16))
+    assert grammar.result() == expected
+
+
+def test_missing_model_disables_grammar(tmp_path):
+    """Bez modelu (nebo vosk) se vrátí None a STT běží jen přes Whisper."""
+    assert (
+        create_command_recognizer(
+            COMMAND_PHRASES, CommandRecognizerConfig(model_path=str(tmp_path / "x"))
+        )
+        is None
+    )
+
+
+def test_stream_transcribe_returns_grammar_command_without_whisper(
+    grammar, monkeypatch
+):
+    """Povel z gramatiky se vrátí jako finální hypotéza bez volání Whisperu."""
+    stt = SpeechToText(STTConfig(service="google", partial_interval=5.0))
+    stt.recognizer.energy_threshold = 300
+    stt.recognizer.pause_threshold = 0.3
+    stt.set_command_recognizer(grammar)
+
+    def no_whisper(audio, partial=False):
+        raise AssertionError("Whisper se pro povel nemá volat")
+
+    monkeypatch.setattr(stt, "_transcribe_array", no_whisper)
+    FakeKaldi.text = "ztlum zvuk"
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=10))
+    reader = bus.reader()
+    t = np.arange(int(0.8 * 16000)) / 16000
+    tone = (np.sin(2 * np.pi * 220 * t) * 4000).astype(np.int16)
+    bus.push(np.concatenate([tone, np.zeros(16000, dtype=np.int16)]))
+    hyps = list(stt.stream_transcribe(reader, timeout=2.0))
+    assert [(h.text, h.final) for h in hyps] == [("ztlum zvuk", True)]
+    # rozpoznávač dostal celou promluvu včetně nástupu
+    assert FakeKaldi.last.samples >= len(tone)
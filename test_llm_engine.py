@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Unit testy pro LlmEngine (streamování, serializace volání modelu) bez modelu."""
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.llm.engine import LlmConfig, LlmEngine  # noqa: E402
+
+
+def test_llm_generate_stream_yields_parts():
+    engine = LlmEngine(LlmConfig(model_path="x.gguf"), defer_load=True)
+    assert list(engine.generate_stream("Ahoj")) == ["LLM není dostupný"]
+    calls = []
+
+    def fake_llm(prompt, stream=False, **params):
+        calls.append((stream, params["stop"]))
+        return iter([{"choices": [{"text": t}]} for t in ("Ahoj", "", " světe.")])
+
+    engine._llm = fake_llm
+    assert list(engine.generate_stream("Ahoj")) == ["Ahoj", " světe."]
+    assert calls == [(True, ["\n\n", "Otázka:", "Pokyny:"])]
+
+
+def test_llm_generation_is_serialized_until_stream_closes():
+    """Rozpracovaný stream drží model; další generování počká na jeho `close()`."""
+    engine = LlmEngine(LlmConfig(model_path="x.gguf"), defer_load=True)
+    active = []
+
+    def fake_llm(prompt, stream=False, **params):
+        active.append(prompt)
+        assert len(active) == 1, "souběžné volání Llama"
+        try:
+            for t in ("Jedna", " dvě", " tři."):
+                yield {"choices": [{"text": t}]}
+        finally:
+            active.remove(prompt)
+
+    engine._llm = fake_llm
+    first = engine.generate_stream("A")
+    assert next(first) == "Jedna"
+    second: list = []
+    thread = threading.Thread(
+        target=lambda: second.extend(engine.generate_stream("B")), daemon=True
+    )
+    thread.start()
+    thread.join(0.2)
+    assert thread.is_alive() and not second  # čeká na zámek
+    first.close()
+    thread.join(1.0)
+    assert second == ["Jedna", " dvě", " tři."]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Unit testy pro ModelLoader (načítání modelů na pozadí)."""
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.core.model_loader import ModelLoader  # noqa: E402
+
+
+def test_components_load_in_parallel_and_wait_blocks_until_ready():
+    """Obě načtení běží souběžně; `wait` počká na dokončení včetně zahřátí."""
+    barrier = threading.Barrier(2, timeout=2.0)
+    calls = []
+    loader = ModelLoader(max_workers=2)
+    loader.submit("stt", barrier.wait, lambda: calls.append("stt-warmup"))
+    loader.submit("llm", barrier.wait)
+    assert loader.wait("stt", timeout=3.0)
+    assert loader.wait("llm", timeout=3.0)
+    assert loader.ready("stt") and calls == ["stt-warmup"]
+    loader.shutdown()
+
+
+def test_failed_load_is_reported_not_raised():
+    """Chyba při načtení se zaloguje a `wait` vrátí False; neznámá jména jsou ready."""
+    loader = ModelLoader()
+
+    def broken() -> None:
+        raise OSError("model nenalezen")
+
+    loader.submit("llm", broken)
+    assert loader.wait("llm") is False
+    assert loader.ready("tts") and loader.wait("tts")
+    loader.shutdown()
+
+
+def test_unexpected_load_error_does_not_escape_wait():
+    loader = ModelLoader()
+
+    def broken() -> None:
+        raise KeyError("chybí klíč v configu")
+
+    loader.submit("tts", broken)
+    assert loader.wait("tts", timeout=2.0) is False
+    loader.shutdown()
+
+
+def test_dependent_job_waits_without_holding_a_worker():
+    """Se dvěma vlákny běží „llm“ i „stt“ hned; závislá úloha až po „stt“."""
+    order = []
+    release = threading.Event()
+    loader = ModelLoader(max_workers=2)
+    loader.submit("llm", lambda: (release.wait(2.0), order.append("llm")))
+    loader.submit("stt", lambda: order.append("stt"))
+    loader.submit("stt-accurate", lambda: order.append("accurate"), after="stt")
+    assert loader.wait("stt-accurate", timeout=1.0)
+    assert order == ["stt", "accurate"]
+    release.set()
+    assert loader.wait("llm", timeout=2.0)
+    loader.shutdown()
+
+
+def test_dependent_job_is_skipped_when_dependency_fails():
+    ran = []
+    loader = ModelLoader()
+
+    def broken() -> None:
+        raise OSError("hlas nenalezen")
+
+    loader.submit("tts", broken)
+    loader.submit("tts-phrases", lambda: ran.append(1), after="tts")
+    assert loader.wait("tts-phrases", timeout=2.0) and not ran
+    loader.shutdown()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Unit testy pro cache frází TTS."""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio import text_to_speech  # noqa: E402
+from src.audio.phrase_cache import PhraseCache  # noqa: E402
+from src.audio.text_to_speech import TextToSpeech, _Clip, split_sentences  # noqa: E402
+
+
+def _pcm(n: int) -> np.ndarray:
+    return np.ones(n, dtype=np.int16)
+
+
+def test_key_depends_on_text_and_voice():
+    """Stejný text a hlas → stejný klíč; jiná rychlost hlasu → jiný klíč."""
+    voice = {"service": "espeak", "speed": 150}
+    assert PhraseCache.key("Ano,  poslouchám", voice) == PhraseCache.key(
+        "Ano, poslouchám", dict(voice)
+    )
+    assert PhraseCache.key("Ano, poslouchám", voice) != PhraseCache.key(
+        "Ano, poslouchám", {"service": "espeak", "speed": 180}
+    )
+
+
+def test_lru_evicts_least_recently_used_over_byte_limit():
+    cache = PhraseCache(max_bytes=3000)
+    cache.put("a", _pcm(500), 16000)
+    cache.put("b", _pcm(500), 16000)
+    assert cache.get("a") is not None  # „b“ je teď nejdéle nepoužité
+    cache.put("c", _pcm(700), 16000)
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.nbytes == 2400
+    cache.put("huge", _pcm(5000), 16000)  # větší než celý limit – neukládá se
+    assert "huge" not in cache and len(cache) == 2
+
+
+def test_prebuilt_phrases_are_played_without_synthesis():
+    """Po předpřipravení vrací `_synthesize` PCM z cache bez volání backendu."""
+    tts = TextToSpeech({"service": "espeak"}, None, None)
+    rendered = []
+
+    def render(chunk):
+        rendered.append(chunk)
+        return _pcm(160), 22050
+
+    tts._render_pcm = render  # type: ignore[method-assign]
+    phrase = "Opravdu chcete vypnout počítač? Řekněte ano pro potvrzení"
+    assert tts.prebuild_phrases([phrase, "Ztišuji zvuk"]) == 3
+    assert tts.prebuild_phrases([phrase]) == 0
+    assert rendered == split_sentences(phrase) + ["Ztišuji zvuk"]
+
+    clip = tts._synthesize("Ztišuji zvuk")
+    assert clip.pcm is not None and clip.sample_rate == 22050
+    # nepředpřipravený text jde dál na běžný backend
+    assert tts._synthesize("Jiná věta").pcm is None
+
+
+def test_piper_voice_without_piper_backend_caches_nothing(monkeypatch):
+    """Bez Piper workeru i CLI se pod klíčem Piper hlasu neuloží espeak."""
+    monkeypatch.setattr(text_to_speech.shutil, "which", lambda name: None)
+    tts = TextToSpeech({"service": "piper", "piper_worker": False}, None, None)
+    assert tts.prebuild_phrases(["Ano, poslouchám"]) == 0
+    assert tts._synthesize("Ano, poslouchám").pcm is None
+
+
+def test_cached_pcm_without_player_falls_back_to_direct_speech(monkeypatch):
+    monkeypatch.setattr(text_to_speech.shutil, "which", lambda name: None)
+    tts = TextToSpeech({"service": "espeak"}, None, None)
+    spoken = []
+    tts._spawn_direct = lambda chunk: spoken.append(chunk)  # type: ignore
+    tts._play_clip(_Clip("Ztišuji zvuk", pcm=_pcm(160), sample_rate=22050))
+    assert spoken == ["Ztišuji zvuk"]
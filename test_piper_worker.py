@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Unit testy pro trvalý Piper worker (PiperVoice nahrazen stubem)."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio import piper_worker  # noqa: E402
+from src.audio.piper_worker import PiperWorker, PiperWorkerConfig  # noqa: E402
+from src.audio.text_to_speech import TextToSpeech  # noqa: E402
+
+
+class FakeVoice:
+    """Stub PiperVoice (API piper-tts 1.2): počítá načtení, umí „spadnout“."""
+
+    loads = 0
+    crashes = 0
+
+    class config:  # noqa: N801 - napodobuje atribut PiperVoice.config
+        sample_rate = 22050
+
+    @classmethod
+    def load(cls, model_path, config_path=None):
+        cls.loads += 1
+        return cls()
+
+    def synthesize_stream_raw(self, text, speaker_id=None, length_scale=None):
+        if FakeVoice.crashes > 0:
+            FakeVoice.crashes -= 1
+            raise RuntimeError("onnxruntime: session selhala")
+        for word in text.split():
+            yield np.full(len(word) * 10, 7, dtype=np.int16).tobytes()
+
+
+@pytest.fixture(name="voice")
+def fixture_voice(monkeypatch):
+    FakeVoice.loads = 0
+    FakeVoice.crashes = 0
+    monkeypatch.setattr(piper_worker, "PiperVoice", FakeVoice)
+    monkeypatch.setattr(piper_worker, "SynthesisConfig", None)
+    return FakeVoice
+
+
+def test_voice_is_loaded_once_and_streams_pcm(voice):
+    """Více vět – jediné načtení modelu, PCM v paměti bez souborů."""
+    worker = PiperWorker(PiperWorkerConfig(model_path="cs.onnx"))
+    first = worker.synthesize("Dobrý den")
+    second = worker.synthesize("Ano")
+    assert voice.loads == 1
+    assert first.dtype == np.int16 and len(first) == 80
+    assert len(second) == 30
+    assert worker.sample_rate == 22050
+
+
+def test_crash_restarts_voice_and_gives_up_after_limit(voice):
+    """Pád inference → nové načtení a úspěch; opakované pády → worker se vzdá."""
+    worker = PiperWorker(PiperWorkerConfig(model_path="cs.onnx", max_restarts=3))
+    voice.crashes = 1
+    assert len(worker.synthesize("Ahoj")) == 40
+    assert worker.restarts == 1 and voice.loads == 2 and worker.failures == 0
+
+    voice.crashes = 10
+    assert worker.synthesize("Ahoj") is None
+    assert worker.synthesize("Ahoj") is None
+    assert not worker.available
+
+
+def test_tts_uses_worker_clip_without_temp_files(voice, tmp_path):
+    """TTS s Piperem syntetizuje přes worker a klip nese PCM, ne WAV."""
+    model = tmp_path / "cs.onnx"
+    model.write_bytes(b"")
+    tts = TextToSpeech({"service": "piper", "model": str(model)}, None, None)
+    tts.load_voice()
+    clip = tts._synthesize("Dobrý den.")
+    assert clip.wav_path is None
+    assert clip.sample_rate == 22050 and len(clip.pcm) == 90
+    assert voice.loads == 1
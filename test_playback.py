@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Unit testy pro přehrávání PCM v procesu (bez HW, callback volá test)."""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio.playback import PlaybackConfig, PlaybackEngine  # noqa: E402
+from src.audio.text_to_speech import TextToSpeech, _Clip  # noqa: E402
+
+
+def _engine() -> PlaybackEngine:
+    return PlaybackEngine(None, PlaybackConfig(sample_rate=16000, block_size=160))
+
+
+def test_buffers_play_back_to_back_without_gaps():
+    """Dva buffery se v jednom bloku navážou bez ticha, pak jde ticho."""
+    engine = _engine()
+    first = engine.play(np.full(100, 1, dtype=np.int16))
+    second = engine.play(np.full(100, 2, dtype=np.int16))
+    block = engine.pull(160)
+    assert block[:100].tolist() == [1] * 100 and block[100:].tolist() == [2] * 60
+    assert not first.done and not second.done  # blok ještě nezazněl
+    time.sleep(0.015)
+    block = engine.pull(160)
+    assert block[:40].tolist() == [2] * 40 and not block[40:].any()
+    assert first.done and not second.done and engine.busy
+    time.sleep(0.015)
+    engine.pull(160)
+    assert second.done and not engine.busy
+
+
+def test_handle_finishes_only_after_dac_latency():
+    """`wait()` nevrátí, dokud poslední vzorek neprojde výstupním bufferem."""
+    engine = _engine()
+    handle = engine.play(np.ones(160, dtype=np.int16))
+    engine.pull(160, dac_delay=0.05)  # celý buffer předán, zazní za 50–60 ms
+    time.sleep(0.02)
+    engine.pull(160, dac_delay=0.05)
+    assert not handle.wait(0.0)
+    time.sleep(0.05)
+    engine.pull(160, dac_delay=0.05)
+    assert handle.wait(0.0) and not handle.stopped
+
+
+def test_first_sample_timestamp_includes_dac_delay_and_offset():
+    engine = _engine()
+    engine.play(np.ones(80, dtype=np.int16))
+    later = engine.play(np.ones(80, dtype=np.int16))
+    t0 = time.perf_counter()
+    engine.pull(160, dac_delay=0.02)
+    # druhý buffer začíná 80 vzorků (5 ms) po začátku bloku, který zazní za 20 ms
+    assert 0.025 <= later.started_at - t0 < 0.035
+
+
+def test_stop_all_silences_next_block():
+    engine = _engine()
+    handle = engine.play(np.ones(16000, dtype=np.int16))
+    engine.pull(160)
+    engine.stop_all()
+    assert handle.done and handle.stopped
+    assert not engine.pull(160).any()
+
+
+def test_play_resamples_to_stream_rate():
+    engine = _engine()
+    handle = engine.play(np.ones(22050, dtype=np.int16), rate=22050)
+    assert len(handle.pcm) == 16000
+
+
+def test_tts_speaks_pcm_clips_through_engine():
+    """TTS zařadí PCM do enginu bez procesu přehrávače a zapíše čas prvního zvuku."""
+    engine = _engine()
+    engine.start = lambda: True  # type: ignore[method-assign]
+    engine._stream = object()  # „otevřený“ stream bez PyAudio
+    tts = TextToSpeech({"sentence_pause_ms": 0}, None, None)
+    tts.set_playback(engine)
+    tts._synthesize = lambda chunk: _Clip(  # type: ignore[method-assign]
+        chunk, pcm=np.ones(1600, dtype=np.int16), sample_rate=16000
+    )
+    played = []
+    stop = threading.Event()
+
+    def device() -> None:
+        while not stop.is_set():
+            block = engine.pull(160)
+            played.append(int(block.sum()))
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=device, daemon=True)
+    thread.start()
+    t0 = time.perf_counter()
+    tts.speak("První věta. Druhá věta.")
+    stop.set()
+    thread.join()
+    assert sum(played) == 3200
+    assert tts.first_audio_at is not None and tts.first_audio_at >= t0
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Unit testy pro frontu promluv (priorita, přednost, zastarání, await/cancel)."""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio.speech_queue import (  # noqa: E402
+    CANCELLED,
+    INTERRUPTED,
+    PRIORITY_CHATTER,
+    PRIORITY_URGENT,
+    SPOKEN,
+    STALE,
+    SpeechQueue,
+)
+from src.audio.text_to_speech import TextToSpeech, _Clip  # noqa: E402
+
+
+class FakeTTS:
+    """Mluví `duration` s na promluvu; `cancel` ji utne jako přerušení."""
+
+    def __init__(self, duration: float = 0.2):
+        self.duration = duration
+        self.spoken: list = []
+        self.started = threading.Event()
+
+    def speak(self, text, cancel=None) -> bool:
+        self.spoken.append(text)
+        self.started.set()
+        return cancel.wait(self.duration)
+
+    def speak_stream(self, sentences, cancel=None) -> bool:
+        return self.speak(" ".join(sentences), cancel)
+
+
+def test_urgent_preempts_chatter_and_runs_before_queued_items():
+    tts = FakeTTS(duration=2.0)
+    speech = SpeechQueue(tts)
+    chatter = speech.submit("Povídání.", priority=PRIORITY_CHATTER)
+    assert tts.started.wait(1.0)
+    later = speech.submit("Další povídání.", priority=PRIORITY_CHATTER)
+    t0 = time.perf_counter()
+    urgent = speech.submit("Hotovo.", priority=PRIORITY_URGENT)
+    assert chatter.wait(1.0) == INTERRUPTED
+    assert time.perf_counter() - t0 < 0.2
+    assert tts.spoken[1] == "Hotovo."
+    urgent.cancel()
+    later.cancel()
+    speech.close()
+    assert urgent.result == CANCELLED and later.result == CANCELLED
+
+
+def test_stale_low_priority_message_is_dropped():
+    tts = FakeTTS(duration=0.3)
+    speech = SpeechQueue(tts)
+    speech.submit("Dlouhá odpověď.")
+    generated = []
+
+    def source():
+        generated.append("start")
+        yield "Nikdo to neuslyší."
+
+    lazy = source()
+    stale = speech.submit(sentences=lazy, priority=PRIORITY_CHATTER, max_age=0.1)
+    fresh = speech.submit("Zkuste to znovu.", priority=PRIORITY_CHATTER)
+    assert stale.wait(2.0) == STALE and fresh.wait(2.0) == SPOKEN
+    assert tts.spoken == ["Dlouhá odpověď.", "Zkuste to znovu."]
+    # zastaralý zdroj (LLM) se uzavře, aniž by začal generovat
+    assert list(lazy) == [] and not generated
+    speech.close()
+
+
+def test_await_keeps_event_loop_free():
+    """Během mluvení běží jiné korutiny (příprava dalšího kola)."""
+    speech = SpeechQueue(FakeTTS(duration=0.3))
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.ensure_future(ticker())
+        outcome = await speech.submit("Ahoj.")
+        task.cancel()
+        return outcome, ticks
+
+    outcome, ticks = asyncio.run(main())
+    assert outcome == SPOKEN and ticks >= 10
+    speech.close()
+
+
+def test_cancel_event_stops_real_tts_quickly():
+    tts = TextToSpeech({"sentence_pause_ms": 0}, None, None)
+    tts._synthesize = lambda chunk: _Clip(chunk, "x.wav")  # type: ignore[method-assign]
+
+    class _Proc:
+        def __init__(self):
+            self.end = time.perf_counter() + 5.0
+
+        def poll(self):
+            return 0 if time.perf_counter() >= self.end else None
+
+        def terminate(self):
+            self.end = 0.0
+
+    tts._play_clip = lambda clip: _Proc()  # type: ignore[method-assign]
+    speech = SpeechQueue(tts)
+    handle = speech.submit("Velmi dlouhá věta. Další věta.")
+    time.sleep(0.1)
+    t0 = time.perf_counter()
+    assert handle.cancel()
+    assert handle.wait(1.0) == CANCELLED
+    assert time.perf_counter() - t0 < 0.2
+    speech.close()
+
+
+def test_tts_error_finishes_handle_and_keeps_queue_alive():
+    class BrokenOnce(FakeTTS):
+        def speak(self, text, cancel=None) -> bool:
+            if text == "Chyba.":
+                raise KeyError(text)
+            return super().speak(text, cancel)
+
+    speech = SpeechQueue(BrokenOnce(duration=0.05))
+    failed = speech.submit("Chyba.")
+    after = speech.submit("Pořád mluvím.")
+    assert failed.wait(1.0) == INTERRUPTED
+    assert after.wait(1.0) == SPOKEN
+    speech.close()
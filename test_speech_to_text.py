@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""Unit testy pro SpeechToText nad sdílenou sběrnicí (bez HW a modelů)."""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio.audio_bus import AudioBus, AudioBusConfig, BusAudioSource  # noqa: E402
+from src.audio.speech_to_text import SpeechToText, STTConfig, _to_float32  # noqa: E402
+
+RATE = 16000
+
+
+def _tone(seconds: float, amplitude: int = 4000) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (np.sin(2 * np.pi * 220 * t) * amplitude).astype(np.int16)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * RATE), dtype=np.int16)
+
+
+@pytest.fixture(name="stt")
+def fixture_stt(monkeypatch):
+    """STT bez modelů; přepis vrací délku audia, ať jde sledovat růst okna."""
+    stt = SpeechToText(STTConfig(service="google", partial_interval=0.5))
+    stt.recognizer.energy_threshold = 300
+    stt.recognizer.pause_threshold = 0.5
+    monkeypatch.setattr(
+        stt, "_transcribe_array", lambda audio, partial=False: f"{len(audio) // 1600}"
+    )
+    return stt
+
+
+def test_stream_transcribe_emits_partials_then_final(stt):
+    """Během mluvení přijdou částečné hypotézy, po pauze finální."""
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=10))
+    reader = bus.reader()
+    bus.push(np.concatenate([_silence(0.3), _tone(1.6), _silence(1.0)]))
+    hyps = list(stt.stream_transcribe(reader, timeout=2.0))
+    assert [h.final for h in hyps] == [False, False, False, True]
+    partial_lengths = [int(h.text) for h in hyps[:-1]]
+    assert partial_lengths == sorted(partial_lengths)
+    assert int(hyps[-1].text) > partial_lengths[-1]
+
+
+def test_stream_transcribe_resamples_non_16k_bus_for_whisper(stt):
+    """Sběrnice na 8 kHz: Whisper dostane 16 kHz audio se stejnou délkou v sekundách."""
+    bus = AudioBus(None, None, AudioBusConfig(sample_rate=8000, buffer_seconds=10))
+    reader = bus.reader()
+    t = np.arange(int(1.6 * 8000)) / 8000
+    tone = (np.sin(2 * np.pi * 220 * t) * 4000).astype(np.int16)
+    bus.push(np.concatenate([np.zeros(2400, np.int16), tone, np.zeros(8000, np.int16)]))
+    hyps = list(stt.stream_transcribe(reader, timeout=2.0))
+    assert hyps and hyps[-1].final
+    # `fixture_stt` vrací počet 100ms úseků při 16 kHz – odpovídá délce promluvy
+    assert abs(int(hyps[-1].text) / 10 - hyps[-1].audio_seconds) < 0.15
+    assert hyps[-1].audio_seconds > 1.5
+
+
+def test_stream_transcribe_times_out_without_speech(stt):
+    """Bez řeči do timeoutu generátor skončí bez hypotéz."""
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=10))
+    reader = bus.reader()
+    bus.push(_silence(2.0))
+    assert not list(stt.stream_transcribe(reader, timeout=1.0))
+
+
+def test_stream_transcribe_uses_preroll_as_utterance_start(stt):
+    """Pre-roll se zpracuje před živými daty ze sběrnice."""
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=10))
+    reader = bus.reader()
+    bus.push(_silence(1.0))
+    hyps = list(stt.stream_transcribe(reader, timeout=1.0, preroll=_tone(0.4)))
+    assert hyps and hyps[-1].final
+
+
+def test_recognize_once_feeds_whisper_float32_array(monkeypatch):
+    """openai-whisper dostane přímo float32 pole 16 kHz, ne cestu k WAV."""
+    seen = {}
+
+    class FakeWhisper:
+        """Stub openai-whisper modelu."""
+
+        def transcribe(self, audio, **kwargs):
+            seen["audio"], seen["kwargs"] = audio, kwargs
+            return {"text": " kolik je hodin "}
+
+    stt = SpeechToText(STTConfig(service="google", language="cs-CZ"))
+    stt.recognizer.energy_threshold = 300
+    stt.recognizer.dynamic_energy_threshold = False
+    monkeypatch.setattr(stt, "_whisper_model", FakeWhisper())
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=10))
+    source = BusAudioSource(bus.reader(), timeout=0.2)
+    bus.push(np.concatenate([_tone(1.0), _silence(1.5)]))
+    assert stt.recognize_once(timeout=2.0, source=source) == "kolik je hodin"
+    assert isinstance(seen["audio"], np.ndarray) and seen["audio"].dtype == np.float32
+    assert 0.0 < float(np.abs(seen["audio"]).max()) <= 1.0
+    assert seen["kwargs"]["language"] == "cs"
+
+
+def _voice(seconds: float) -> np.ndarray:
+    """Hlasu podobný signál (harmonické + amplitudová modulace) pro webrtcvad."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    harmonics = sum(
+        np.sin(2 * np.pi * f * t) / (k + 1)
+        for k, f in enumerate([150, 300, 450, 600, 900, 1200])
+    )
+    return (harmonics * 3000 * (1 + 0.5 * np.sin(2 * np.pi * 4 * t))).astype(np.int16)
+
+
+def _hum(seconds: float) -> np.ndarray:
+    """Síťový brum nad energetickým prahem, ale bez řeči."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (np.sin(2 * np.pi * 50 * t) * 1500).astype(np.int16)
+
+
+@pytest.mark.parametrize("mode", ["energy", "vad"])
+def test_vad_endpointer_ends_utterance_under_hum(stt, mode):
+    """Brum drží energetický práh „v řeči“, VAD větu ukončí po hangoveru."""
+    stt.cfg.endpointer = mode
+    stt.cfg.vad_hangover_ms = 300
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=10))
+    reader = bus.reader()
+    voice = _voice(1.0)
+    bus.push(np.concatenate([_hum(0.5), voice + _hum(1.0), _hum(3.0)]))
+    final = list(stt.stream_transcribe(reader, timeout=2.0, phrase_time_limit=9))[-1]
+    assert final.final
+    if mode == "vad":
+        assert final.audio_seconds < 2.2
+    else:
+        assert final.audio_seconds > 4.0
+
+
+def test_recognize_once_with_vad_endpointer(monkeypatch):
+    """`recognize_once` s VAD zachytí jen promluvu a pošle ji do přepisu."""
+    seen = {}
+    stt = SpeechToText(
+        STTConfig(service="google", endpointer="vad", vad_hangover_ms=300)
+    )
+    stt.recognizer.dynamic_energy_threshold = False
+
+    def fake_transcribe(audio, partial=False):
+        seen["seconds"] = len(audio) / RATE
+        return "rozsviť"
+
+    monkeypatch.setattr(stt, "_transcribe_array", fake_transcribe)
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=10))
+    source = BusAudioSource(bus.reader(), timeout=0.2)
+    bus.push(np.concatenate([_hum(0.5), _voice(1.0) + _hum(1.0), _hum(3.0)]))
+    assert stt.recognize_once(timeout=2.0, source=source) == "rozsviť"
+    assert 1.0 <= seen["seconds"] < 2.2
+
+
+def test_faster_whisper_backend_keeps_model_and_joins_segments(monkeypatch):
+    """faster_whisper na CPU nedegraduje model a spojí segmenty do textu."""
+    # pylint: disable=protected-access
+    from src.audio import speech_to_text  # pylint: disable=import-outside-toplevel
+
+    created = {}
+
+    class FakeWhisperModel:
+        """Stub faster_whisper.WhisperModel."""
+
+        def __init__(self, model, **kwargs):
+            created["model"], created["kwargs"] = model, kwargs
+
+        def transcribe(self, audio, **kwargs):
+            created["transcribe"] = kwargs
+            segments = (SimpleNamespace(text=t) for t in [" zhasni ", "v kuchyni "])
+            return segments, SimpleNamespace(language="cs")
+
+    monkeypatch.setattr(speech_to_text, "WhisperModel", FakeWhisperModel)
+    stt = SpeechToText(
+        STTConfig(
+            service="faster_whisper", whisper_model="small", device="cpu", beam_size=3
+        )
+    )
+    assert created["model"] == "small"
+    assert created["kwargs"]["compute_type"] == "int8"
+    assert created["kwargs"]["device"] == "cpu"
+    assert stt._transcribe_array(_silence(0.5)) == "zhasni v kuchyni"
+    assert created["transcribe"]["beam_size"] == 3
+    stt._transcribe_array(_silence(0.5), partial=True)
+    assert created["transcribe"]["beam_size"] == 1
+
+
+class _ScoredWhisper:
+    """Stub openai-whisper modelu vracející segment s metrikami důvěry."""
+
+    def __init__(self, text, avg_logprob, no_speech_prob=0.01, compression_ratio=1.2):
+        self.calls = 0
+        self.result = {
+            "text": text,
+            "segments": [
+                {
+                    "avg_logprob": avg_logprob,
+                    "no_speech_prob": no_speech_prob,
+                    "compression_ratio": compression_ratio,
+                }
+            ],
+        }
+
+    def transcribe(self, audio, **kwargs):  # pylint: disable=unused-argument
+        self.calls += 1
+        return self.result
+
+
+@pytest.mark.parametrize(
+    "primary, retry, expected",
+    [
+        # jistý přepis: přijmout, větší model neběží
+        (_ScoredWhisper("zhasni", -0.2), _ScoredWhisper("x", -0.1), "zhasni"),
+        # ticho/šum: zamítnout bez dalších pokusů
+        (_ScoredWhisper("Titulky", -1.5, no_speech_prob=0.9), None, None),
+        # nejistý přepis: zopakovat větším modelem
+        (_ScoredWhisper("zasni", -1.4), _ScoredWhisper("zhasni", -0.3), "zhasni"),
+        # halucinace (opakování): ani retry neprojde → Google ("")
+        (
+            _ScoredWhisper("ano ano ano", -0.5, compression_ratio=3.1),
+            _ScoredWhisper("ano ano", -1.6),
+            "",
+        ),
+    ],
+)
+def test_confidence_cascade(monkeypatch, primary, retry, expected):
+    """Kaskáda přijme, zopakuje větším modelem, nebo zamítne podle metrik."""
+    # pylint: disable=protected-access
+    stt = SpeechToText(STTConfig(service="google", retry_model="medium"))
+    monkeypatch.setattr(stt, "_whisper_model", primary)
+    stt._extra_models["medium"] = ("whisper", retry)
+    assert stt._transcribe_array(_silence(0.5)) == expected
+    assert primary.calls == 1
+    if expected == primary.result["text"]:
+        # přijatý první přepis = druhý model vůbec neběžel
+        assert retry.calls == 0
+
+
+def test_redecode_accurate_reuses_buffered_utterance(monkeypatch):
+    """Přesný model přepíše stejné audio; po retry stejným modelem se přeskočí."""
+    # pylint: disable=protected-access
+    fast = _ScoredWhisper("kdo napsal babicku", -0.4)
+    accurate = _ScoredWhisper("Kdo napsal Babičku?", -0.2)
+    stt = SpeechToText(
+        STTConfig(service="google", whisper_model="base", accurate_model="small")
+    )
+    monkeypatch.setattr(stt, "_whisper_model", fast)
+    stt._extra_models["small"] = ("whisper", accurate)
+    assert stt.redecode_accurate() is None  # zatím žádná promluva
+
+    stt.last_audio = _to_float32(_tone(1.0))
+    assert stt._transcribe_array(stt.last_audio) == "kdo napsal babicku"
+    assert stt.redecode_accurate() == "Kdo napsal Babičku?"
+    assert accurate.calls == 1
+
+    # nejistý rychlý přepis už zopakoval retry model = přesný model
+    stt.cfg.retry_model = "small"
+    fast.result["segments"][0]["avg_logprob"] = -1.5
+    assert stt._transcribe_array(stt.last_audio) == "Kdo napsal Babičku?"
+    assert stt.redecode_accurate() is None
+    assert accurate.calls == 2
+
+
+def test_accurate_pass_runs_after_cpu_downgraded_primary(monkeypatch):
+    """Na CPU se "small" načte jako "tiny" – přesný i retry "small" pak běží."""
+    from src.audio import speech_to_text  # pylint: disable=import-outside-toplevel
+
+    models = {
+        "tiny": _ScoredWhisper("kdo napsal babicku", -1.5),
+        "small": _ScoredWhisper("Kdo napsal Babičku?", -0.2),
+    }
+    monkeypatch.setattr(
+        speech_to_text,
+        "whisper",
+        SimpleNamespace(load_model=lambda name, device=None: models[name]),
+    )
+    monkeypatch.setattr(speech_to_text, "pipeline", None)
+    stt = SpeechToText(
+        STTConfig(
+            service="whisper_openai",
+            whisper_model="small",
+            device="cpu",
+            accurate_model="small",
+        )
+    )
+    stt.last_audio = _to_float32(_tone(1.0))
+    assert (
+        stt._transcribe_array(stt.last_audio) == ""
+    )  # pylint: disable=protected-access
+    assert stt.redecode_accurate() == "Kdo napsal Babičku?"
+
+    stt.cfg.retry_model = "small"
+    # pylint: disable-next=protected-access
+    assert stt._transcribe_array(stt.last_audio) == "Kdo napsal Babičku?"
+    assert stt.redecode_accurate() is None
+    assert models["small"].calls == 2
+
+
+def test_hf_onnx_export_is_cached_per_host(monkeypatch, tmp_path):
+    """ONNX export proběhne jen poprvé, další načtení jde z cache adresáře."""
+    from src.audio import hf_optimize  # pylint: disable=import-outside-toplevel
+
+    exports = []
+
+    class FakeOrtModel:
+        """Stub optimum ORTModelForSpeechSeq2Seq."""
+
+        @classmethod
+        def from_pretrained(cls, path, export=False):
+            if export:
+                exports.append(path)
+            return cls()
+
+        def save_pretrained(self, directory):
+            (Path(directory) / "config.json").write_text("{}", encoding="utf-8")
+
+    processor = SimpleNamespace(
+        tokenizer="tok", feature_extractor="fe", save_pretrained=lambda d: None
+    )
+    monkeypatch.setattr(hf_optimize, "ORTModelForSpeechSeq2Seq", FakeOrtModel)
+    monkeypatch.setattr(
+        hf_optimize,
+        "AutoProcessor",
+        SimpleNamespace(from_pretrained=lambda name: processor),
+        raising=False,
+    )
+    monkeypatch.setattr(
+        hf_optimize, "pipeline", lambda task, **kwargs: SimpleNamespace(**kwargs)
+    )
+    for _ in range(2):
+        pipe = hf_optimize.load_optimized_asr(
+            "openai/whisper-small", "onnx", str(tmp_path)
+        )
+        assert isinstance(pipe.model, FakeOrtModel)
+    assert exports == ["openai/whisper-small"]
+    cached = hf_optimize.cache_path(str(tmp_path), "openai/whisper-small", "onnx")
+    assert (cached / "config.json").exists()
+    assert not cached.with_name(cached.name + ".tmp").exists()
+
+
+def test_stream_transcribe_takes_float32_from_bus(stt, monkeypatch):
+    """Finální audio pro Whisper je float32 úsek ze sběrnice (se zesílením)."""
+    from src.audio import speech_to_text  # pylint: disable=import-outside-toplevel
+
+    def no_conversion(pcm):
+        raise AssertionError("audio ze sběrnice se nemá převádět znovu")
+
+    monkeypatch.setattr(speech_to_text, "_to_float32", no_conversion)
+    bus = AudioBus(None, None, AudioBusConfig(buffer_seconds=10, input_gain=2.0))
+    reader = bus.reader()
+    bus.push(np.concatenate([_silence(0.3), _tone(1.0), _silence(1.0)]))
+    hyps = list(stt.stream_transcribe(reader, timeout=2.0))
+    assert hyps and hyps[-1].final
+    assert stt.last_audio.dtype == np.float32
+    assert stt.last_audio.max() == pytest.approx(8000 / 32768, rel=0.01)
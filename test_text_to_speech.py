@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Unit testy pro TextToSpeech (pipeline syntéza → přehrávání, streamování vět)."""
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio.text_to_speech import (  # noqa: E402
+    SentenceSegmenter,
+    TextToSpeech,
+    _Clip,
+    split_sentences,
+)
+
+SYNTH_S = 0.15
+PLAY_S = 0.15
+
+
+class _FakeProc:
+    """Přehrávač, který „hraje“ pevně danou dobu."""
+
+    def __init__(self, duration: float):
+        self._end = time.perf_counter() + duration
+
+    def poll(self):
+        return 0 if time.perf_counter() >= self._end else None
+
+    def terminate(self) -> None:
+        self._end = 0.0
+
+
+def _tts(events: list, lookahead: int = 2) -> TextToSpeech:
+    # výchozí `sentence_pause_ms` (0): mezi větami žádné umělé ticho
+    tts = TextToSpeech({"synth_lookahead": lookahead}, None, None)
+    lock = threading.Lock()
+
+    def synthesize(chunk: str) -> _Clip:
+        time.sleep(SYNTH_S)
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        with lock:
+            events.append(("synth", chunk, path))
+        return _Clip(chunk, path)
+
+    def play(clip: _Clip) -> _FakeProc:
+        with lock:
+            events.append(("play", clip.text, clip.wav_path))
+        return _FakeProc(PLAY_S)
+
+    tts._synthesize = synthesize  # type: ignore[method-assign]
+    tts._play_clip = play  # type: ignore[method-assign]
+    return tts
+
+
+def test_synthesis_overlaps_playback():
+    """Další věta se syntetizuje během přehrávání – celkem ≈ syntéza + audio."""
+    events: list = []
+    tts = _tts(events)
+    t0 = time.perf_counter()
+    tts.speak("První věta. Druhá věta. Třetí věta. Čtvrtá věta.")
+    elapsed = time.perf_counter() - t0
+
+    played = [e[1] for e in events if e[0] == "play"]
+    assert played == ["První věta.", "Druhá věta.", "Třetí věta.", "Čtvrtá věta."]
+    # sekvenčně by to bylo 4 × (syntéza + přehrání) = 1.2 s
+    assert elapsed < SYNTH_S + 4 * PLAY_S + 0.2
+    # přehrané WAVy jsou uklizené
+    assert not any(os.path.exists(e[2]) for e in events if e[0] == "synth")
+
+
+def test_interrupt_stops_synthesis_and_cleans_pending_wavs():
+    """Po přerušení se další věty nepřehrají a připravené WAVy se smažou."""
+    events: list = []
+    tts = _tts(events, lookahead=1)
+    checks = iter([False, True])
+    tts._listen_for_interrupt = lambda timeout_s: next(checks, True)  # type: ignore
+    tts.speak("Jedna. Dvě. Tři. Čtyři. Pět. Šest.")
+
+    played = [e[1] for e in events if e[0] == "play"]
+    synthesized = [e for e in events if e[0] == "synth"]
+    assert played == ["Jedna."]
+    # syntéza se zastavila s omezeným předstihem, ne až na konci textu
+    assert len(synthesized) <= 3
+    assert not any(os.path.exists(e[2]) for e in synthesized)
+
+
+@pytest.mark.parametrize("step", [1, 3, 7])
+def test_segmenter_matches_split_sentences_for_any_token_split(step):
+    """Průběžné dělení po tokenech dá stejné věty jako `split_sentences` celku."""
+    text = "Praha je hlavní město. Má asi 1.3 milionu obyvatel! Víte proč?  Ano… Konec"
+    segmenter = SentenceSegmenter()
+    out = []
+    for i in range(0, len(text), step):
+        out.extend(segmenter.feed(text[i : i + step]))
+    out.extend(segmenter.flush())
+    assert out == split_sentences(text)
+
+
+def test_stream_first_sentence_plays_before_generation_ends():
+    """První věta zazní, zatímco zdroj (LLM) ještě generuje další."""
+    events: list = []
+    tts = _tts(events)
+    closed = threading.Event()
+    first_played = threading.Event()
+
+    def play(clip: _Clip) -> _FakeProc:
+        events.append(("play", clip.text, clip.wav_path))
+        first_played.set()
+        return _FakeProc(PLAY_S)
+
+    tts._play_clip = play  # type: ignore[method-assign]
+
+    def llm():
+        try:
+            yield "Dobrý den."
+            # generování druhé věty čeká, až zazní první
+            assert first_played.wait(2.0)
+            yield "Tady Jarvis."
+        finally:
+            closed.set()
+
+    tts.speak_stream(llm())
+    assert [e[1] for e in events if e[0] == "play"] == ["Dobrý den.", "Tady Jarvis."]
+    assert closed.wait(1.0)
+
+
+def test_stream_interrupt_closes_source():
+    """Po přerušení se zdroj vět uzavře a negeneruje dál."""
+    events: list = []
+    tts = _tts(events, lookahead=1)
+    tts._listen_for_interrupt = lambda timeout_s: True  # type: ignore
+    closed = threading.Event()
+    generated = []
+
+    def llm():
+        try:
+            for i in range(100):
+                generated.append(i)
+                yield f"Věta {i}."
+                time.sleep(0.05)
+        finally:
+            closed.set()
+
+    tts.speak_stream(llm())
+    assert [e[1] for e in events if e[0] == "play"] == ["Věta 0."]
+    assert closed.wait(1.0)
+    assert len(generated) < 20
+
+
+def test_synthesis_error_does_not_hang_speak():
+    """Výjimka ze syntézy ukončí promluvu, `speak` se vrátí."""
+    tts = TextToSpeech({"sentence_pause_ms": 0}, None, None)
+
+    def broken(chunk: str) -> _Clip:
+        raise KeyError(chunk)
+
+    tts._synthesize = broken  # type: ignore[method-assign]
+    done = threading.Event()
+    thread = threading.Thread(
+        target=lambda: (tts.speak("Ahoj. Jak se máš."), done.set()), daemon=True
+    )
+    thread.start()
+    assert done.wait(2.0)
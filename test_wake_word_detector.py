@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Unit testy pro WakeWordDetector nad sdílenou sběrnicí (bez HW a Porcupine)."""
+import asyncio
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position,import-error
+from src.audio import wake_word_detector as wwd  # noqa: E402
+from src.audio.audio_bus import AudioBus, AudioBusConfig  # noqa: E402
+from src.audio.speech_to_text import SpeechToText, STTConfig  # noqa: E402
+from src.audio.vad_gate import SpeechGate, SpeechGateConfig  # noqa: E402
+from src.audio.wake_word_onnx import LogMelFrontend  # noqa: E402
+
+FRAME = 512
+
+
+class FakePorcupine:
+    """Stub Porcupine: detekuje frame, jehož první vzorek je 1000."""
+
+    frame_length = FRAME
+
+    def __init__(self):
+        self.processed = 0
+
+    def process(self, pcm):
+        self.processed += 1
+        return 0 if int(pcm[0]) == 1000 else -1
+
+    def delete(self):
+        return None
+
+
+class FakePyAudio:
+    """Stub PyAudio: stream se „otevře“, data se do sběrnice tlačí ručně."""
+
+    def get_format_from_width(self, _width):
+        return 8
+
+    def open(self, **_kwargs):
+        return types.SimpleNamespace(stop_stream=lambda: None, close=lambda: None)
+
+
+@pytest.fixture(name="bus")
+def fixture_bus():
+    """Sběrnice nad falešným zařízením."""
+    bus = AudioBus(FakePyAudio(), 0, AudioBusConfig(buffer_seconds=2))
+    assert bus.start()
+    yield bus
+    bus.stop()
+
+
+@pytest.fixture(name="detector")
+def fixture_detector(monkeypatch, bus):
+    """Detektor s falešným Porcupine čtoucí ze sběrnice."""
+    monkeypatch.setattr(
+        wwd, "pvporcupine", types.SimpleNamespace(create=lambda **_kw: FakePorcupine())
+    )
+    det = wwd.WakeWordDetector(
+        None, None, wwd.WakeWordConfig(access_key="", model_path=""), bus=bus
+    )
+    assert det.start()
+    yield det
+    det.stop()
+
+
+def _frame(first: int) -> np.ndarray:
+    frame = np.zeros(FRAME, dtype=np.int16)
+    frame[0] = first
+    return frame
+
+
+def test_detect_reads_from_bus(detector, bus):
+    """Synchronní detect() čte framy ze sběrnice."""
+    bus.push(_frame(0))
+    bus.push(_frame(1000))
+    assert detector.detect() is False
+    assert detector.detect() is True
+
+
+def test_background_detection_signals_event_loop(detector, bus):
+    """Capture vlákno předá detekci do asyncio smyčky."""
+
+    async def scenario():
+        assert detector.start_background(asyncio.get_running_loop())
+        bus.push(_frame(0))
+        bus.push(_frame(1000))
+        return await asyncio.wait_for(detector.wait_for_detection(), timeout=2.0)
+
+    assert asyncio.run(scenario()) > 0
+    detector.stop_background()
+    assert not detector.background
+
+
+def test_preroll_contains_frames_after_detection(detector, bus):
+    """Pre-roll obsahuje jen framy přečtené po detekci a spotřebuje se."""
+    bus.push(_frame(1000))
+    bus.push(_frame(7))
+    bus.push(_frame(8))
+    assert detector.detect() is True
+    assert detector.detect() is False
+    assert detector.detect() is False
+    preroll = detector.take_preroll()
+    assert preroll is not None and len(preroll) == 2 * FRAME
+    assert [int(preroll[0]), int(preroll[FRAME])] == [7, 8]
+    assert detector.take_preroll() is None
+
+
+def test_speech_during_acknowledgement_reaches_stt(monkeypatch, detector, bus):
+    """Detekce → pauza/obnovení kolem „Ano, poslouchám“ → STT slyší i řeč z pauzy."""
+    tone = (np.sin(np.arange(8000) * 2 * np.pi * 220 / 16000) * 4000).astype(np.int16)
+    bus.push(_frame(1000))
+    assert detector.detect() is True
+    detector.stop_stream()  # TTS hook před potvrzením
+    bus.push(tone)  # uživatel mluví, zatímco Jarvis potvrzuje
+    detector.start_stream()  # hook po potvrzení skočí na živá data
+    bus.push(np.concatenate([tone[:4800], np.zeros(12800, dtype=np.int16)]))
+    stt = SpeechToText(STTConfig(service="google"))
+    stt.recognizer.energy_threshold = 300
+    stt.recognizer.pause_threshold = 0.5
+    heard = []
+    monkeypatch.setattr(
+        stt,
+        "_transcribe_array",
+        lambda audio, partial=False: heard.append(audio) or "rozsviť",
+    )
+    reader = bus.reader_at(detector.take_command_start())
+    hyps = list(stt.stream_transcribe(reader, timeout=1.0))
+    assert hyps and hyps[-1].final
+    # obě části povelu (0.5 s během potvrzení + 0.3 s po něm)
+    assert int(np.sum(np.abs(heard[-1]) > 0.01)) >= 0.9 * 12800
+    assert detector.take_command_start() is None
+
+
+def test_inference_error_drops_frame_instead_of_raising(detector):
+    """Chyba onnxruntime při inferenci frame zahodí, capture vlákno běží dál."""
+
+    def broken(_pcm):
+        raise RuntimeError("ORT: invalid input")
+
+    detector._engine.process = broken
+    assert detector.process_frame(_frame(1000)) is False
+
+
+def test_log_mel_frontend_is_continuous_across_batches():
+    """Log-mel po dávkách dává stejné framy jako zpracování najednou."""
+    rng = np.random.default_rng(0)
+    pcm = (rng.standard_normal(1280 * 3) * 1000).astype(np.int16)
+    whole = LogMelFrontend()(pcm)
+    frontend = LogMelFrontend()
+    parts = np.concatenate([frontend(pcm[:1280]), frontend(pcm[1280:])])
+    assert parts.shape == whole.shape == (len(pcm) // 160, 32)
+    np.testing.assert_allclose(parts, whole, rtol=1e-4, atol=1e-4)
+
+
+def test_speech_gate_skips_silence_and_replays_lookback():
+    """Brána přeskočí ticho a při nástupu řeči dopošle lookback."""
+    gate = SpeechGate(
+        SpeechGateConfig(rms_threshold=100, lookback_ms=64, hangover_ms=32)
+    )
+    silence, loud = np.zeros(FRAME, dtype=np.int16), np.full(FRAME, 500, dtype=np.int16)
+    assert (
+        gate.feed(silence) == []
+        and gate.feed(silence) == []
+        and gate.feed(silence) == []
+    )
+    out = gate.feed(loud)
+    assert len(out) == 3  # 2 framy lookbacku (64 ms) + aktuální
+    assert len(gate.feed(silence)) == 1  # hangover
+    assert gate.feed(silence) == []
+    assert gate.stats()["processed"] == 4 and gate.stats()["skipped"] == 2
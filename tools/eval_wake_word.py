@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Offline evaluace wake word detektoru nad adresáři WAV souborů.
+
+Přehraje pozitivní nahrávky (obsahují wake word) a hodiny šumu/pozadí
+rychleji než v reálném čase přes `WakeWordDetector.process_frame` a pro
+každou citlivost vypíše tabulku:
+
+- FA/h: falešná spuštění za hodinu negativního audia
+- miss: podíl pozitivních nahrávek bez detekce
+- latence: čas od konce řeči (poslední hlasitý frame) po detekci
+- CPU/frame: procesorový čas na jeden frame (včetně případné brány řeči)
+
+Použití:
+    python tools/eval_wake_word.py --positives data/ww/pos --negatives data/ww/noise \\
+        --sensitivities 0.3,0.5,0.7 --json results/ww-v1.2.json --compare results/ww-v1.1.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import wave
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import yaml
+from scipy.signal import resample_poly
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from src.audio.wake_word_detector import (  # noqa: E402
+    WakeWordDetector,
+    wake_word_config_from_dict,
+)
+
+SAMPLE_RATE = 16000
+REFRACTORY_S = 1.0  # detekce bližší než 1 s se počítají jako jedna
+
+
+@dataclass
+class SweepRow:
+    sensitivity: float
+    fa_per_hour: float
+    false_accepts: int
+    negative_hours: float
+    miss_rate: float
+    positives: int
+    latency_ms_median: Optional[float]
+    latency_ms_p90: Optional[float]
+    cpu_us_per_frame: float
+    realtime_factor: float
+
+
+def load_wav(path: Path) -> np.ndarray:
+    """Načti WAV jako mono int16 16 kHz (případně převzorkuj)."""
+    with wave.open(str(path), "rb") as wf:
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        raw = wf.readframes(wf.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: podporováno jen 16bit PCM")
+    audio = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        g = np.gcd(rate, SAMPLE_RATE)
+        audio = resample_poly(audio, SAMPLE_RATE // g, rate // g)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def iter_wavs(directory: Optional[Path]) -> Iterator[Path]:
+    if directory is None:
+        return iter(())
+    return iter(sorted(directory.rglob("*.wav")))
+
+
+def speech_end(audio: np.ndarray, frame: int) -> float:
+    """Odhad konce řeči: konec posledního framu nad 10 % maximálního RMS."""
+    n = len(audio) // frame
+    if n == 0:
+        return len(audio) / SAMPLE_RATE
+    frames = audio[: n * frame].astype(np.float32).reshape(n, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    loud = np.nonzero(rms >= 0.1 * rms.max())[0]
+    last = int(loud[-1]) if len(loud) else n - 1
+    return (last + 1) * frame / SAMPLE_RATE
+
+
+class Runner:
+    """Přehrávání souborů přes detektor s měřením CPU času."""
+
+    def __init__(self):
+        self.cpu_s = 0.0
+        self.frames = 0
+        self.audio_s = 0.0
+
+    def run(self, detector: WakeWordDetector, audio: np.ndarray) -> List[float]:
+        """Vrať časy (s od začátku souboru) všech detekcí."""
+        frame_len = detector.frame_length
+        hits: List[float] = []
+        for i in range(len(audio) // frame_len):
+            frame = audio[i * frame_len : (i + 1) * frame_len]
+            t0 = time.process_time()
+            hit = detector.process_frame(frame)
+            self.cpu_s += time.process_time() - t0
+            self.frames += 1
+            if hit:
+                hits.append((i + 1) * frame_len / SAMPLE_RATE)
+        self.audio_s += len(audio) / SAMPLE_RATE
+        return hits
+
+
+def _fresh_detector(raw_cfg: dict, sensitivity: float) -> WakeWordDetector:
+    cfg = replace(wake_word_config_from_dict(raw_cfg), threshold=sensitivity)
+    detector = WakeWordDetector(None, None, cfg)
+    if not detector.load_engine():
+        raise SystemExit("❌ Wake word engine nelze načíst (model/klíč/závislosti)")
+    return detector
+
+
+def evaluate(
+    raw_cfg: dict,
+    sensitivity: float,
+    positives: Sequence[np.ndarray],
+    negatives: Sequence[np.ndarray],
+) -> SweepRow:
+    runner = Runner()
+    wall0 = time.perf_counter()
+
+    latencies: List[float] = []
+    misses = 0
+    for audio in positives:
+        # každý soubor nezávisle – čerstvý stav enginu
+        detector = _fresh_detector(raw_cfg, sensitivity)
+        hits = runner.run(detector, audio)
+        if hits:
+            end = speech_end(audio, detector.frame_length)
+            latencies.append(max(0.0, hits[0] - end) * 1000.0)
+        else:
+            misses += 1
+        detector.stop()
+
+    false_accepts = 0
+    negative_s = 0.0
+    for audio in negatives:
+        detector = _fresh_detector(raw_cfg, sensitivity)
+        last = -REFRACTORY_S
+        for t in runner.run(detector, audio):
+            if t - last >= REFRACTORY_S:
+                false_accepts += 1
+                last = t
+        detector.stop()
+        negative_s += len(audio) / SAMPLE_RATE
+
+    wall = time.perf_counter() - wall0
+    hours = negative_s / 3600.0
+    lat_sorted = sorted(latencies)
+    return SweepRow(
+        sensitivity=sensitivity,
+        fa_per_hour=(false_accepts / hours) if hours else 0.0,
+        false_accepts=false_accepts,
+        negative_hours=hours,
+        miss_rate=(misses / len(positives)) if positives else 0.0,
+        positives=len(positives),
+        latency_ms_median=statistics.median(lat_sorted) if lat_sorted else None,
+        latency_ms_p90=(
+            lat_sorted[min(len(lat_sorted) - 1, int(0.9 * len(lat_sorted)))]
+            if lat_sorted
+            else None
+        ),
+        cpu_us_per_frame=(runner.cpu_s / runner.frames * 1e6) if runner.frames else 0.0,
+        realtime_factor=(runner.audio_s / wall) if wall else 0.0,
+    )
+
+
+def _fmt(value: Optional[float], spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def format_table(rows: Sequence[SweepRow], baseline: Optional[Dict] = None) -> str:
+    """Markdown tabulka; s `baseline` přidá rozdíl FA/h a miss proti minulé verzi."""
+    base = {r["sensitivity"]: r for r in (baseline or {}).get("rows", [])}
+    header = "| citlivost | FA/h | miss | latence med/p90 [ms] | CPU/frame [µs] | ×RT |"
+    if base:
+        header += " ΔFA/h | Δmiss |"
+    lines = [header, "|" + "---|" * (header.count("|") - 1)]
+    for r in rows:
+        line = (
+            f"| {r.sensitivity:.2f} | {r.fa_per_hour:.2f} | {r.miss_rate:.1%} | "
+            f"{_fmt(r.latency_ms_median, '.0f')}/{_fmt(r.latency_ms_p90, '.0f')} | "
+            f"{r.cpu_us_per_frame:.0f} | {r.realtime_factor:.0f} |"
+        )
+        old = base.get(r.sensitivity)
+        if base:
+            if old:
+                line += (
+                    f" {r.fa_per_hour - old['fa_per_hour']:+.2f} |"
+                    f" {r.miss_rate - old['miss_rate']:+.1%} |"
+                )
+            else:
+                line += " - | - |"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--positives", type=Path, help="adresář WAV s wake wordem")
+    parser.add_argument("--negatives", type=Path, help="adresář WAV bez wake wordu")
+    parser.add_argument("--sensitivities", default="0.3,0.4,0.5,0.6,0.7")
+    parser.add_argument("--config", type=Path, default=ROOT / "config.yaml")
+    parser.add_argument("--json", type=Path, help="ulož výsledky pro porovnání")
+    parser.add_argument("--compare", type=Path, help="JSON z předchozího běhu")
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        raw_cfg = (yaml.safe_load(f) or {}).get("wake_word", {})
+
+    positives = [load_wav(p) for p in iter_wavs(args.positives)]
+    negatives = [load_wav(p) for p in iter_wavs(args.negatives)]
+    if not positives and not negatives:
+        parser.error("zadej --positives a/nebo --negatives s WAV soubory")
+
+    sens = [float(x) for x in args.sensitivities.split(",") if x.strip()]
+    rows = [evaluate(raw_cfg, s, positives, negatives) for s in sens]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_table(rows, baseline))
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "service": raw_cfg.get("service", "porcupine"),
+            "model": raw_cfg.get("model_paths") or raw_cfg.get("model_path"),
+            "gate": bool((raw_cfg.get("gate") or {}).get("enabled", False)),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rows": [asdict(r) for r in rows],
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())